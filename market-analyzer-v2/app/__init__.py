@@ -11,6 +11,8 @@ from flask_bcrypt import Bcrypt
 
 # Import extensions (socketio, mongo, bcrypt are initialized here)
 from .extensions import socketio, mongo, bcrypt, jwt
+from .services.executors import ASYNC_MODE
+from .services.message_queue import socketio_queue_options
 
 load_dotenv()
 
@@ -50,10 +52,14 @@ def create_app():
             "http://127.0.0.1:3000",
             "http://127.0.0.1:3001",
         ],
-        async_mode="threading",
+        # "threading" unless SOCKETIO_ASYNC_MODE selects eventlet / gevent
+        async_mode=ASYNC_MODE,
         ping_timeout=60,
         ping_interval=25,
         transports=["websocket", "polling"],
+        # SOCKETIO_MESSAGE_QUEUE shares emits across web workers and the
+        # standalone emitter (scripts/emitter.py)
+        **socketio_queue_options(),
     )
 
     # --- JWT Error Handlers ---
@@ -310,4 +316,10 @@ def create_app():
 
     # --- Real-time Integration ---
     from . import websockets
+
+    # Fork the optional stress worker processes now, while the process is
+    # still single-threaded (STRESS_WORKER_PROCESSES)
+    from .services.stress_model_service import stress_model_service
+
+    stress_model_service.start_worker_pool()
     return app
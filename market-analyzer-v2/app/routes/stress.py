@@ -1,12 +1,20 @@
 # app/routes/stress.py
 
+import os
+from datetime import datetime, timezone
+
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import get_jwt_identity
 from app.middleware.auth import auth_required
 from app.services.stress_service import StressService
+from app.services.stress_model_service import FACE_CROP_BYTES
+from app.utils.image_payload import ImagePayloadError, decode_image_payload, image_from_request
 
 stress_bp = Blueprint("stress", __name__)
 
+# Upper bound on frames per /analyze-batch request (a minute at 2 fps)
+BATCH_MAX_FRAMES = int(os.getenv("STRESS_BATCH_MAX_FRAMES", "120"))
+
 def _get_stress_service():
     # lazily create service using the current app's mongo
     return StressService(current_app.mongo)
@@ -17,12 +25,14 @@ def _get_stress_service():
 def analyze_stress():
     """
     POST /api/stress/analyze
-    Body: { "image": "base64..." }
+    Body: raw JPEG/WebP bytes (application/octet-stream or image/*),
+          multipart/form-data with an "image" file,
+          or legacy JSON { "image": "base64..." }
     """
-    data = request.get_json(silent=True) or {}
-    image = data.get("image")
-    if not image:
-        return jsonify({"error": "Missing 'image' in request body"}), 400
+    try:
+        image = image_from_request(request)
+    except ImagePayloadError as e:
+        return jsonify({"error": str(e)}), 400
 
     identity = get_jwt_identity()
     if not identity:
@@ -38,3 +48,132 @@ def analyze_stress():
     except Exception as e:
         current_app.logger.exception("Stress analysis failed")
         return jsonify({"error": "Stress analysis failed"}), 500
+
+
+@stress_bp.route("/analyze-crop", methods=["POST"])
+@auth_required
+def analyze_stress_crop():
+    """
+    POST /api/stress/analyze-crop
+    Body (application/octet-stream): exactly 4096 bytes, a 64x64 uint8
+    grayscale face crop in row-major order, already detected by the client.
+    """
+    crop = request.get_data(cache=False)
+    if len(crop) != FACE_CROP_BYTES:
+        return jsonify({
+            "error": f"Body must be {FACE_CROP_BYTES} bytes (64x64 uint8 grayscale), got {len(crop)}"
+        }), 400
+
+    identity = get_jwt_identity()
+    if not identity:
+        return jsonify({"error": "Missing JWT identity"}), 400
+
+    user_id = identity.get("id") if isinstance(identity, dict) else identity
+
+    try:
+        stress_service = _get_stress_service()
+        result = stress_service.analyze_crop(crop, user_id)
+        return jsonify(result.dict()), 200
+    except Exception:
+        current_app.logger.exception("Stress crop analysis failed")
+        return jsonify({"error": "Stress analysis failed"}), 500
+
+
+def _parse_client_timestamp(value):
+    """
+    Naive-UTC datetime from a client timestamp: ISO 8601 (a trailing "Z" is
+    fine) or Unix epoch seconds / milliseconds. None or "" means "now".
+    Raises ValueError for anything else.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+            return parsed
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"unsupported timestamp {value!r}")
+    # anything past year ~5000 in seconds is milliseconds
+    seconds = value / 1000.0 if value > 1e11 else value
+    try:
+        return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(tzinfo=None)
+    except (OverflowError, OSError) as e:
+        raise ValueError(f"timestamp out of range: {value!r}") from e
+
+
+def _batch_frames_from_request(req):
+    """
+    [(image, timestamp), ...] from either
+    - multipart/form-data: repeated "frames" files, with optional repeated
+      "timestamps" fields in the same order
+    - JSON { "frames": [ { "image": "base64...", "timestamp": ... }, ... ] }
+    Raises ImagePayloadError / ValueError on malformed input.
+    """
+    if req.mimetype == "multipart/form-data":
+        uploads = req.files.getlist("frames")
+        timestamps = req.form.getlist("timestamps")
+        if timestamps and len(timestamps) != len(uploads):
+            raise ValueError(
+                f"Got {len(timestamps)} timestamps for {len(uploads)} frames"
+            )
+        entries = [
+            (upload.read(), timestamps[i] if timestamps else None)
+            for i, upload in enumerate(uploads)
+        ]
+    else:
+        data = req.get_json(silent=True) or {}
+        frames = data.get("frames")
+        if not isinstance(frames, list):
+            raise ImagePayloadError("Missing 'frames' list in request body")
+        entries = []
+        for frame in frames:
+            if not isinstance(frame, dict) or not frame.get("image"):
+                raise ImagePayloadError("Each frame needs an 'image'")
+            entries.append((frame["image"], frame.get("timestamp")))
+
+    if not entries:
+        raise ImagePayloadError("No frames in request")
+    if len(entries) > BATCH_MAX_FRAMES:
+        raise ValueError(f"At most {BATCH_MAX_FRAMES} frames per batch, got {len(entries)}")
+
+    return [
+        (decode_image_payload(image), _parse_client_timestamp(timestamp))
+        for image, timestamp in entries
+    ]
+
+
+@stress_bp.route("/analyze-batch", methods=["POST"])
+@auth_required
+def analyze_stress_batch():
+    """
+    POST /api/stress/analyze-batch
+    Body: multipart/form-data with repeated "frames" image files and
+          optional repeated "timestamps" (ISO 8601 or epoch s/ms),
+          or JSON { "frames": [ { "image": "base64...", "timestamp": ... } ] }
+    Returns { "results": [...], "count": n } in the order frames were sent.
+    """
+    try:
+        frames = _batch_frames_from_request(request)
+    except ValueError as e:  # includes ImagePayloadError
+        return jsonify({"error": str(e)}), 400
+
+    identity = get_jwt_identity()
+    if not identity:
+        return jsonify({"error": "Missing JWT identity"}), 400
+
+    user_id = identity.get("id") if isinstance(identity, dict) else identity
+
+    try:
+        stress_service = _get_stress_service()
+        results = stress_service.analyze_batch(frames, user_id)
+        return jsonify({
+            "results": [result.dict() for result in results],
+            "count": len(results),
+        }), 200
+    except Exception:
+        current_app.logger.exception("Stress batch analysis failed")
+        return jsonify({"error": "Stress analysis failed"}), 500
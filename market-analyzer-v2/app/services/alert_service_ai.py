@@ -5,6 +5,8 @@ from datetime import datetime
 import os
 from dotenv import load_dotenv
 
+from app.services.executors import get_executor, offload
+
 load_dotenv()
 
 class StressAlertService:
@@ -94,7 +96,7 @@ class StressAlertService:
         """Log moderate alert to database"""
         try:
             if self.mongo:
-                self.mongo.db.stressAlerts.insert_one(alert)
+                offload("mongo", self.mongo.db.stressAlerts.insert_one, alert)
                 print(f"[OK] Logged moderate alert for {alert['userId']}: {alert['message']}")
         except Exception as e:
             print(f"[ERROR] Logging alert: {e}")
@@ -104,12 +106,12 @@ class StressAlertService:
         try:
             if self.mongo:
                 # Store alert
-                self.mongo.db.stressAlerts.insert_one(alert)
+                offload("mongo", self.mongo.db.stressAlerts.insert_one, alert)
                 
                 # Fetch user and manager info
-                user = self.mongo.db.users.find_one({'_id': alert['userId']})
+                user = offload("mongo", self.mongo.db.users.find_one, {'_id': alert['userId']})
                 if user and user.get('managerId'):
-                    manager = self.mongo.db.users.find_one({'_id': user['managerId']})
+                    manager = offload("mongo", self.mongo.db.users.find_one, {'_id': user['managerId']})
                     if manager and manager.get('email'):
                         self._send_email(
                             manager['email'],
@@ -126,10 +128,13 @@ class StressAlertService:
         try:
             if self.mongo:
                 # Store with escalation flag
-                self.mongo.db.stressAlerts.insert_one(alert)
+                offload("mongo", self.mongo.db.stressAlerts.insert_one, alert)
                 
                 # Notify multiple recipients
-                hr_admins = self.mongo.db.users.find({'role': {'$in': ['hr', 'admin']}})
+                hr_admins = offload(
+                    "mongo",
+                    lambda: list(self.mongo.db.users.find({'role': {'$in': ['hr', 'admin']}}))
+                )
                 for admin in hr_admins:
                     if admin.get('email'):
                         self._send_email(
@@ -144,10 +149,17 @@ class StressAlertService:
             print(f"[ERROR] Escalating alert: {e}")
     
     def _send_email(self, recipient: str, subject: str, alert: dict, priority: str = 'NORMAL'):
-        """Send email notification"""
+        """Queue an email notification on the notify executor (SMTP never blocks the caller)"""
         if not self.email_enabled:
             return
         
+        try:
+            get_executor("notify").submit(self._deliver_email, recipient, subject, alert, priority)
+        except Exception as e:
+            print(f"[WARNING] Could not queue email: {e}")
+    
+    def _deliver_email(self, recipient: str, subject: str, alert: dict, priority: str = 'NORMAL'):
+        """Send email notification"""
         try:
             msg = MIMEMultipart('alternative')
             msg['Subject'] = subject
@@ -1,82 +1,227 @@
-from scipy.spatial import distance as dist
-from imutils.video import VideoStream
-from imutils import face_utils
-import numpy as np
-import imutils
+# app/services/blink_detection.py
+
 import time
-import dlib
-import cv2
-from app.services.blink_detection import BlinkDetectorFlask
+from array import array
+
+import numpy as np
+
+# 68-point landmark ranges of the two eyes (dlib / iBUG ordering)
+RIGHT_EYE = slice(36, 42)
+LEFT_EYE = slice(42, 48)
+
 
-#get the location of the eyes
 def eye_aspect_ratio(eye):
-    # compute the euclidean distances between the vertical landamrks
-    A = dist.euclidean(eye[1], eye[5])
-    B = dist.euclidean(eye[2], eye[4])
-
-    # compute the euclidean distance between the horizontal
-    C = dist.euclidean(eye[0], eye[3])
-
-    # compute the eye aspect ratio
-    eye_opening_ratio = (A + B) / (2.0 * C)
-
-    # return the eye aspect ratio
-    return eye_opening_ratio
-
-
-# the consecuting frame factor tells us to consider this amount of farme.
-ar_thresh = 0.3
-eye_ar_consec_frame = 5
-counter = 0
-total = 0
-
-# get the frontal face detector and shape predictor
-detector = dlib.get_frontal_face_detector()
-predictor = dlib.shape_predictor("datasets/facial/shape_predictor_68_face_landmarks.dat")
-cap = cv2.VideoCapture(0)
-while(True):
-    _,frame = cap.read()
-    frame = cv2.flip(frame,1)
-    frame = imutils.resize(frame, width=500,height=500)
-        
-    (lBegin, lEnd) = face_utils.FACIAL_LANDMARKS_IDXS["left_eye"]
-    (rBegin, rEnd) = face_utils.FACIAL_LANDMARKS_IDXS["right_eye"]
-    #preprocessing the image
-    gray = cv2.cvtColor(frame,cv2.COLOR_BGR2GRAY)
-    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-    clahe_image = clahe.apply(gray)
-    detections = detector(clahe_image,0)
-    for detection in detections:
-        shape = predictor(gray,detection)
-        shape = face_utils.shape_to_np(shape)
-        left_eye = shape[lBegin:lEnd]
-        right_eye = shape[rBegin:rEnd]
-
-        leftEyeHull = cv2.convexHull(left_eye)
-        rightEyeHull= cv2.convexHull(right_eye)
-        cv2.drawContours(clahe_image, [leftEyeHull], -1, (0, 255, 0), 1)
-        cv2.drawContours(clahe_image, [rightEyeHull], -1, (0, 255, 0), 1)
-        #calculating the EAR
-        left_eye_Ear = eye_aspect_ratio(left_eye)
-        right_eye_Ear = eye_aspect_ratio(right_eye)
-
-        avg_Ear = (left_eye_Ear + right_eye_Ear)/2.0
-
-        if avg_Ear<ar_thresh:
-            counter+=1
+    """
+    Eye aspect ratio of (..., 6, 2) eye landmarks: the mean of the two vertical
+    distances over the horizontal one. Works on one eye or a batch of them.
+    """
+    eye = np.asarray(eye, dtype=np.float64)
+    A = np.linalg.norm(eye[..., 1, :] - eye[..., 5, :], axis=-1)
+    B = np.linalg.norm(eye[..., 2, :] - eye[..., 4, :], axis=-1)
+    C = np.linalg.norm(eye[..., 0, :] - eye[..., 3, :], axis=-1)
+    return (A + B) / (2.0 * C)
+
+
+def average_ear(landmarks):
+    """Mean EAR of both eyes for (68, 2) or (N, 68, 2) landmarks."""
+    landmarks = np.asarray(landmarks)
+    return (
+        eye_aspect_ratio(landmarks[..., RIGHT_EYE, :])
+        + eye_aspect_ratio(landmarks[..., LEFT_EYE, :])
+    ) / 2.0
+
+
+class BlinkRateCounter:
+    """
+    Blinks per minute over several sliding windows (default 1, 5 and 15 min).
+
+    Blink timestamps go into a preallocated ring buffer. Each window keeps the
+    absolute index of its oldest blink and only ever moves it forward, so
+    recording and reading a rate are O(1) amortised and allocate nothing.
+    `capacity` must exceed the blinks that fit in the longest window.
+    """
+
+    __slots__ = ("windows", "capacity", "_times", "_count", "_starts", "_started_at")
+
+    def __init__(self, windows=(60.0, 300.0, 900.0), capacity=2048, now=None):
+        self.windows = tuple(float(w) for w in windows)
+        self.capacity = int(capacity)
+        self._times = array("d", bytes(8 * self.capacity))
+        self._count = 0
+        self._starts = [0] * len(self.windows)
+        self._started_at = time.monotonic() if now is None else now
+
+    def record(self, now=None):
+        """Register one blink at `now`."""
+        now = time.monotonic() if now is None else now
+        self._times[self._count % self.capacity] = now
+        self._count += 1
+        # never point at a slot that has been overwritten
+        floor = self._count - self.capacity
+        for i, start in enumerate(self._starts):
+            if start < floor:
+                self._starts[i] = floor
+
+    def rate(self, index=0, now=None) -> float:
+        """Blinks per minute over windows[index]; scaled to the session age while it is shorter."""
+        now = time.monotonic() if now is None else now
+        window = self.windows[index]
+        cutoff = now - window
+        start = self._starts[index]
+        while start < self._count and self._times[start % self.capacity] < cutoff:
+            start += 1
+        self._starts[index] = start
+
+        span = min(window, now - self._started_at)
+        if span <= 0:
+            return 0.0
+        return (self._count - start) * 60.0 / span
+
+    def rates(self, now=None) -> dict:
+        """All windows, keyed like '1m', '5m', '15m' (for reporting, not per frame)."""
+        now = time.monotonic() if now is None else now
+        return {f"{w / 60:g}m": round(self.rate(i, now), 2) for i, w in enumerate(self.windows)}
+
+    def age(self, now=None) -> float:
+        """Seconds since the counter started (or was reset)."""
+        return (time.monotonic() if now is None else now) - self._started_at
+
+    @property
+    def total(self) -> int:
+        return self._count
+
+    def reset(self, now=None):
+        self._count = 0
+        self._starts = [0] * len(self.windows)
+        self._started_at = time.monotonic() if now is None else now
+
+
+class BlinkAnalyzer:
+    """
+    Per-session blink state from 68-point landmarks.
+
+    A blink is counted when the EAR stays below `ear_threshold` for more than
+    `consec_frames` frames and then reopens; each one is timestamped in a
+    BlinkRateCounter. The per-frame score is eye openness mapped to [0, 1]
+    (0 = closed), which the live stress fusion uses together with
+    rate_stress(), the blink rate relative to a resting rate.
+
+    `consec_frames` assumes camera-rate updates (the original script ran at
+    ~30 fps); callers sampling at a few Hz should lower it to 0.
+    """
+
+    def __init__(self, ear_threshold=0.3, consec_frames=5, closed_ear=0.15, open_ear=0.40,
+                 rate_windows=(60.0, 300.0, 900.0), resting_rate=15.0, high_rate=35.0,
+                 min_rate_seconds=30.0):
+        self.ear_threshold = ear_threshold
+        self.consec_frames = consec_frames
+        self.closed_ear = closed_ear
+        self.open_ear = open_ear
+        self.resting_rate = resting_rate
+        self.high_rate = high_rate
+        self.min_rate_seconds = min_rate_seconds
+        self.rate_counter = BlinkRateCounter(rate_windows)
+        self.reset()
+
+    def reset(self):
+        self.ear = None
+        self.closed_frames = 0
+        self.total = 0
+        self.rate_counter.reset()
+
+    def rate_stress(self, index=0, now=None) -> float:
+        """
+        Blink rate over rate windows[index] mapped to [0, 1]: resting rate -> 0,
+        high_rate -> 1. Neutral 0.5 until `min_rate_seconds` of landmarks are in.
+        """
+        if self.ear is None or self.rate_counter.age(now) < self.min_rate_seconds:
+            return 0.5
+        rate = self.rate_counter.rate(index, now)
+        return min(1.0, max(0.0, (rate - self.resting_rate) / (self.high_rate - self.resting_rate)))
+
+    def openness(self, ear):
+        """EAR -> [0, 1] openness; scalar or array."""
+        return np.clip(
+            (np.asarray(ear) - self.closed_ear) / (self.open_ear - self.closed_ear), 0.0, 1.0
+        )
+
+    def update(self, landmarks, now=None) -> float:
+        """Feed one frame's (68, 2) landmarks; returns its openness score."""
+        if self.ear is None:
+            # rates are measured from the first frame with landmarks
+            self.rate_counter.reset(now)
+        self.ear = float(average_ear(landmarks))
+
+        if self.ear < self.ear_threshold:
+            self.closed_frames += 1
         else:
-            if counter>eye_ar_consec_frame:
-                total+= 1
-            counter = 0	
-        cv2.putText(clahe_image, "Blinks: {}".format(total), (10, 30),cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-        cv2.putText(clahe_image, "EAR: {:.2f}".format(avg_Ear), (300, 30),cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-    cv2.imshow("Frame", clahe_image)
+            if self.closed_frames > self.consec_frames:
+                self.total += 1
+                self.rate_counter.record(now)
+            self.closed_frames = 0
+
+        return float(self.openness(self.ear))
+
+    def score(self, landmarks_array):
+        """
+        Openness scores for a (N, 68, 2) sequence in one vectorised pass.
+        Does not touch the session state; see count_blinks for the totals.
+        """
+        return self.openness(average_ear(landmarks_array))
+
+    def count_blinks(self, landmarks_array) -> int:
+        """Blinks in a (N, 68, 2) sequence, counted with the same rule as update()."""
+        closed = average_ear(landmarks_array) < self.ear_threshold
+        if not closed.size:
+            return 0
+        # lengths of the closed runs that end with the eye reopening
+        edges = np.diff(np.concatenate(([0], closed.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        reopened = ends < len(closed)
+        return int(np.count_nonzero((ends - starts)[reopened] > self.consec_frames))
+
+
+def main():
+    """Webcam demo: blink count and EAR overlay (press q to quit)."""
+    import cv2
+    import dlib
+
+    from app.services.face_analysis import shape_to_np
+
+    detector = dlib.get_frontal_face_detector()
+    predictor = dlib.shape_predictor("datasets/facial/shape_predictor_68_face_landmarks.dat")
+    analyzer = BlinkAnalyzer()
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+
+    cap = cv2.VideoCapture(0)
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frame = cv2.flip(frame, 1)
+        frame = cv2.resize(frame, (500, int(frame.shape[0] * 500 / frame.shape[1])))
+
+        # preprocessing the image
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        clahe_image = clahe.apply(gray)
+        for detection in detector(clahe_image, 0):
+            shape = shape_to_np(predictor(gray, detection))
+            analyzer.update(shape)
 
-    key = cv2.waitKey(1) & 0xFF
-    if key == ord('q'):
-        break
-cv2.destroyAllWindows()
-cap.release()
+            for eye in (shape[RIGHT_EYE], shape[LEFT_EYE]):
+                cv2.drawContours(clahe_image, [cv2.convexHull(eye)], -1, (0, 255, 0), 1)
+            cv2.putText(clahe_image, "Blinks: {}".format(analyzer.total), (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+            cv2.putText(clahe_image, "EAR: {:.2f}".format(analyzer.ear), (300, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        cv2.imshow("Frame", clahe_image)
 
+        if cv2.waitKey(1) & 0xFF == ord("q"):
+            break
+    cv2.destroyAllWindows()
+    cap.release()
 
 
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,90 @@
-from keras.callbacks import CSVLogger, ModelCheckpoint, EarlyStopping
-from keras.callbacks import ReduceLROnPlateau
-from keras.preprocessing.image import ImageDataGenerator
-from load_and_process import load_fer2013
-from load_and_process import preprocess_input
-from models.cnn import mini_XCEPTION
-from sklearn.model_selection import train_test_split
-
-# parameters
-batch_size = 32
-num_epochs = 10000
-input_shape = (48, 48, 1)
-validation_split = .2
-verbose = 1
-num_classes = 7
-patience = 50
-base_path = 'models/'
-
-# data generator
-data_generator = ImageDataGenerator(
-                        featurewise_center=False,
-                        featurewise_std_normalization=False,
-                        rotation_range=10,
-                        width_shift_range=0.1,
-                        height_shift_range=0.1,
-                        zoom_range=.1,
-                        horizontal_flip=True)
-
-# model parameters/compilation
-model = mini_XCEPTION(input_shape, num_classes)
-model.compile(optimizer='adam', loss='categorical_crossentropy',
-              metrics=['accuracy'])
-model.summary()
+# app/services/emotion_recognition.py
 
+import cv2
+import numpy as np
 
+from app.services.model_registry import model_registry, MINI_XCEPTION_PATH
 
+# FER2013 class order of the mini_XCEPTION checkpoints
+EMOTIONS = ["angry", "disgust", "scared", "happy", "sad", "surprised", "neutral"]
+STRESSED_EMOTIONS = ("scared", "sad")
 
 
+def emotion_finder(face, gray):
+    """
+    'stressed' / 'not stressed' for the face `face` (a dlib rectangle) in the
+    grayscale frame, using the shared emotion model from the registry.
+    """
+    h, w = gray.shape[:2]
+    x1, y1 = max(0, face.left()), max(0, face.top())
+    x2, y2 = min(w, face.right() + 1), min(h, face.bottom() + 1)
+    if x2 <= x1 or y2 <= y1:
+        return "not stressed"
+
+    roi = cv2.resize(gray[y1:y2, x1:x2], (64, 64)).astype("float32") / 255.0
+    preds = model_registry.get_predictor(MINI_XCEPTION_PATH)(roi[np.newaxis, :, :, np.newaxis])[0]
+    return stress_label(preds)
+
+
+def stress_label(predictions):
+    """'stressed' / 'not stressed' for one row of emotion probabilities."""
+    label = EMOTIONS[int(np.argmax(predictions))]
+    return "stressed" if label in STRESSED_EMOTIONS else "not stressed"
+
+
+def train(base_path="models/", batch_size=32, num_epochs=10000, patience=50):
+    """
+    Train mini_XCEPTION on FER2013 (the original Stress-Detection script).
+    Needs the training-only `load_and_process` and `models.cnn` modules.
+    """
+    from keras.callbacks import CSVLogger, ModelCheckpoint, EarlyStopping
+    from keras.callbacks import ReduceLROnPlateau
+    from keras.preprocessing.image import ImageDataGenerator
+    from load_and_process import load_fer2013
+    from load_and_process import preprocess_input
+    from models.cnn import mini_XCEPTION
+    from sklearn.model_selection import train_test_split
+
+    input_shape = (48, 48, 1)
+    num_classes = 7
+
+    # data generator
+    data_generator = ImageDataGenerator(
+        featurewise_center=False,
+        featurewise_std_normalization=False,
+        rotation_range=10,
+        width_shift_range=0.1,
+        height_shift_range=0.1,
+        zoom_range=.1,
+        horizontal_flip=True)
+
+    # model parameters/compilation
+    model = mini_XCEPTION(input_shape, num_classes)
+    model.compile(optimizer='adam', loss='categorical_crossentropy',
+                  metrics=['accuracy'])
+    model.summary()
+
     # callbacks
-log_file_path = base_path + '_emotion_training.log'
-csv_logger = CSVLogger(log_file_path, append=False)
-early_stop = EarlyStopping('val_loss', patience=patience)
-reduce_lr = ReduceLROnPlateau('val_loss', factor=0.1,
-                                  patience=int(patience/4), verbose=1)
-trained_models_path = base_path + '_mini_XCEPTION'
-model_names = trained_models_path + '.{epoch:02d}-{val_acc:.2f}.hdf5'
-model_checkpoint = ModelCheckpoint(model_names, 'val_loss', verbose=1,
-                                                    save_best_only=True)
-callbacks = [model_checkpoint, csv_logger, early_stop, reduce_lr]
-
-# loading dataset
-faces, emotions = load_fer2013()
-faces = preprocess_input(faces)
-num_samples, num_classes = emotions.shape
-xtrain, xtest,ytrain,ytest = train_test_split(faces, emotions,test_size=0.2,shuffle=True)
-model.fit_generator(data_generator.flow(xtrain, ytrain,
-                                            batch_size),
+    log_file_path = base_path + '_emotion_training.log'
+    csv_logger = CSVLogger(log_file_path, append=False)
+    early_stop = EarlyStopping('val_loss', patience=patience)
+    reduce_lr = ReduceLROnPlateau('val_loss', factor=0.1,
+                                  patience=int(patience / 4), verbose=1)
+    trained_models_path = base_path + '_mini_XCEPTION'
+    model_names = trained_models_path + '.{epoch:02d}-{val_acc:.2f}.hdf5'
+    model_checkpoint = ModelCheckpoint(model_names, 'val_loss', verbose=1,
+                                       save_best_only=True)
+    callbacks = [model_checkpoint, csv_logger, early_stop, reduce_lr]
+
+    # loading dataset
+    faces, emotions = load_fer2013()
+    faces = preprocess_input(faces)
+    xtrain, xtest, ytrain, ytest = train_test_split(faces, emotions, test_size=0.2, shuffle=True)
+    model.fit_generator(data_generator.flow(xtrain, ytrain, batch_size),
                         steps_per_epoch=len(xtrain) / batch_size,
                         epochs=num_epochs, verbose=1, callbacks=callbacks,
-                        validation_data=(xtest,ytest))
+                        validation_data=(xtest, ytest))
+
+
+if __name__ == "__main__":
+    train()
@@ -0,0 +1,211 @@
+# app/services/executors.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "threading" (default), "eventlet" or "gevent". run.py monkey-patches the
+# standard library before anything else is imported in the green modes.
+ASYNC_MODE = os.getenv("SOCKETIO_ASYNC_MODE", "threading")
+GREEN_MODES = ("eventlet", "gevent")
+
+# kind -> (workers, queue, native); override with <KIND>_WORKERS / <KIND>_QUEUE
+POOL_DEFAULTS = {
+    # TF / OpenCV / dlib / camera reads: hold an OS thread without yielding
+    "inference": (4, 256, True),
+    # pymongo, requests, SMTP and Twilio sockets yield under monkey patching;
+    # these pools only bound how many run at once
+    "mongo": (32, 1024, False),
+    "http": (16, 256, False),
+    "notify": (4, 256, False),
+}
+
+
+class ExecutorBusy(RuntimeError):
+    """Every worker of a pool is busy and its wait queue is full."""
+
+
+class OffloadExecutor:
+    """
+    Bounded pool for one kind of blocking call.
+
+    run(fn, *args) blocks the caller until fn returns; submit(fn, *args)
+    returns a Future for fire-and-forget work. At most `max_workers` calls
+    run at once and at most `max_queue` more wait for a slot; past that the
+    call raises ExecutorBusy instead of piling up.
+
+    `native` pools are for CPU / C-extension work. Under eventlet or gevent
+    their run() executes on real OS threads (eventlet.tpool, gevent's thread
+    pool) so the event loop keeps serving sockets meanwhile; such functions
+    must not wait on locks or events shared with green threads. In threading
+    mode, and for the I/O pools, run() executes on the caller's own thread
+    once a slot is free.
+    """
+
+    def __init__(self, name, max_workers, max_queue=0, native=False, async_mode=ASYNC_MODE):
+        self.name = name
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self.native = native
+        self.async_mode = async_mode
+
+        self._admitted = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._slots = threading.BoundedSemaphore(self.max_workers)
+        self._submit_pool = None
+        self._native_call = self._make_native_call() if native else None
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.active = 0
+
+    def _make_native_call(self):
+        if self.async_mode == "eventlet":
+            from eventlet import tpool
+
+            return tpool.execute
+        if self.async_mode == "gevent":
+            from gevent.threadpool import ThreadPool
+
+            pool = ThreadPool(self.max_workers)
+            return lambda fn, *args, **kwargs: pool.apply(fn, args, kwargs)
+        return None
+
+    def _admit(self):
+        if not self._admitted.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ExecutorBusy(
+                f"{self.name}: {self.max_workers} workers busy and {self.max_queue} calls queued"
+            )
+        with self._lock:
+            self.submitted += 1
+
+    def _call(self, fn, args, kwargs):
+        """Run fn in a worker slot (admission already taken), then release it."""
+        try:
+            with self._slots:
+                with self._lock:
+                    self.active += 1
+                try:
+                    if self._native_call is not None:
+                        result = self._native_call(fn, *args, **kwargs)
+                    else:
+                        result = fn(*args, **kwargs)
+                finally:
+                    with self._lock:
+                        self.active -= 1
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            self._admitted.release()
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def run(self, fn, *args, **kwargs):
+        """Call fn(*args, **kwargs) in this pool and return its result."""
+        self._admit()
+        return self._call(fn, args, kwargs)
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) and return a concurrent.futures.Future."""
+        self._admit()
+        try:
+            return self._get_submit_pool().submit(self._call, fn, args, kwargs)
+        except Exception:
+            self._admitted.release()
+            raise
+
+    def _get_submit_pool(self):
+        if self._submit_pool is None:
+            with self._lock:
+                if self._submit_pool is None:
+                    # green threads when monkey-patched; they only wait on _call
+                    self._submit_pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix=self.name
+                    )
+        return self._submit_pool
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "native": self._native_call is not None,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "active": self.active,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+
+def native_lock():
+    """
+    A real OS lock even when the standard library is monkey-patched, for
+    state used by functions that run on native pool threads (a green lock
+    cannot be waited on from an OS thread).
+    """
+    if ASYNC_MODE == "eventlet":
+        from eventlet import patcher
+
+        return patcher.original("_thread").allocate_lock()
+    if ASYNC_MODE == "gevent":
+        from gevent import monkey
+
+        return monkey.get_original("_thread", "allocate_lock")()
+    return threading.Lock()
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(kind) -> OffloadExecutor:
+    """The process-wide pool for `kind` (see POOL_DEFAULTS), created on first use."""
+    executor = _executors.get(kind)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(kind)
+            if executor is None:
+                workers, queue, native = POOL_DEFAULTS[kind]
+                prefix = kind.upper()
+                executor = OffloadExecutor(
+                    f"{prefix}_POOL",
+                    int(os.getenv(f"{prefix}_WORKERS", str(workers))),
+                    int(os.getenv(f"{prefix}_QUEUE", str(queue))),
+                    native=native,
+                )
+                _executors[kind] = executor
+    return executor
+
+
+def offload(kind, fn, *args, **kwargs):
+    """Run a blocking call on the `kind` pool and return its result."""
+    return get_executor(kind).run(fn, *args, **kwargs)
+
+
+def call_native(fn, *args, **kwargs):
+    """
+    Blocking native call from a thread that owns its OS thread in threading
+    mode (camera capture, the live pipeline stages). Under eventlet / gevent
+    it runs on the inference pool's native threads so the event loop keeps
+    serving; in threading mode it is a plain call and takes no pool slot, so
+    REST and socket inference bursts cannot stall the camera loop.
+    """
+    if ASYNC_MODE in GREEN_MODES:
+        return offload("inference", fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+
+def executor_stats() -> dict:
+    return {kind: executor.stats() for kind, executor in list(_executors.items())}
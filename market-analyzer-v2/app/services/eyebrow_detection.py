@@ -1,92 +1,130 @@
-from scipy.spatial import distance as dist
-from imutils.video import VideoStream
-from imutils import face_utils
+# app/services/eyebrow_detection.py
+
 import numpy as np
-import imutils
-import time
-import dlib
-import cv2
-import matplotlib.pyplot as plt
-from keras.preprocessing.image import img_to_array
-from keras.models import load_model
-
-def eye_brow_distance(leye,reye):
-    global points
-    distq = dist.euclidean(leye,reye)
-    points.append(int(distq))
-    return distq
-
-def emotion_finder(faces,frame):
-    global emotion_classifier
-    EMOTIONS = ["angry" ,"disgust","scared", "happy", "sad", "surprised","neutral"]
-    x,y,w,h = face_utils.rect_to_bb(faces)
-    frame = frame[y:y+h,x:x+w]
-    roi = cv2.resize(frame,(64,64))
-    roi = roi.astype("float") / 255.0
-    roi = img_to_array(roi)
-    roi = np.expand_dims(roi,axis=0)
-    preds = emotion_classifier.predict(roi)[0]
-    emotion_probability = np.max(preds)
-    label = EMOTIONS[preds.argmax()]
-    if label in ['scared','sad']:
-        label = 'stressed'
-    else:
-        label = 'not stressed'
-    return label
-    
-def normalize_values(points,disp):
-    normalized_value = abs(disp - np.min(points))/abs(np.max(points) - np.min(points))
-    stress_value = np.exp(-(normalized_value))
-    print(stress_value)
-    if stress_value>=75:
-        return stress_value,"High Stress"
-    else:
-        return stress_value,"low_stress"
-    
-detector = dlib.get_frontal_face_detector()
-predictor = dlib.shape_predictor("datasets/facial/shape_predictor_68_face_landmarks.dat")
-emotion_classifier = load_model("datasets/facial/_mini_XCEPTION.102-0.66.hdf5", compile=False)
-cap = cv2.VideoCapture(0)
-points = []
-while(True):
-    _,frame = cap.read()
-    frame = cv2.flip(frame,1)
-    frame = imutils.resize(frame, width=500,height=500)
-    
-    
-    (lBegin, lEnd) = face_utils.FACIAL_LANDMARKS_IDXS["right_eyebrow"]
-    (rBegin, rEnd) = face_utils.FACIAL_LANDMARKS_IDXS["left_eyebrow"]
-
-    #preprocessing the image
-    gray = cv2.cvtColor(frame,cv2.COLOR_BGR2GRAY)
-    
-    detections = detector(gray,0)
-    for detection in detections:
-        emotion = emotion_finder(detection,gray)
-        cv2.putText(frame, emotion, (10,10),cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-        shape = predictor(frame,detection)
-        shape = face_utils.shape_to_np(shape)
-           
-        leyebrow = shape[lBegin:lEnd]
-        reyebrow = shape[rBegin:rEnd]
-            
-        reyebrowhull = cv2.convexHull(reyebrow)
-        leyebrowhull = cv2.convexHull(leyebrow)
-
-        cv2.drawContours(frame, [reyebrowhull], -1, (0, 255, 0), 1)
-        cv2.drawContours(frame, [leyebrowhull], -1, (0, 255, 0), 1)
-
-        distq = eye_brow_distance(leyebrow[-1],reyebrow[0])
-        stress_value,stress_label = normalize_values(points,distq)
-        cv2.putText(frame,"stress level:{}".format(str(int(stress_value*100))),(20,40),cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-
-    cv2.imshow("Frame", frame)
-
-    key = cv2.waitKey(1) & 0xFF
-    if key == ord('q'):
-        break
-cv2.destroyAllWindows()
-cap.release()
-plt.plot(range(len(points)),points,'ro')
-plt.title("Stress Levels")
-plt.show()
+
+from app.utils.rolling_window import RollingMinMax
+
+# 68-point landmark ranges of the eyebrows (dlib / iBUG ordering)
+RIGHT_EYEBROW = slice(17, 22)
+LEFT_EYEBROW = slice(22, 27)
+# The inner ends of the two brows, which move together when frowning
+RIGHT_BROW_INNER = 21
+LEFT_BROW_INNER = 22
+
+
+def eyebrow_distance(landmarks):
+    """Inner-brow distance in pixels for (68, 2) or (N, 68, 2) landmarks."""
+    landmarks = np.asarray(landmarks, dtype=np.float64)
+    return np.linalg.norm(
+        landmarks[..., RIGHT_BROW_INNER, :] - landmarks[..., LEFT_BROW_INNER, :], axis=-1
+    )
+
+
+class EyebrowAnalyzer:
+    """
+    Per-session eyebrow-contraction state from 68-point landmarks.
+
+    Brows drawn together (a small inner-brow distance) read as tension. The
+    distance is normalised against this session's own range over the last
+    `window_seconds` (0 = widest seen, 1 = most contracted), so it adapts to
+    face size and camera distance. Until that range is at least
+    `min_spread` pixels wide, the distance is scaled against `max_distance`
+    instead. The window's min/max are kept in a RollingMinMax, so memory and
+    per-frame cost do not grow over a long session.
+    """
+
+    def __init__(self, window_seconds=600.0, min_spread=3.0, max_distance=100.0):
+        self.min_spread = float(min_spread)
+        self.max_distance = float(max_distance)
+        self._range = RollingMinMax(window_seconds)
+        self.reset()
+
+    def reset(self):
+        self.distance = None
+        self.frames = 0
+        self._range.reset()
+
+    def contraction(self, distance, low=None, high=None):
+        """Inner-brow distance -> [0, 1] contraction against [low, high]; scalar or array."""
+        distance = np.asarray(distance, dtype=np.float64)
+        if low is None or high is None or high - low < self.min_spread:
+            return 1.0 - np.clip(distance / self.max_distance, 0.0, 1.0)
+        return 1.0 - np.clip((distance - low) / (high - low), 0.0, 1.0)
+
+    def update(self, landmarks, now=None) -> float:
+        """Feed one frame's (68, 2) landmarks; returns its contraction score."""
+        self.distance = float(eyebrow_distance(landmarks))
+        self.frames += 1
+        low, high = self._range.update(self.distance, now)
+        return float(self.contraction(self.distance, low, high))
+
+    def score(self, landmarks_array):
+        """
+        Contraction scores for a (N, 68, 2) recording in one vectorised pass,
+        normalised against the recording's own range. Session state is untouched.
+        """
+        distances = eyebrow_distance(landmarks_array)
+        if not distances.size:
+            return distances
+        return self.contraction(distances, distances.min(), distances.max())
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "distance": self.distance,
+            "window_min": self._range.min,
+            "window_max": self._range.max,
+            "retained_samples": len(self._range),
+        }
+
+
+def main():
+    """Webcam demo: eyebrow stress level and emotion overlay, then a plot of distances."""
+    import cv2
+    import dlib
+    import matplotlib.pyplot as plt
+
+    from app.services.emotion_recognition import emotion_finder
+    from app.services.face_analysis import shape_to_np
+
+    detector = dlib.get_frontal_face_detector()
+    predictor = dlib.shape_predictor("datasets/facial/shape_predictor_68_face_landmarks.dat")
+    analyzer = EyebrowAnalyzer()
+    points = []
+
+    cap = cv2.VideoCapture(0)
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frame = cv2.flip(frame, 1)
+        frame = cv2.resize(frame, (500, int(frame.shape[0] * 500 / frame.shape[1])))
+
+        # preprocessing the image
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        for detection in detector(gray, 0):
+            emotion = emotion_finder(detection, gray)
+            cv2.putText(frame, emotion, (10, 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+            shape = shape_to_np(predictor(frame, detection))
+
+            for brow in (shape[RIGHT_EYEBROW], shape[LEFT_EYEBROW]):
+                cv2.drawContours(frame, [cv2.convexHull(brow)], -1, (0, 255, 0), 1)
+
+            stress_value = analyzer.update(shape)
+            points.append(int(analyzer.distance))
+            cv2.putText(frame, "stress level:{}".format(int(stress_value * 100)), (20, 40),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+
+        cv2.imshow("Frame", frame)
+        if cv2.waitKey(1) & 0xFF == ord("q"):
+            break
+    cv2.destroyAllWindows()
+    cap.release()
+
+    plt.plot(range(len(points)), points, "ro")
+    plt.title("Stress Levels")
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+# app/services/face_analysis.py
+
+import cv2
+import numpy as np
+
+from app.services.face_detectors import to_dlib_rectangles
+
+
+def shape_to_np(shape, dtype="int"):
+    """Convert a dlib full_object_detection into a (68, 2) landmark array."""
+    coords = np.zeros((shape.num_parts, 2), dtype=dtype)
+    for i in range(shape.num_parts):
+        coords[i] = (shape.part(i).x, shape.part(i).y)
+    return coords
+
+
+class FaceFrame:
+    """
+    Everything the live metrics need to know about one processed frame.
+    Built once by FaceAnalysis and shared by blink, eyebrow and emotion helpers.
+    """
+
+    __slots__ = ("frame", "gray", "rects", "landmarks", "roi", "tracked")
+
+    def __init__(self, frame, gray, rects=None, landmarks=None, roi=None, tracked=False):
+        self.frame = frame
+        self.gray = gray
+        self.rects = rects or []
+        self.landmarks = landmarks
+        self.roi = roi
+        # True when the face position came from the tracker, not a full detection
+        self.tracked = tracked
+
+    @property
+    def rect(self):
+        """First detected face rectangle (dlib.rectangle) or None."""
+        return self.rects[0] if self.rects else None
+
+    @property
+    def has_face(self) -> bool:
+        return bool(self.rects)
+
+
+class FaceTracker:
+    """
+    Detect-then-track face localisation.
+    Full detection runs every `detect_interval` frames, or earlier when the
+    dlib correlation tracker's confidence (peak-to-sidelobe ratio) drops below
+    `min_confidence`. In between, the face is followed by the tracker, which
+    is far cheaper than a full-frame HOG pass.
+    """
+
+    def __init__(self, detect_interval=10, min_confidence=7.0):
+        import dlib
+
+        self._dlib = dlib
+        self.detect_interval = max(1, int(detect_interval))
+        self.min_confidence = float(min_confidence)
+        self._tracker = None
+        self._since_detect = 0
+        self.frames = 0
+        self.detections = 0
+        self.tracked = 0
+        self.confidence_fallbacks = 0
+
+    def locate(self, gray, detect):
+        """
+        Return (rects, tracked) for this frame.
+        `detect` is a zero-argument callable running the full detector.
+        """
+        self.frames += 1
+
+        if self._tracker is not None and self._since_detect < self.detect_interval:
+            confidence = self._tracker.update(gray)
+            if confidence >= self.min_confidence:
+                self._since_detect += 1
+                self.tracked += 1
+                pos = self._tracker.get_position()
+                rect = self._dlib.rectangle(
+                    int(pos.left()), int(pos.top()), int(pos.right()), int(pos.bottom())
+                )
+                return [rect], True
+            self.confidence_fallbacks += 1
+
+        rects = list(detect())
+        self.detections += 1
+        self._since_detect = 0
+        if rects:
+            self._tracker = self._dlib.correlation_tracker()
+            self._tracker.start_track(gray, rects[0])
+        else:
+            self._tracker = None
+        return rects, False
+
+    def reset(self):
+        """Drop the current track so the next frame runs full detection."""
+        self._tracker = None
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "detections": self.detections,
+            "tracked": self.tracked,
+            "confidence_fallbacks": self.confidence_fallbacks,
+            "detection_rate": (self.detections / self.frames) if self.frames else 0.0,
+        }
+
+
+class FaceAnalysis:
+    """
+    Single face-analysis stage for the live stress thread.
+    Runs the face detector (a FaceDetector backend) and the 68-point predictor
+    at most once per frame, on the grayscale image, and exposes the result as
+    a FaceFrame. With a FaceTracker attached, most frames are localised by
+    tracking instead.
+    """
+
+    def __init__(self, detector, predictor=None, tracker=None):
+        self.detector = detector
+        self.predictor = predictor
+        self.tracker = tracker
+
+    def _detect(self, gray):
+        return to_dlib_rectangles(self.detector.detect(gray))
+
+    def analyze(self, frame_color, gray=None) -> FaceFrame:
+        if gray is None:
+            gray = cv2.cvtColor(frame_color, cv2.COLOR_BGR2GRAY)
+
+        tracked = False
+        if self.tracker is not None:
+            rects, tracked = self.tracker.locate(gray, lambda: self._detect(gray))
+        else:
+            rects = self._detect(gray)
+        if not rects:
+            return FaceFrame(frame_color, gray)
+
+        rect = rects[0]
+        landmarks = None
+        if self.predictor is not None:
+            landmarks = shape_to_np(self.predictor(gray, rect))
+
+        return FaceFrame(
+            frame_color,
+            gray,
+            rects=rects,
+            landmarks=landmarks,
+            roi=self._crop(gray, rect),
+            tracked=tracked,
+        )
+
+    @staticmethod
+    def _crop(gray, rect):
+        """Grayscale face ROI clipped to the frame bounds."""
+        h, w = gray.shape[:2]
+        x1, y1 = max(0, rect.left()), max(0, rect.top())
+        x2, y2 = min(w, rect.right() + 1), min(h, rect.bottom() + 1)
+        if x2 <= x1 or y2 <= y1:
+            return None
+        return gray[y1:y2, x1:x2]
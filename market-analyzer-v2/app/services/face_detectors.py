@@ -0,0 +1,169 @@
+# app/services/face_detectors.py
+
+import os
+
+import cv2
+
+from app.services.executors import native_lock
+from app.services.model_registry import FACIAL_MODELS_DIR
+from app.utils.image_decode import resize_into
+
+FACE_CASCADE_PATH = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+
+# OpenCV's res10 SSD face detector (not shipped; download into datasets/facial)
+DNN_PROTOTXT_PATH = os.path.join(FACIAL_MODELS_DIR, "deploy.prototxt")
+DNN_WEIGHTS_PATH = os.path.join(FACIAL_MODELS_DIR, "res10_300x300_ssd_iter_140000.caffemodel")
+
+
+class FaceDetector:
+    """
+    Common interface of the face detector backends.
+
+    `detect(gray)` returns (x, y, w, h) boxes in full-resolution coordinates,
+    largest first. Detection itself runs on a copy shrunk by `scale`: at 0.5
+    the detector sees a quarter of the pixels, and the boxes are mapped back.
+    A caller that already decoded at reduced size passes the scale to use
+    instead. `min_face` is roughly the smallest face (pixels, in the image
+    `_detect` sees) the backend finds.
+    """
+
+    name = None
+    min_face = 24
+    # FACE_DETECT_SCALE unset: backends that still find typical faces at
+    # half size run there, the rest at full size
+    default_scale = 0.5
+
+    def __init__(self, scale=1.0):
+        self.scale = min(1.0, max(0.05, float(scale)))
+
+    def _detect(self, gray):
+        """Backend-specific detection on the (possibly downscaled) image."""
+        raise NotImplementedError
+
+    def detect(self, gray, scale=None):
+        scale = self.scale if scale is None else min(1.0, max(0.05, float(scale)))
+        if scale < 1.0:
+            h, w = gray.shape[:2]
+            size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+            small = resize_into(gray, size)
+        else:
+            small = gray
+
+        boxes = self._detect(small)
+        if scale < 1.0:
+            inv = 1.0 / scale
+            boxes = [
+                (int(round(x * inv)), int(round(y * inv)), int(round(w * inv)), int(round(h * inv)))
+                for x, y, w, h in boxes
+            ]
+        return sorted(boxes, key=lambda b: b[2] * b[3], reverse=True)
+
+    __call__ = detect
+
+
+class HaarFaceDetector(FaceDetector):
+    """OpenCV Viola-Jones cascade; cheapest, least robust to pose and lighting."""
+
+    name = "haar"
+    min_face = 24  # the cascade's training window
+
+    def __init__(self, scale=1.0, cascade_path=FACE_CASCADE_PATH, scale_factor=1.3, min_neighbors=5):
+        super().__init__(scale)
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise IOError(f"Failed to load face cascade: {cascade_path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+
+    def _detect(self, gray):
+        faces = self.cascade.detectMultiScale(gray, self.scale_factor, self.min_neighbors)
+        return [tuple(int(v) for v in face) for face in faces]
+
+
+class DlibHogFaceDetector(FaceDetector):
+    """dlib's HOG + linear SVM frontal face detector."""
+
+    name = "hog"
+    min_face = 80  # without upsampling
+    default_scale = 1.0  # at 0.5 faces under ~160px would be missed
+
+    def __init__(self, scale=1.0, upsample=0):
+        import dlib
+
+        super().__init__(scale)
+        self._detector = dlib.get_frontal_face_detector()
+        self.upsample = upsample
+
+    def _detect(self, gray):
+        return [
+            (r.left(), r.top(), r.right() - r.left() + 1, r.bottom() - r.top() + 1)
+            for r in self._detector(gray, self.upsample)
+        ]
+
+
+class DnnFaceDetector(FaceDetector):
+    """
+    OpenCV DNN res10 SSD. The network always sees a 300x300 blob, so the
+    downscale only saves the resize; it tolerates pose and lighting best.
+    """
+
+    name = "dnn"
+    min_face = 32
+
+    def __init__(self, scale=1.0, prototxt=DNN_PROTOTXT_PATH, weights=DNN_WEIGHTS_PATH, confidence=0.5):
+        super().__init__(scale)
+        for path in (prototxt, weights):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"DNN face detector file not found at: {path}")
+        self._net = cv2.dnn.readNetFromCaffe(prototxt, weights)
+        self.confidence = float(confidence)
+        # cv2.dnn.Net keeps per-call state, so concurrent callers are serialised
+        self._lock = native_lock()
+
+    def _detect(self, gray):
+        h, w = gray.shape[:2]
+        bgr = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        blob = cv2.dnn.blobFromImage(bgr, 1.0, (300, 300), (104.0, 177.0, 123.0))
+        with self._lock:
+            self._net.setInput(blob)
+            detections = self._net.forward()
+
+        boxes = []
+        for det in detections[0, 0]:
+            if float(det[2]) < self.confidence:
+                continue
+            x1, y1 = max(0, int(det[3] * w)), max(0, int(det[4] * h))
+            x2, y2 = min(w, int(det[5] * w)), min(h, int(det[6] * h))
+            if x2 > x1 and y2 > y1:
+                boxes.append((x1, y1, x2 - x1, y2 - y1))
+        return boxes
+
+
+FACE_DETECTORS = {
+    "haar": HaarFaceDetector,
+    "hog": DlibHogFaceDetector,
+    "dnn": DnnFaceDetector,
+}
+
+
+def create_face_detector(backend=None, scale=None, default="haar", **kwargs):
+    """
+    Build the detector chosen for this deployment.
+    FACE_DETECTOR_BACKEND (haar | hog | dnn) overrides the caller's default;
+    FACE_DETECT_SCALE sets the downscale applied before detection; unset,
+    each backend uses its default_scale (0.5, or 1.0 for dlib HOG).
+    """
+    backend = backend or os.getenv("FACE_DETECTOR_BACKEND") or default
+    if backend not in FACE_DETECTORS:
+        raise ValueError(f"Unsupported face detector backend: {backend}")
+    detector_class = FACE_DETECTORS[backend]
+    if scale is None:
+        scale = float(os.getenv("FACE_DETECT_SCALE") or detector_class.default_scale)
+    return detector_class(scale=scale, **kwargs)
+
+
+def to_dlib_rectangles(boxes):
+    """(x, y, w, h) boxes -> dlib.rectangle, for the landmark predictor and tracker."""
+    import dlib
+
+    return [dlib.rectangle(x, y, x + w - 1, y + h - 1) for x, y, w, h in boxes]
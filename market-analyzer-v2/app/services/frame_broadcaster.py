@@ -0,0 +1,93 @@
+# app/services/frame_broadcaster.py
+
+import threading
+
+import cv2
+
+
+class FrameBroadcaster:
+    """
+    Encode-once MJPEG fan-out for /video_feed.
+
+    The capture thread publishes raw frames; each new frame gets a sequence
+    number. Viewers block on a condition until a newer sequence exists, and the
+    first viewer to need a frame JPEG-encodes it for everybody else, so N open
+    dashboards cost one imencode per frame (and none when nobody is watching).
+    """
+
+    BOUNDARY = b"--frame\r\nContent-Type: image/jpeg\r\n\r\n"
+
+    def __init__(self, encode_params=None, wait_timeout=1.0):
+        self.encode_params = encode_params or []
+        self.wait_timeout = wait_timeout
+        self._cond = threading.Condition()
+        self._encode_lock = threading.Lock()
+        self._frame = None
+        self._seq = 0
+        self._jpeg = None
+        self._jpeg_seq = 0
+        self._closed = False
+        self.published = 0
+        self.encodes = 0
+        self.viewers = 0
+
+    def publish(self, frame):
+        """Store the newest raw frame and wake every waiting viewer."""
+        with self._cond:
+            self._frame = frame
+            self._seq += 1
+            self.published += 1
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def wait_for_frame(self, last_seq):
+        """
+        Block until a frame newer than `last_seq` exists.
+        Returns (seq, jpeg_bytes), or (last_seq, None) on timeout/failure.
+        """
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: self._seq > last_seq or self._closed, self.wait_timeout
+            )
+            if not ready or self._closed:
+                return last_seq, None
+            seq, frame = self._seq, self._frame
+        return self._encoded(seq, frame)
+
+    def _encoded(self, seq, frame):
+        with self._encode_lock:
+            if self._jpeg_seq < seq:
+                ok, buf = cv2.imencode(".jpg", frame, self.encode_params)
+                if not ok:
+                    return seq, None
+                self._jpeg = buf.tobytes()
+                self._jpeg_seq = seq
+                self.encodes += 1
+            return self._jpeg_seq, self._jpeg
+
+    def frames(self):
+        """Multipart MJPEG generator for one viewer."""
+        with self._cond:
+            self.viewers += 1
+        try:
+            last_seq = 0
+            while not self._closed:
+                last_seq, jpeg = self.wait_for_frame(last_seq)
+                if jpeg is None:
+                    continue
+                yield self.BOUNDARY + jpeg + b"\r\n"
+        finally:
+            with self._cond:
+                self.viewers -= 1
+
+    def stats(self) -> dict:
+        return {
+            "sequence": self._seq,
+            "published": self.published,
+            "encodes": self.encodes,
+            "viewers": self.viewers,
+        }
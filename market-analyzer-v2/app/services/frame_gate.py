@@ -0,0 +1,158 @@
+# app/services/frame_gate.py
+
+import threading
+import time
+
+
+class _Session:
+    __slots__ = ("busy", "pending", "dropped", "dropped_since_ack", "latency", "interval")
+
+    def __init__(self, interval):
+        self.busy = False
+        self.pending = None
+        self.dropped = 0
+        self.dropped_since_ack = 0
+        self.latency = None
+        self.interval = interval
+
+
+class LatestFrameGate:
+    """
+    Per-session backpressure for socket frame ingest.
+
+    At most one frame per session is analysed at a time and at most one more
+    waits: a frame that arrives while the session is busy replaces the waiting
+    one, so a slow model drops stale frames instead of queueing them and
+    latency stays bounded by ~2 analysis times. The thread that is already
+    analysing picks up the newest waiting frame when it finishes; the others
+    return immediately.
+
+    Each session also gets a suggested send interval: it backs off
+    multiplicatively when frames are dropped and drifts back towards
+    `headroom` x the measured analysis time when they are not, never below
+    `min_interval` (by default the clients' original 1 frame per second).
+
+    A frame whose analysis raises is reported through `on_error(exc, ack)`
+    (the ack carries an "error" field and leaves the timing state alone),
+    and the session goes on to the newest waiting frame.
+    """
+
+    def __init__(self, min_interval=1.0, max_interval=5.0, initial_interval=1.0,
+                 headroom=1.5, backoff=1.5, smoothing=0.3):
+        self.min_interval = float(min_interval)
+        self.max_interval = float(max_interval)
+        self.initial_interval = float(initial_interval)
+        self.headroom = float(headroom)
+        self.backoff = float(backoff)
+        self.smoothing = float(smoothing)
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+        self.accepted = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def submit(self, sid, frame, analyze, on_done=None, on_error=None):
+        """
+        Offer `frame` for session `sid`. If the session is idle, runs
+        `analyze(frame)` on this thread, then any frames that arrived
+        meanwhile (newest only), calling `on_done(result, ack)` after each,
+        or `on_error(exc, ack)` when `analyze` raised.
+        A parked frame keeps its own callables, so different kinds of frames
+        (video frames, face crops) can share one session.
+        Returns False when the frame was parked for the running thread.
+        """
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is None:
+                session = self._sessions[sid] = _Session(self.initial_interval)
+            if session.busy:
+                if session.pending is not None:
+                    session.dropped += 1
+                    session.dropped_since_ack += 1
+                    self.dropped += 1
+                session.pending = (frame, analyze, on_done, on_error)
+                return False
+            session.busy = True
+            self.accepted += 1
+
+        while True:
+            started = time.perf_counter()
+            error = None
+            try:
+                result = analyze(frame)
+            except Exception as e:
+                error = e
+            elapsed = time.perf_counter() - started
+
+            with self._lock:
+                if error is None:
+                    ack = self._ack(session, elapsed)
+                else:
+                    self.errors += 1
+                    ack = self._error_ack(session, error)
+                pending, session.pending = session.pending, None
+                if pending is None:
+                    session.busy = False
+                else:
+                    self.accepted += 1
+
+            try:
+                if error is not None:
+                    if on_error is not None:
+                        on_error(error, ack)
+                    else:
+                        print(f"[ERROR] Frame analysis failed for {sid}: {error}")
+                elif on_done is not None:
+                    on_done(result, ack)
+            except Exception as e:
+                print(f"[ERROR] Frame callback failed for {sid}: {e}")
+            if pending is None:
+                return True
+            frame, analyze, on_done, on_error = pending
+
+    def _ack(self, session, elapsed):
+        """Update the session's timing state and build its frame_ack payload (lock held)."""
+        if session.latency is None:
+            session.latency = elapsed
+        else:
+            session.latency += self.smoothing * (elapsed - session.latency)
+
+        if session.dropped_since_ack:
+            session.interval *= self.backoff
+        else:
+            target = self.headroom * session.latency
+            session.interval = max(target, session.interval - self.smoothing * (session.interval - target))
+        session.interval = min(self.max_interval, max(self.min_interval, session.interval))
+
+        ack = {
+            "latency_ms": round(elapsed * 1000.0, 1),
+            "dropped": session.dropped_since_ack,
+            "suggested_interval_ms": int(session.interval * 1000),
+        }
+        session.dropped_since_ack = 0
+        return ack
+
+    def _error_ack(self, session, error):
+        """frame_ack payload for a failed frame; timing state is not updated (lock held)."""
+        ack = {
+            "error": str(error),
+            "dropped": session.dropped_since_ack,
+            "suggested_interval_ms": int(session.interval * 1000),
+        }
+        session.dropped_since_ack = 0
+        return ack
+
+    def drop_session(self, sid):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "busy_sessions": sum(1 for s in self._sessions.values() if s.busy),
+                "accepted": self.accepted,
+                "dropped": self.dropped,
+                "errors": self.errors,
+            }
@@ -0,0 +1,217 @@
+# app/services/frame_worker_pool.py
+
+import multiprocessing
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+# Backends whose loaded model survives fork(), so the parent loads it once
+# and the workers share its pages. TensorFlow and ONNX Runtime keep internal
+# thread pools that do not survive fork; with those, each worker loads its own.
+FORK_SAFE_BACKENDS = ("tflite",)
+
+# Per-process state of a worker, filled in by _init_worker
+_worker = {}
+
+
+def _init_worker(model_path, cache_settings):
+    from app.services.inference_cache import PerceptualHashCache
+    from app.services.model_registry import model_registry
+    from app.services.stress_model_service import load_face_detector, prepare_face_input
+
+    # A model the parent loaded before forking is found in the inherited
+    # registry; otherwise the worker loads its own copy here
+    predictor = model_registry.get_predictor(model_path)
+    if hasattr(predictor, "_lock"):
+        # the parent may have been mid-call on another thread at fork time
+        predictor._lock = threading.Lock()
+
+    face_detector = load_face_detector()
+    _worker["predictor"] = predictor
+    _worker["prepare_face"] = lambda image_data: prepare_face_input(image_data, face_detector)
+    _worker["cache"] = PerceptualHashCache(**cache_settings)
+
+
+def _analyze_frame(image_data, scope):
+    """
+    Worker side of FrameWorkerPool.analyze: decode, detect, crop and infer.
+    Returns (float32 emotion vector as bytes, None, cache_hit) or
+    (None, fallback_stress, False); a few dozen bytes go back over the pipe.
+    """
+    face_input, fallback = _worker["prepare_face"](image_data)
+    if face_input is None:
+        return None, fallback, False
+    return _infer(face_input, scope)
+
+
+def _analyze_crop(crop, scope):
+    """Worker side of FrameWorkerPool.analyze_crop: a client-side 64x64 crop, inference only."""
+    from app.services.stress_model_service import face_input_from_crop
+
+    return _infer(face_input_from_crop(crop), scope)
+
+
+def _infer(face_input, scope):
+    cache = _worker["cache"]
+    key = cache.key(face_input) if cache.enabled else None
+    predictions = cache.get(key, scope) if key is not None else None
+    hit = predictions is not None
+    if not hit:
+        predictions = _worker["predictor"](face_input[np.newaxis, ...])[0]
+        if key is not None:
+            cache.put(key, predictions, scope)
+    return np.asarray(predictions, dtype=np.float32).tobytes(), None, hit
+
+
+class FrameWorkerPool:
+    """
+    Runs the CPU-heavy frame path of StressModelService (imdecode, face
+    detection, resize, inference) in worker processes, so it scales across
+    cores instead of competing for the GIL with the HTTP and Socket.IO threads.
+
+    There is one single-process executor per worker and frames are routed by
+    a hash of their scope (client sid), so one client's frames stay in order
+    on one worker and hit that worker's perceptual-hash cache. Frames cross
+    the pipe as the encoded bytes the client sent; results come back as a
+    float32 vector.
+
+    Workers are forked by default, which requires start() to run before the
+    parent starts threads or TensorFlow. "spawn" / "forkserver" re-import the
+    __main__ module in each worker, so they only suit import-safe entry points.
+
+    Every call waits at most `timeout` seconds. A worker that dies (OOM kill,
+    native crash) breaks its executor; the call that saw it fails and the
+    executor is replaced, so later frames for that worker are served again.
+    Restarts, timeouts and workers that could not be restarted show in stats().
+    """
+
+    def __init__(self, processes, model_path, start_method=None, cache_settings=None,
+                 timeout=10.0):
+        self.processes = max(1, int(processes))
+        self.model_path = model_path
+        if start_method is None:
+            start_method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        self.start_method = start_method
+        self.cache_settings = dict(cache_settings or {})
+        self.timeout = float(timeout) if timeout else None
+        self._executors = []
+        self._lock = threading.Lock()
+
+        self.submitted = [0] * self.processes
+        self.restarts = [0] * self.processes
+        self.broken = set()
+        self.last_error = None
+        self.completed = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    def start(self):
+        """Start the worker processes; each loads (or inherits) the model in its initializer."""
+        with self._lock:
+            if self._executors:
+                return
+            self._executors = [self._new_executor() for _ in range(self.processes)]
+        print(f"[OK] Frame worker pool: {self.processes} process(es) ({self.start_method})")
+
+    def _new_executor(self):
+        executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_init_worker,
+            initargs=(self.model_path, self.cache_settings),
+        )
+        # Processes start on first submit; a no-op brings them up now
+        executor.submit(int)
+        return executor
+
+    def _replace(self, index, broken):
+        """Swap a broken executor for a fresh one (unless another caller already did)."""
+        with self._lock:
+            if self._executors[index] is not broken:
+                return
+            try:
+                self._executors[index] = self._new_executor()
+            except Exception as e:
+                # the broken executor stays, so the next call retries the restart
+                self.broken.add(index)
+                self.last_error = f"worker {index}: restart failed: {e}"
+                print(f"[ERROR] Frame worker {index} could not be restarted: {e}")
+                return
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.broken.discard(index)
+            self.restarts[index] += 1
+        print(f"[WARNING] Frame worker {index} died and was restarted")
+
+    def _route(self, scope) -> int:
+        if scope is None:
+            return min(range(self.processes), key=self.submitted.__getitem__)
+        return zlib.crc32(str(scope).encode("utf-8")) % self.processes
+
+    def analyze(self, image_data, scope=None, timeout=None):
+        """
+        Blocking: returns (emotion_probabilities, None) when a face was found,
+        else (None, fallback_stress), like StressModelService._prepare_face.
+        Raises FutureTimeoutError after `timeout` (default self.timeout) and
+        BrokenProcessPool when the worker died.
+        """
+        return self._call(_analyze_frame, bytes(image_data), scope, timeout)
+
+    def analyze_crop(self, crop, scope=None, timeout=None):
+        """Blocking: (emotion_probabilities, None) for a client-side 64x64 face crop."""
+        return self._call(_analyze_crop, bytes(crop), scope, timeout)
+
+    def _call(self, fn, payload, scope, timeout):
+        if not self._executors:
+            self.start()
+        with self._lock:
+            index = self._route(scope)
+            self.submitted[index] += 1
+            executor = self._executors[index]
+        future = None
+        try:
+            future = executor.submit(fn, payload, scope)
+            raw, fallback, hit = future.result(timeout or self.timeout)
+        except Exception as e:
+            with self._lock:
+                self.errors += 1
+                self.last_error = f"worker {index}: {type(e).__name__}: {e}"
+                if isinstance(e, FutureTimeoutError):
+                    self.timeouts += 1
+            if isinstance(e, FutureTimeoutError):
+                future.cancel()
+            elif isinstance(e, BrokenProcessPool):
+                self._replace(index, executor)
+            raise
+        with self._lock:
+            self.completed += 1
+            if hit:
+                self.cache_hits += 1
+        if raw is None:
+            return None, fallback
+        return np.frombuffer(raw, dtype=np.float32), None
+
+    def shutdown(self):
+        with self._lock:
+            for executor in self._executors:
+                executor.shutdown(wait=False, cancel_futures=True)
+            self._executors = []
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "processes": self.processes,
+                "start_method": self.start_method,
+                "submitted_per_worker": list(self.submitted),
+                "restarts_per_worker": list(self.restarts),
+                "broken_workers": sorted(self.broken),
+                "completed": self.completed,
+                "cache_hits": self.cache_hits,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "timeout_s": self.timeout,
+                "last_error": self.last_error,
+            }
@@ -0,0 +1,159 @@
+# app/services/inference_backends.py
+
+import os
+
+import numpy as np
+
+from app.services.executors import native_lock
+
+
+class KerasBackend:
+    """
+    Keras inference with a low-latency path for small batches.
+
+    `model.predict()` builds a data adapter, callbacks and a fresh execution
+    loop on every call, which costs more than mini_XCEPTION's convolutions on a
+    single 64x64 crop. Batches up to `max_fast_batch` therefore go through a
+    `tf.function` traced once with a fixed (None, H, W, C) float32 signature;
+    larger batches still use `predict()`, which streams them in chunks.
+    """
+
+    name = "keras"
+
+    def __init__(self, model, max_fast_batch=64):
+        import tensorflow as tf
+
+        self.model = model
+        self.max_fast_batch = int(max_fast_batch)
+        self.input_shape = tuple(model.input_shape[1:])
+        spec = tf.TensorSpec(shape=(None,) + self.input_shape, dtype=tf.float32)
+        self._compiled = tf.function(
+            lambda x: model(x, training=False), input_signature=[spec]
+        )
+
+    def predict(self, batch):
+        """Run a (N, H, W, C) float32 batch; returns an (N, classes) ndarray."""
+        batch = np.asarray(batch, dtype=np.float32)
+        if len(batch) <= self.max_fast_batch:
+            return self._compiled(batch).numpy()
+        return self.model.predict(batch, verbose=0)
+
+    __call__ = predict
+
+
+class TFLiteBackend:
+    """
+    TensorFlow Lite interpreter backend (float or full-int8 models).
+
+    Uses the small `tflite_runtime` wheel when installed and falls back to
+    `tf.lite`. The interpreter is not thread-safe, so calls are serialised;
+    int8 inputs/outputs are (de)quantised here so callers always deal in
+    float32 probabilities.
+    """
+
+    name = "tflite"
+
+    def __init__(self, model_path, num_threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+
+            Interpreter = tf.lite.Interpreter
+
+        self.model_path = model_path
+        self._interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self.input_shape = tuple(int(d) for d in self._input["shape"][1:])
+        self._batch_size = int(self._input["shape"][0])
+        self._lock = native_lock()
+
+    def _resize(self, batch_size):
+        if batch_size == self._batch_size:
+            return
+        self._interpreter.resize_tensor_input(
+            self._input["index"], (batch_size,) + self.input_shape
+        )
+        self._interpreter.allocate_tensors()
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = batch_size
+
+    @staticmethod
+    def _quantize(batch, details):
+        scale, zero_point = details["quantization"]
+        info = np.iinfo(details["dtype"])
+        q = np.round(batch / scale + zero_point)
+        return np.clip(q, info.min, info.max).astype(details["dtype"])
+
+    @staticmethod
+    def _dequantize(values, details):
+        scale, zero_point = details["quantization"]
+        return (values.astype(np.float32) - zero_point) * scale
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        with self._lock:
+            self._resize(len(batch))
+            if self._input["dtype"] != np.float32:
+                batch = self._quantize(batch, self._input)
+            self._interpreter.set_tensor(self._input["index"], batch)
+            self._interpreter.invoke()
+            out = self._interpreter.get_tensor(self._output["index"])
+            if self._output["dtype"] != np.float32:
+                out = self._dequantize(out, self._output)
+            return np.array(out, dtype=np.float32)
+
+    __call__ = predict
+
+
+class OnnxBackend:
+    """ONNX Runtime CPU backend; InferenceSession.run is safe to call concurrently."""
+
+    name = "onnx"
+
+    def __init__(self, model_path, num_threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = int(num_threads)
+        self.model_path = model_path
+        self._session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+        self.input_shape = tuple(int(d) for d in model_input.shape[1:])
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        return self._session.run(None, {self._input_name: batch})[0]
+
+    __call__ = predict
+
+
+BACKENDS = {
+    "keras": KerasBackend,
+    "tflite": TFLiteBackend,
+    "onnx": OnnxBackend,
+}
+
+# File suffix of the converted artifact for each non-Keras backend
+ARTIFACT_SUFFIXES = {
+    "tflite": ".tflite",
+    "onnx": ".onnx",
+}
+
+
+def artifact_path(keras_path, backend, quantized=False):
+    """
+    Where scripts/convert_models.py writes the `backend` version of a .hdf5
+    checkpoint, e.g. _mini_XCEPTION.102-0.66.int8.tflite next to the original.
+    """
+    if backend == "keras":
+        return keras_path
+    stem, _ = os.path.splitext(keras_path)
+    return stem + (".int8" if quantized else "") + ARTIFACT_SUFFIXES[backend]
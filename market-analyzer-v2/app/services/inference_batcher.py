@@ -0,0 +1,103 @@
+# app/services/inference_batcher.py
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+import numpy as np
+
+
+class InferenceBatcher:
+    """
+    Micro-batching front end for a model.
+
+    Callers submit one input at a time from any thread. A single worker thread
+    collects whatever arrives within `window_ms` of the first queued item (or
+    until `max_batch` items are waiting), runs one batched forward pass and
+    resolves every caller's Future with its own row of the output.
+    """
+
+    def __init__(self, predict_batch, max_batch=32, window_ms=10.0, name="INFERENCE_BATCHER"):
+        self.predict_batch = predict_batch
+        self.max_batch = max(1, int(max_batch))
+        self.window = max(0.0, float(window_ms)) / 1000.0
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name=self.name)
+                self._thread.start()
+
+    def submit(self, x) -> Future:
+        """Queue one input (without batch dimension); returns a Future of its output row."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((x, future))
+        return future
+
+    def predict(self, x, timeout=None):
+        """
+        Blocking convenience wrapper around submit(). Raises TimeoutError
+        after `timeout` seconds; the input is then withdrawn if the worker
+        has not picked it up yet.
+        """
+        future = self.submit(x)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    # window closed: still take anything already waiting
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        # drop inputs whose caller timed out; the rest can no longer be cancelled
+        return [item for item in batch if item[1].set_running_or_notify_cancel()]
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                continue
+            try:
+                outputs = self.predict_batch(np.stack([x for x, _ in batch]))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for (_, future), output in zip(batch, outputs):
+                future.set_result(output)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "queued": self._queue.qsize(),
+        }
@@ -0,0 +1,121 @@
+# app/services/inference_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def dhash(image, hash_size=8) -> int:
+    """
+    Difference hash of a grayscale image as a `hash_size`**2-bit int.
+    The image is shrunk to (hash_size + 1) x hash_size and each bit records
+    whether a pixel is brighter than its right-hand neighbour, so small
+    shifts in exposure, noise and JPEG artefacts leave most bits unchanged.
+    """
+    image = np.asarray(image)
+    if image.ndim == 3:
+        image = image[..., 0] if image.shape[-1] == 1 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class PerceptualHashCache:
+    """
+    LRU cache of model outputs keyed by a perceptual hash of the face ROI.
+
+    A lookup hits when a live entry in the same `scope` (e.g. one client)
+    has a hash within `max_distance` bits of the query; entries expire after
+    `ttl_seconds` so a slow drift in expression is still picked up.
+    `max_entries` is small, so the near-match scan is a few hundred XORs.
+    Unscoped lookups (scope None) only hit on an identical hash: callers
+    that share the None scope may be different people, and a near match
+    would hand one of them the other's result.
+    """
+
+    def __init__(self, max_entries=128, max_distance=6, ttl_seconds=1.0, hash_size=8):
+        self.max_entries = int(max_entries)
+        self.max_distance = int(max_distance)
+        self.ttl_seconds = float(ttl_seconds)
+        self.hash_size = int(hash_size)
+        self._entries = OrderedDict()  # (scope, hash) -> (stored_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def key(self, roi) -> int:
+        return dhash(roi, self.hash_size)
+
+    def get(self, key, scope=None, now=None):
+        """Cached value for `key` (an int from .key()), or None on a miss."""
+        if not self.enabled:
+            return None
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            found = self._entries.get((scope, key))
+            match = (scope, key) if found is not None else None
+            if match is None and scope is not None and self.max_distance > 0:
+                for entry_key, entry in self._entries.items():
+                    if entry_key[0] == scope and hamming(entry_key[1], key) <= self.max_distance:
+                        match, found = entry_key, entry
+                        break
+
+            if match is not None and now - found[0] > self.ttl_seconds:
+                del self._entries[match]
+                match = None
+
+            if match is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(match)
+            self.hits += 1
+            return found[1]
+
+    def put(self, key, value, scope=None, now=None):
+        if not self.enabled:
+            return
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            self._entries[(scope, key)] = (now, value)
+            self._entries.move_to_end((scope, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self, scope=None):
+        """Drop every entry, or only those belonging to `scope`."""
+        with self._lock:
+            if scope is None:
+                self._entries.clear()
+            else:
+                for entry_key in [k for k in self._entries if k[0] == scope]:
+                    del self._entries[entry_key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "max_distance": self.max_distance,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,115 @@
+# app/services/inference_scheduler.py
+
+import time
+
+import cv2
+import numpy as np
+
+
+class AdaptiveInferenceScheduler:
+    """
+    Decides which captured frames are worth sending to inference.
+
+    The frame stride is derived at runtime from what we measure instead of a
+    fixed "every 3rd frame" rule:
+
+        interval = max(1 / target_hz, inference_time / cpu_budget)
+        stride   = interval / capture_interval
+
+    so a fast workstation reaches the target update rate while a weak thin
+    client backs off until inference only uses `cpu_budget` of one core.
+    Frames whose downscaled thumbnail barely differs from the last analysed
+    one are skipped too, except that a frame is always analysed after
+    `max_idle_seconds` so clients keep receiving updates.
+    """
+
+    THUMB_SIZE = (32, 24)
+
+    def __init__(self, target_hz=5.0, cpu_budget=0.5, change_threshold=2.0,
+                 max_idle_seconds=1.0, smoothing=0.2):
+        self.target_hz = max(0.1, float(target_hz))
+        self.cpu_budget = min(1.0, max(0.01, float(cpu_budget)))
+        self.change_threshold = float(change_threshold)
+        self.max_idle_seconds = float(max_idle_seconds)
+        self.smoothing = smoothing
+
+        self.stride = 1
+        self.capture_interval = None
+        self.inference_seconds = None
+
+        self._last_capture = None
+        self._last_scheduled = 0.0
+        self._last_thumb = None
+        self._since_scheduled = 0
+
+        self.offered = 0
+        self.scheduled = 0
+        self.skipped_stride = 0
+        self.skipped_static = 0
+
+    def _ema(self, current, sample):
+        if current is None:
+            return sample
+        return current + self.smoothing * (sample - current)
+
+    def _recompute_stride(self):
+        if not self.capture_interval:
+            return
+        interval = 1.0 / self.target_hz
+        if self.inference_seconds:
+            interval = max(interval, self.inference_seconds / self.cpu_budget)
+        self.stride = max(1, int(round(interval / self.capture_interval)))
+
+    def offer(self, frame, now=None) -> bool:
+        """Called by the capture stage for every frame; True = run inference."""
+        now = time.perf_counter() if now is None else now
+        self.offered += 1
+        if self._last_capture is not None:
+            self.capture_interval = self._ema(self.capture_interval, now - self._last_capture)
+            self._recompute_stride()
+        self._last_capture = now
+
+        self._since_scheduled += 1
+        if self._since_scheduled < self.stride:
+            self.skipped_stride += 1
+            return False
+
+        thumb = self._thumbnail(frame)
+        idle = now - self._last_scheduled
+        if (
+            self._last_thumb is not None
+            and idle < self.max_idle_seconds
+            and float(np.mean(cv2.absdiff(thumb, self._last_thumb))) < self.change_threshold
+        ):
+            self.skipped_static += 1
+            return False
+
+        self._last_thumb = thumb
+        self._last_scheduled = now
+        self._since_scheduled = 0
+        self.scheduled += 1
+        return True
+
+    def record_inference(self, seconds):
+        """Called by the inference stage with the measured analysis latency."""
+        self.inference_seconds = self._ema(self.inference_seconds, seconds)
+        self._recompute_stride()
+
+    def _thumbnail(self, frame):
+        thumb = cv2.resize(frame, self.THUMB_SIZE, interpolation=cv2.INTER_AREA)
+        if thumb.ndim == 3:
+            thumb = cv2.cvtColor(thumb, cv2.COLOR_BGR2GRAY)
+        return thumb
+
+    def stats(self) -> dict:
+        return {
+            "target_hz": self.target_hz,
+            "cpu_budget": self.cpu_budget,
+            "stride": self.stride,
+            "capture_fps": round(1.0 / self.capture_interval, 2) if self.capture_interval else None,
+            "inference_ms": round(self.inference_seconds * 1000.0, 2) if self.inference_seconds else None,
+            "offered": self.offered,
+            "scheduled": self.scheduled,
+            "skipped_stride": self.skipped_stride,
+            "skipped_static": self.skipped_static,
+        }
@@ -0,0 +1,240 @@
+# app/services/live_pipeline.py
+
+import threading
+import time
+from collections import deque
+
+
+class LatestQueue:
+    """
+    Bounded hand-off queue that never blocks the producer.
+    When full, the oldest item is dropped so consumers always see fresh data.
+    """
+
+    def __init__(self, maxsize=1):
+        self._items = deque(maxlen=max(1, int(maxsize)))
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item) -> bool:
+        """Enqueue `item`; returns True when an older item had to be dropped."""
+        with self._cond:
+            dropped = len(self._items) == self._items.maxlen
+            if dropped:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+            return dropped
+
+    def get(self, timeout=None):
+        """Pop the oldest queued item, or None after `timeout` seconds."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items, timeout):
+                return None
+            return self._items.popleft()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class StageStats:
+    """Per-stage counters: items, errors and latency (last + moving average)."""
+
+    def __init__(self, name, smoothing=0.1):
+        self.name = name
+        self.smoothing = smoothing
+        self.items = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.last_ms = 0.0
+        self.avg_ms = 0.0
+
+    def record(self, seconds):
+        ms = seconds * 1000.0
+        self.items += 1
+        self.busy_seconds += seconds
+        self.last_ms = ms
+        if self.items == 1:
+            self.avg_ms = ms
+        else:
+            self.avg_ms += self.smoothing * (ms - self.avg_ms)
+
+    def snapshot(self) -> dict:
+        return {
+            "items": self.items,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "last_ms": round(self.last_ms, 2),
+            "avg_ms": round(self.avg_ms, 2),
+        }
+
+
+class LiveStressPipeline:
+    """
+    Capture -> inference -> emit, each on its own thread.
+
+    - capture: reads the camera, hands every frame to `on_frame` (video feed)
+      and the frames the `scheduler` accepts (or, without one, every
+      `frame_stride`-th frame) to the inference queue.
+    - track (optional): runs `track(frame)` on the newest captured frame,
+      before the scheduler's skip gate, for signals that need camera-rate
+      sampling (blinks). Its own queue of one keeps it from stalling capture.
+    - inference: always takes the newest frame (queue of one, drop-oldest),
+      runs `analyze(frame)` and queues the payload it returns, if any.
+    - emit: sends payloads with `emit(payload)`.
+
+    A slow model therefore only lowers the stress-update rate; it never stalls
+    the capture loop or the MJPEG feed.
+    """
+
+    def __init__(self, read_frame, analyze, emit, on_frame=None,
+                 frame_stride=1, scheduler=None, emit_queue_size=8, track=None):
+        self.read_frame = read_frame
+        self.analyze = analyze
+        self.emit = emit
+        self.on_frame = on_frame
+        self.track = track
+        self.frame_stride = max(1, int(frame_stride))
+        self.scheduler = scheduler
+
+        self.inference_queue = LatestQueue(maxsize=1)
+        self.track_queue = LatestQueue(maxsize=1)
+        self.emit_queue = LatestQueue(maxsize=emit_queue_size)
+
+        self.capture_stats = StageStats("capture")
+        self.track_stats = StageStats("track")
+        self.inference_stats = StageStats("inference")
+        self.emit_stats = StageStats("emit")
+        # How old a frame is by the time inference picks it up
+        self.frame_age = StageStats("frame_age")
+
+        self._running = threading.Event()
+        self._threads = []
+
+    # ---- lifecycle ----
+    def start(self):
+        self._running.set()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, daemon=True, name="LIVE_CAPTURE"),
+            threading.Thread(target=self._inference_loop, daemon=True, name="LIVE_INFERENCE"),
+            threading.Thread(target=self._emit_loop, daemon=True, name="LIVE_EMIT"),
+        ]
+        if self.track is not None:
+            self._threads.append(
+                threading.Thread(target=self._track_loop, daemon=True, name="LIVE_TRACK")
+            )
+        for t in self._threads:
+            t.start()
+
+    def stop(self):
+        self._running.clear()
+
+    def join(self, timeout=None):
+        for t in self._threads:
+            t.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._running.is_set()
+
+    # ---- stages ----
+    def _capture_loop(self):
+        frame_count = 0
+        while self._running.is_set():
+            started = time.perf_counter()
+            ok, frame = self.read_frame()
+            if ok is None:
+                # source closed
+                break
+            if not ok or frame is None:
+                self.capture_stats.errors += 1
+                time.sleep(0.1)
+                continue
+
+            if self.on_frame is not None:
+                self.on_frame(frame)
+            if self.track is not None:
+                self.track_queue.put(frame)
+
+            frame_count += 1
+            if self.scheduler is not None:
+                wanted = self.scheduler.offer(frame)
+            else:
+                wanted = frame_count % self.frame_stride == 0
+            if wanted:
+                self.inference_queue.put((time.perf_counter(), frame))
+            self.capture_stats.record(time.perf_counter() - started)
+
+        self._running.clear()
+
+    def _track_loop(self):
+        while self._running.is_set():
+            frame = self.track_queue.get(timeout=0.5)
+            if frame is None:
+                continue
+            started = time.perf_counter()
+            try:
+                self.track(frame)
+            except Exception as e:
+                self.track_stats.errors += 1
+                print(f"⚠️ Tracking error: {e}")
+                continue
+            self.track_stats.record(time.perf_counter() - started)
+
+    def _inference_loop(self):
+        while self._running.is_set():
+            item = self.inference_queue.get(timeout=0.5)
+            if item is None:
+                continue
+            captured_at, frame = item
+            started = time.perf_counter()
+            self.frame_age.record(started - captured_at)
+            try:
+                payload = self.analyze(frame)
+            except Exception as e:
+                self.inference_stats.errors += 1
+                print(f"⚠️ Model error: {e}")
+                continue
+            elapsed = time.perf_counter() - started
+            self.inference_stats.record(elapsed)
+            if self.scheduler is not None:
+                self.scheduler.record_inference(elapsed)
+            if payload is not None:
+                self.emit_queue.put(payload)
+
+    def _emit_loop(self):
+        while self._running.is_set():
+            payload = self.emit_queue.get(timeout=0.5)
+            if payload is None:
+                continue
+            started = time.perf_counter()
+            try:
+                self.emit(payload)
+            except Exception as e:
+                self.emit_stats.errors += 1
+                print(f"⚠️ Emit error: {e}")
+                continue
+            self.emit_stats.record(time.perf_counter() - started)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "frame_stride": self.frame_stride,
+            "scheduler": self.scheduler.stats() if self.scheduler is not None else None,
+            "capture": self.capture_stats.snapshot(),
+            "track": dict(
+                self.track_stats.snapshot(),
+                dropped_frames=self.track_queue.dropped,
+            ) if self.track is not None else None,
+            "inference": dict(
+                self.inference_stats.snapshot(),
+                queued=len(self.inference_queue),
+                dropped_frames=self.inference_queue.dropped,
+            ),
+            "emit": dict(
+                self.emit_stats.snapshot(),
+                queued=len(self.emit_queue),
+                dropped_payloads=self.emit_queue.dropped,
+            ),
+            "frame_age": self.frame_age.snapshot(),
+        }
@@ -0,0 +1,264 @@
+# app/services/log_writer.py
+
+import atexit
+import os
+import threading
+import time
+from collections import deque
+
+from app.services.executors import offload
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+
+class StressLogWriter:
+    """
+    Write-behind buffer for stress logs and alerts.
+
+    Request threads only append (collection, document) pairs to a bounded
+    in-memory queue; one background thread drains it with
+    insert_many(ordered=False) per collection once `batch_size` documents are
+    waiting or `flush_interval` seconds have passed, so request latency no
+    longer includes a database round trip.
+
+    When the queue holds `max_queue` documents, `overflow` decides:
+    - "drop_oldest": evict the oldest waiting document (default; keeps recent data)
+    - "drop_newest": reject the new document
+    - "block": wait up to `block_timeout` seconds for room, then reject it
+    Every dropped or failed document is counted in stats().
+
+    Anything still queued is flushed on close(), which is registered with
+    atexit. `max_queue=0` disables buffering: documents are written
+    synchronously with insert_one, as before.
+    """
+
+    def __init__(self, mongo, max_queue=10000, batch_size=500, flush_interval=1.0,
+                 overflow="drop_oldest", block_timeout=0.5, name="STRESS_LOG_WRITER"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {', '.join(OVERFLOW_POLICIES)}, got {overflow!r}")
+        self.mongo = mongo
+        self.max_queue = int(max_queue)
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.overflow = overflow
+        self.block_timeout = float(block_timeout)
+        self.name = name
+
+        self._queue = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._thread = None
+        self._closed = False
+        self._writing = 0  # documents taken off the queue but not yet written
+
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_queue > 0
+
+    def submit(self, collection: str, document: dict) -> bool:
+        """Queue one document for `collection`; False if it was dropped."""
+        if not self.enabled:
+            return self._write_now(collection, document)
+
+        with self._lock:
+            if self._closed:
+                queued = None
+            else:
+                self.submitted += 1
+                queued = self._enqueue(collection, document)
+        if queued is None:
+            # after shutdown there is no writer thread left to flush the queue
+            return self._write_now(collection, document)
+        if not queued:
+            return False
+
+        self._ensure_thread()
+        return True
+
+    def _enqueue(self, collection, document):
+        """
+        Append under the lock, applying the overflow policy. Returns False when
+        the document was dropped, None when the writer closed while blocking.
+        """
+        if len(self._queue) >= self.max_queue:
+            if self.overflow == "drop_oldest":
+                self._queue.popleft()
+                self.dropped += 1
+            elif self.overflow == "block":
+                deadline = time.monotonic() + self.block_timeout
+                while len(self._queue) >= self.max_queue and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._not_full.wait(remaining)
+                if self._closed:
+                    return None
+                if len(self._queue) >= self.max_queue:
+                    self.dropped += 1
+                    return False
+            else:
+                self.dropped += 1
+                return False
+
+        self._queue.append((collection, document))
+        if len(self._queue) >= self.batch_size:
+            self._not_empty.notify_all()
+        return True
+
+    def submit_many(self, collection: str, documents) -> int:
+        """Queue several documents; returns how many were accepted."""
+        return sum(1 for document in documents if self.submit(collection, document))
+
+    def log(self, result) -> bool:
+        """Queue a StressResult for stressLogs."""
+        return self.submit("stressLogs", result.dict())
+
+    def alert(self, document: dict) -> bool:
+        """Queue an alert document."""
+        return self.submit("alerts", document)
+
+    def _write_now(self, collection, document) -> bool:
+        try:
+            offload("mongo", self.mongo.db[collection].insert_one, document)
+            self.written += 1
+            return True
+        except Exception as e:
+            self.failed += 1
+            print(f"[ERROR] {self.name}: insert into {collection} failed: {e}")
+            return False
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None or self._closed:
+                return
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._closed and len(self._queue) < self.batch_size:
+                    self._not_empty.wait(self.flush_interval)
+                batch = list(self._queue)
+                self._queue.clear()
+                self._writing = len(batch)
+                self._not_full.notify_all()
+                closing = self._closed
+
+            if batch:
+                self._write_batch(batch)
+            with self._lock:
+                self._writing = 0
+                self._not_empty.notify_all()  # wakes flush() waiters
+            if closing:
+                return
+
+    def _write_batch(self, batch):
+        """insert_many per collection, in chunks of batch_size."""
+        by_collection = {}
+        for collection, document in batch:
+            by_collection.setdefault(collection, []).append(document)
+
+        for collection, documents in by_collection.items():
+            for start in range(0, len(documents), self.batch_size):
+                chunk = documents[start:start + self.batch_size]
+                try:
+                    offload("mongo", self.mongo.db[collection].insert_many, chunk, ordered=False)
+                    self.written += len(chunk)
+                except Exception as e:
+                    # BulkWriteError still inserted everything it did not report
+                    details = getattr(e, "details", None) or {}
+                    inserted = details.get("nInserted", 0)
+                    self.written += inserted
+                    self.failed += len(chunk) - inserted
+                    print(f"[ERROR] {self.name}: insert_many into {collection} failed: {e}")
+        self.flushes += 1
+
+    def flush(self, timeout=5.0) -> bool:
+        """Block until everything queued so far is written (or `timeout` passes)."""
+        if self._thread is None:
+            with self._lock:
+                batch = list(self._queue)
+                self._queue.clear()
+            if batch:
+                self._write_batch(batch)
+            return True
+
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while self._queue or self._writing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                # wake the writer without waiting for flush_interval
+                self._not_empty.notify_all()
+                self._not_empty.wait(min(remaining, 0.05))
+        return True
+
+    def close(self, timeout=5.0):
+        """Stop accepting buffered writes and flush what is queued."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+            thread = self._thread
+
+        if thread is not None:
+            thread.join(timeout)
+        else:
+            self.flush()
+        with self._lock:
+            pending = len(self._queue)
+        if pending:
+            print(f"[WARNING] {self.name}: {pending} documents not written on shutdown")
+
+    def stats(self) -> dict:
+        with self._lock:
+            queued = len(self._queue)
+        return {
+            "enabled": self.enabled,
+            "queued": queued,
+            "max_queue": self.max_queue,
+            "overflow": self.overflow,
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_log_writer(mongo) -> StressLogWriter:
+    """
+    The shared writer for a PyMongo handle, created on first use from
+    STRESS_LOG_QUEUE_SIZE (0 = synchronous), STRESS_LOG_BATCH_SIZE,
+    STRESS_LOG_FLUSH_MS and STRESS_LOG_OVERFLOW.
+    """
+    with _writers_lock:
+        writer = _writers.get(id(mongo))
+        if writer is None or writer.mongo is not mongo:
+            writer = StressLogWriter(
+                mongo,
+                max_queue=int(os.getenv("STRESS_LOG_QUEUE_SIZE", "10000")),
+                batch_size=int(os.getenv("STRESS_LOG_BATCH_SIZE", "500")),
+                flush_interval=float(os.getenv("STRESS_LOG_FLUSH_MS", "1000")) / 1000.0,
+                overflow=os.getenv("STRESS_LOG_OVERFLOW", "drop_oldest"),
+            )
+            _writers[id(mongo)] = writer
+        return writer
@@ -5,6 +5,9 @@ from typing import Dict, List, Optional
 import time
 import random
 
+from app.services.executors import offload
+
+
 class MarketAIService:
     """Market data retrieval service with caching and real API integration."""
     
@@ -34,17 +37,19 @@ class MarketAIService:
     
     def _get_from_cache(self, key: str) -> Optional[Dict]:
         """Get data from MongoDB cache if not expired."""
-        cache_entry = self.mongo.db.marketCache.find_one({"key": key})
+        cache_entry = offload("mongo", self.mongo.db.marketCache.find_one, {"key": key})
         if cache_entry:
             if datetime.utcnow() - cache_entry['timestamp'] < timedelta(minutes=self.CACHE_TTL_MINUTES):
                 return cache_entry['data']
             else:
-                self.mongo.db.marketCache.delete_one({"key": key})
+                offload("mongo", self.mongo.db.marketCache.delete_one, {"key": key})
         return None
     
     def _set_cache(self, key: str, data: Dict) -> None:
         """Store data in MongoDB cache."""
-        self.mongo.db.marketCache.update_one(
+        offload(
+            "mongo",
+            self.mongo.db.marketCache.update_one,
             {"key": key},
             {"$set": {"key": key, "data": data, "timestamp": datetime.utcnow()}},
             upsert=True
@@ -67,7 +72,7 @@ class MarketAIService:
                     'symbol': symbol,
                     'apikey': self.alpha_key
                 }
-                response = requests.get(url, params=params, timeout=10)
+                response = offload("http", requests.get, url, params=params, timeout=10)
                 result = response.json()
                 
                 if 'Global Quote' in result and result['Global Quote'].get('05. price'):
@@ -107,7 +112,7 @@ class MarketAIService:
                     'include_24hr_vol': 'true',
                     'include_24hr_change': 'true'
                 }
-                response = requests.get(url, params=params, timeout=10)
+                response = offload("http", requests.get, url, params=params, timeout=10)
                 result = response.json()
                 
                 if symbol.lower() in result:
@@ -161,7 +166,7 @@ class MarketAIService:
                 'apikey': self.alpha_key,
                 'outputsize': 'compact'
             }
-            response = requests.get(url, params=params, timeout=10)
+            response = offload("http", requests.get, url, params=params, timeout=10)
             result = response.json()
             
             data = []
@@ -190,7 +195,7 @@ class MarketAIService:
                 'days': str(days),
                 'interval': 'daily'
             }
-            response = requests.get(url, params=params, timeout=10)
+            response = offload("http", requests.get, url, params=params, timeout=10)
             result = response.json()
             
             data = []
@@ -0,0 +1,213 @@
+# app/services/message_queue.py
+
+import json
+import os
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+from urllib.parse import urlparse
+
+import socketio as python_socketio
+
+# Socket.IO emits are shared between web workers (and the standalone
+# emitter, scripts/emitter.py) through this queue; unset = single process.
+# redis:// / kafka:// / zmq / amqp:// go to Flask-SocketIO's own managers;
+# local://host:port is the LocalBroker below, for tests and dev machines.
+DEFAULT_CHANNEL = "flask-socketio"
+
+# First message on every broker connection: what the connection is for
+ROLE_PUBLISH = b"publish"
+ROLE_LISTEN = b"listen"
+
+
+def _authkey():
+    return os.getenv("SOCKETIO_BROKER_AUTHKEY", "flask-socketio").encode("utf-8")
+
+
+def _local_address(url):
+    parsed = urlparse(url)
+    if parsed.scheme != "local" or parsed.port is None:
+        raise ValueError(f"Expected local://host:port, got {url!r}")
+    return parsed.hostname or "127.0.0.1", parsed.port
+
+
+class LocalBroker:
+    """
+    Minimal fan-out broker standing in for Redis: every message a publisher
+    connection sends is forwarded to every listener connection (the sender's
+    own manager skips it by host id). Connections declare their role in their
+    first message; publishers never read, so nothing is ever sent to them.
+    One thread per connection; meant for tests and single-machine
+    multi-worker setups, not production traffic.
+    """
+
+    def __init__(self, url="local://127.0.0.1:6390", authkey=None):
+        self.address = _local_address(url)
+        self.authkey = authkey or _authkey()
+        self._listener = None
+        self._connections = []
+        self._listeners = []
+        self._lock = threading.Lock()
+        self.forwarded = 0
+
+    @property
+    def url(self):
+        host, port = self._listener.address if self._listener else self.address
+        return f"local://{host}:{port}"
+
+    def start(self):
+        """Bind and accept connections on a background thread; returns self."""
+        self._listener = Listener(self.address, authkey=self.authkey)
+        threading.Thread(target=self._accept_loop, daemon=True, name="LOCAL_BROKER").start()
+        return self
+
+    def serve_forever(self):
+        self.start()
+        while True:
+            time.sleep(3600)
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                return  # listener closed
+            with self._lock:
+                self._connections.append(conn)
+            threading.Thread(target=self._relay, args=(conn,), daemon=True).start()
+
+    def _relay(self, conn):
+        try:
+            role = conn.recv_bytes()
+            if role == ROLE_LISTEN:
+                with self._lock:
+                    self._listeners.append(conn)
+                # listeners never publish; block until they disconnect
+                while True:
+                    conn.recv_bytes()
+            elif role != ROLE_PUBLISH:
+                raise EOFError(f"unknown role {role!r}")
+            while True:
+                message = conn.recv_bytes()
+                with self._lock:
+                    targets = list(self._listeners)
+                    self.forwarded += 1
+                for target in targets:
+                    try:
+                        target.send_bytes(message)
+                    except Exception:
+                        self._drop(target)
+        except (EOFError, OSError):
+            pass
+        self._drop(conn)
+
+    def _drop(self, conn):
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+            if conn in self._listeners:
+                self._listeners.remove(conn)
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.close()
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._listeners = []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+class LocalBrokerManager(python_socketio.PubSubManager):
+    """python-socketio client manager over a LocalBroker (local://host:port)."""
+
+    name = "local"
+
+    def __init__(self, url, channel=DEFAULT_CHANNEL, write_only=False, logger=None,
+                 json=None, authkey=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self.address = _local_address(url)
+        self.authkey = authkey or _authkey()
+        self._publisher = None
+        self._publish_lock = threading.Lock()
+
+    def _connect(self, role):
+        conn = Client(self.address, authkey=self.authkey)
+        conn.send_bytes(role)
+        return conn
+
+    def _publish(self, data):
+        payload = self.json.dumps({"channel": self.channel, "data": data}).encode("utf-8")
+        with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if self._publisher is None:
+                        self._publisher = self._connect(ROLE_PUBLISH)
+                    self._publisher.send_bytes(payload)
+                    return
+                except Exception as e:
+                    self._publisher = None
+                    if attempt:
+                        self._get_logger().error(f"Cannot publish to local broker: {e}")
+
+    def _listen(self):
+        retry_sleep = 1
+        while True:
+            try:
+                conn = self._connect(ROLE_LISTEN)
+                retry_sleep = 1
+                while True:
+                    message = json.loads(conn.recv_bytes())
+                    if message.get("channel") == self.channel:
+                        yield message["data"]
+            except Exception as e:
+                self._get_logger().error(
+                    f"Cannot receive from local broker ({e}), retrying in {retry_sleep}s"
+                )
+                time.sleep(retry_sleep)
+                retry_sleep = min(retry_sleep * 2, 30)
+
+
+def socketio_queue_options(url=None, channel=None, write_only=False) -> dict:
+    """
+    Extra SocketIO / init_app kwargs for a message queue URL (default
+    SOCKETIO_MESSAGE_QUEUE, channel SOCKETIO_CHANNEL): a LocalBrokerManager
+    for local://, Flask-SocketIO's own message_queue handling otherwise, and
+    nothing when no queue is configured.
+    """
+    url = url or os.getenv("SOCKETIO_MESSAGE_QUEUE")
+    channel = channel or os.getenv("SOCKETIO_CHANNEL", DEFAULT_CHANNEL)
+    if not url:
+        return {}
+    if url.startswith("local://"):
+        return {"client_manager": LocalBrokerManager(url, channel=channel, write_only=write_only)}
+    return {"message_queue": url, "channel": channel}
+
+
+def create_emitter(url=None, channel=None):
+    """
+    A write-only SocketIO that publishes to the queue without serving HTTP,
+    for processes like scripts/emitter.py. Its emit() reaches clients on
+    every web worker subscribed to the same queue.
+    """
+    from flask_socketio import SocketIO
+
+    options = socketio_queue_options(url, channel, write_only=True)
+    if not options:
+        raise ValueError("SOCKETIO_MESSAGE_QUEUE is not set")
+    emitter = SocketIO()
+    emitter.init_app(None, **options)
+    return emitter
+
+
+if __name__ == "__main__":
+    broker = LocalBroker(os.getenv("SOCKETIO_MESSAGE_QUEUE") or "local://127.0.0.1:6390")
+    print(f"[OK] Local Socket.IO broker listening on local://{broker.address[0]}:{broker.address[1]}")
+    broker.serve_forever()
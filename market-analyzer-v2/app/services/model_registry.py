@@ -0,0 +1,232 @@
+# app/services/model_registry.py
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from app.services.inference_backends import BACKENDS, KerasBackend, artifact_path
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+FACIAL_MODELS_DIR = os.path.join(PROJECT_ROOT, "datasets", "facial")
+
+# The two FER2013 mini_XCEPTION checkpoints used across the app
+MINI_XCEPTION_PATH = os.path.join(FACIAL_MODELS_DIR, "_mini_XCEPTION.102-0.66.hdf5")
+FER2013_MINI_XCEPTION_PATH = os.path.join(
+    FACIAL_MODELS_DIR, "fer2013_mini_XCEPTION.119-0.65.hdf5"
+)
+
+# Inference backend for emotion models: keras | tflite | onnx.
+# Non-Keras backends use the artifacts written by scripts/convert_models.py.
+DEFAULT_BACKEND = os.getenv("EMOTION_BACKEND", "keras")
+USE_QUANTIZED = os.getenv("EMOTION_QUANTIZED", "0") == "1"
+BACKEND_THREADS = int(os.getenv("EMOTION_NUM_THREADS", "0")) or None
+
+
+def _rss_bytes():
+    """Current resident set size of this process, in bytes (best effort)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+
+        # ru_maxrss is a high-water mark in KiB on Linux; good enough as a fallback
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return None
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models keyed by (absolute path, backend).
+
+    Every service asks the registry instead of calling load_model itself, so
+    each checkpoint is loaded once per process no matter how many services use
+    it. Loading is serialised per key; once loaded, the same model object is
+    handed to every thread (Keras inference is safe to call concurrently).
+    Load time and RSS growth are recorded per model.
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._models = {}
+        self._predictors = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._warmups = {}
+
+    @classmethod
+    def get_instance(cls):
+        """Gets the single instance of this registry."""
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def _key(model_path, backend):
+        return os.path.abspath(str(model_path)), backend
+
+    def get(self, model_path, backend="keras"):
+        """Return the shared model for `model_path`, loading it on first use."""
+        key = self._key(model_path, backend)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            model = self._models.get(key)
+            if model is not None:
+                return model
+
+            path = key[0]
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Model file not found at: {path}")
+
+            rss_before = _rss_bytes()
+            started = time.perf_counter()
+            model = self._load(path, backend)
+            load_seconds = time.perf_counter() - started
+            rss_after = _rss_bytes()
+
+            self._stats[key] = {
+                "path": path,
+                "backend": backend,
+                "load_seconds": round(load_seconds, 3),
+                "rss_delta_bytes": (
+                    rss_after - rss_before
+                    if rss_before is not None and rss_after is not None
+                    else None
+                ),
+                "file_bytes": os.path.getsize(path),
+            }
+            self._models[key] = model
+            print(
+                f"[OK] Model registry loaded {os.path.basename(path)} ({backend}) "
+                f"in {load_seconds:.2f}s"
+            )
+            return model
+
+    def get_predictor(self, model_path, backend=None, quantized=None):
+        """
+        Return the shared inference callable for the Keras checkpoint `model_path`.
+        It takes a float32 (N, H, W, C) batch and returns float32 class scores.
+
+        `backend` defaults to EMOTION_BACKEND; for tflite/onnx the converted
+        artifact next to the checkpoint is used (int8 when `quantized`), and
+        we fall back to Keras when it has not been generated yet.
+        """
+        backend = backend or DEFAULT_BACKEND
+        quantized = USE_QUANTIZED if quantized is None else quantized
+        requested = self._key(model_path, (backend, quantized))
+        predictor = self._predictors.get(requested)
+        if predictor is not None:
+            return predictor
+
+        path = model_path
+        if backend != "keras":
+            converted = artifact_path(model_path, backend, quantized)
+            if os.path.exists(converted):
+                path = converted
+            else:
+                print(
+                    f"[WARNING] No {backend} artifact at {converted}; "
+                    f"run scripts/convert_models.py. Falling back to keras."
+                )
+                backend = "keras"
+
+        model = self.get(path, backend)
+        with self._key_locks[self._key(path, backend)]:
+            predictor = self._predictors.get(requested)
+            if predictor is None:
+                predictor = self._make_predictor(model, backend)
+                self._predictors[requested] = predictor
+            return predictor
+
+    def warm_up_async(self, model_path, on_done=None, **predictor_kwargs):
+        """
+        Load `model_path` and run one dummy forward pass on a background thread,
+        so the first real request does not pay for loading or graph tracing.
+        `on_done(name, started, finished, error)` is called when it finishes.
+        """
+        path = os.path.abspath(str(model_path))
+        with self._lock:
+            if path in self._warmups:
+                return
+            entry = {"state": "loading", "seconds": None, "error": None,
+                     "event": threading.Event()}
+            self._warmups[path] = entry
+
+        def _run():
+            started = time.perf_counter()
+            error = None
+            try:
+                predictor = self.get_predictor(path, **predictor_kwargs)
+                predictor(np.zeros((1,) + tuple(predictor.input_shape), dtype=np.float32))
+                entry["state"] = "ready"
+            except Exception as e:
+                error = str(e)
+                entry["state"] = "failed"
+                entry["error"] = error
+                print(f"[ERROR] Warm-up failed for {os.path.basename(path)}: {e}")
+            finished = time.perf_counter()
+            entry["seconds"] = round(finished - started, 3)
+            entry["event"].set()
+            if on_done is not None:
+                on_done(f"warm-up {os.path.basename(path)}", started, finished, error)
+
+        threading.Thread(
+            target=_run, daemon=True, name=f"WARMUP_{os.path.basename(path)}"
+        ).start()
+
+    def wait_until_warm(self, model_path, timeout=None) -> bool:
+        """Block until a started warm-up finishes; True if the model is ready."""
+        entry = self._warmups.get(os.path.abspath(str(model_path)))
+        if entry is None:
+            return False
+        entry["event"].wait(timeout)
+        return entry["state"] == "ready"
+
+    def readiness(self) -> dict:
+        """Warm-up state per model: loading | ready | failed."""
+        return {
+            os.path.basename(path): {k: v for k, v in entry.items() if k != "event"}
+            for path, entry in self._warmups.items()
+        }
+
+    def is_loaded(self, model_path, backend="keras") -> bool:
+        return self._key(model_path, backend) in self._models
+
+    def _load(self, path, backend):
+        if backend == "keras":
+            from tensorflow.keras.models import load_model
+
+            # compile=False: inference only, and it sidesteps legacy optimizer configs
+            return load_model(path, compile=False)
+        if backend in BACKENDS:
+            # Lightweight runtimes: the backend object is the model
+            return BACKENDS[backend](path, num_threads=BACKEND_THREADS)
+        raise ValueError(f"Unsupported model backend: {backend}")
+
+    def _make_predictor(self, model, backend):
+        if backend == "keras":
+            return KerasBackend(model)
+        return model
+
+    def stats(self) -> list:
+        return [dict(s) for s in self._stats.values()]
+
+
+# Create a single, shared registry that every service uses
+model_registry = ModelRegistry.get_instance()
@@ -0,0 +1,87 @@
+# app/services/socket_sessions.py
+
+import threading
+
+from flask_jwt_extended import decode_token
+
+# Rooms: stress results go to their user's room, alerts to HR, and market
+# data to per-symbol rooms, so each emit reaches only the clients that need it
+HR_ROOM = "hr"
+LIVE_ROOM = "live"  # the server-side camera's stress stream
+HR_ROLES = ("hr", "admin")
+
+
+def user_room(user_id) -> str:
+    return f"user:{user_id}"
+
+
+def market_room(symbol) -> str:
+    return f"market:{str(symbol).upper()}"
+
+
+class SocketIdentity:
+    __slots__ = ("user_id", "role")
+
+    def __init__(self, user_id, role="user"):
+        self.user_id = str(user_id)
+        self.role = role or "user"
+
+    @property
+    def is_hr(self) -> bool:
+        return self.role in HR_ROLES
+
+    @property
+    def room(self) -> str:
+        return user_room(self.user_id)
+
+
+def identity_from_token(token, lookup_role=None) -> SocketIdentity:
+    """
+    Verify an access token (signature, expiry) and return who it belongs to.
+    Tokens carry either a plain user id or {"id", "role", ...} as identity;
+    for plain ids the role comes from a "role" claim or `lookup_role(user_id)`.
+    Raises on an invalid or expired token.
+    """
+    claims = decode_token(token)
+    subject = claims.get("sub")
+    if isinstance(subject, dict):
+        user_id, role = subject.get("id"), subject.get("role")
+    else:
+        user_id, role = subject, claims.get("role")
+    if not user_id:
+        raise ValueError("Token has no user id")
+    if role is None and lookup_role is not None:
+        role = lookup_role(str(user_id))
+    return SocketIdentity(user_id, role)
+
+
+class SocketSessions:
+    """
+    sid -> SocketIdentity, bound once when the socket connects so per-event
+    handlers never re-verify the JWT.
+    """
+
+    def __init__(self):
+        self._identities = {}
+        self._lock = threading.Lock()
+
+    def bind(self, sid, identity: SocketIdentity):
+        with self._lock:
+            self._identities[sid] = identity
+
+    def get(self, sid):
+        """The identity bound to `sid`, or None for anonymous sockets."""
+        return self._identities.get(sid)
+
+    def drop(self, sid):
+        with self._lock:
+            return self._identities.pop(sid, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            identities = list(self._identities.values())
+        return {
+            "authenticated": len(identities),
+            "users": len({i.user_id for i in identities}),
+            "hr": sum(1 for i in identities if i.is_hr),
+        }
@@ -2,18 +2,19 @@ import os
 import cv2
 import numpy as np
 import base64
-from tensorflow.keras.models import load_model
+from app.services.model_registry import model_registry, FER2013_MINI_XCEPTION_PATH
+from app.utils.image_decode import decode_gray
 
 class StressModelTrainer:
-    def __init__(self, model_path='datasets/facial/fer2013_mini_XCEPTION.119-0.65.hdf5'):
-        self.model = None
+    def __init__(self, model_path=FER2013_MINI_XCEPTION_PATH):
+        self.predictor = None
         self.labels = ['Angry', 'Disgust', 'Fear', 'Happy', 'Sad', 'Surprise', 'Neutral']
         
         # Load the model if it exists
         if os.path.exists(model_path):
             try:
                 print(f"🧠 Loading Stress Model from {model_path}...")
-                self.model = load_model(model_path)
+                self.predictor = model_registry.get_predictor(model_path)
                 print("✅ Stress Model Loaded Successfully")
             except Exception as e:
                 print(f"❌ Error loading model: {e}")
@@ -29,8 +30,8 @@ class StressModelTrainer:
             if "base64," in base64_string:
                 base64_string = base64_string.split(",")[1]
             img_data = base64.b64decode(base64_string)
-            np_arr = np.frombuffer(img_data, np.uint8)
-            img = cv2.imdecode(np_arr, cv2.IMREAD_GRAYSCALE) # Convert to grayscale
+            # Grayscale, reduced in the JPEG decoder as far as 48x48 allows
+            img, _ = decode_gray(img_data, min_side=48)
 
             # 2. Resize to what your model expects (usually 48x48 for emotion models)
             img = cv2.resize(img, (48, 48))
@@ -49,7 +50,7 @@ class StressModelTrainer:
         """
         Returns a stress level (0.0 to 1.0) and a text label.
         """
-        if not self.model:
+        if not self.predictor:
             # Fallback if model isn't loaded: Return random safe data
             return 0.2, "Neutral (Model Missing)"
 
@@ -58,7 +59,7 @@ class StressModelTrainer:
             return 0.0, "Error"
 
         # Predict
-        preds = self.model.predict(processed_img)
+        preds = self.predictor(processed_img)
         label_idx = np.argmax(preds)
         label = self.labels[label_idx]
 
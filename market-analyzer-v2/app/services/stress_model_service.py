@@ -1,9 +1,91 @@
 # app/services/stress_model_service.py
 
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
 import cv2
 import numpy as np
-import tensorflow as tf
-from pathlib import Path
+
+from app.services.executors import ASYNC_MODE, GREEN_MODES, offload
+from app.services.inference_batcher import InferenceBatcher
+from app.services.face_detectors import create_face_detector
+from app.services.frame_worker_pool import FORK_SAFE_BACKENDS, FrameWorkerPool
+from app.services.inference_cache import PerceptualHashCache
+from app.services.model_registry import model_registry, DEFAULT_BACKEND, MINI_XCEPTION_PATH
+from app.utils.image_decode import decode_gray, resize_into
+
+# Pre-cropped client input: one 64x64 grayscale face, uint8, row-major
+FACE_CROP_SIZE = 64
+FACE_CROP_BYTES = FACE_CROP_SIZE * FACE_CROP_SIZE
+
+
+def face_input_from_crop(crop):
+    """
+    (64, 64, 1) float32 model input from a client-side face crop.
+    Raises ValueError unless `crop` is exactly FACE_CROP_BYTES bytes.
+    """
+    view = memoryview(crop)
+    if view.nbytes != FACE_CROP_BYTES:
+        raise ValueError(
+            f"Face crop must be {FACE_CROP_BYTES} bytes "
+            f"({FACE_CROP_SIZE}x{FACE_CROP_SIZE} uint8 grayscale), got {view.nbytes}"
+        )
+    pixels = np.frombuffer(view, dtype=np.uint8).reshape(FACE_CROP_SIZE, FACE_CROP_SIZE, 1)
+    return pixels.astype("float32") / 255.0
+
+
+def load_face_detector():
+    """The deployment's face detector (FACE_DETECTOR_BACKEND), falling back to Haar."""
+    try:
+        detector = create_face_detector(default="haar")
+    except Exception as e:
+        print(f"[ERROR] Face detector unavailable ({e}); falling back to haar")
+        detector = create_face_detector("haar")
+    print(f"[OK] Face detector loaded: {detector.name} (scale {detector.scale:g})")
+    return detector
+
+
+def prepare_face_input(image_data, face_detector):
+    """
+    Decode the image, detect the first face and build the model input.
+    Returns (face_input, None) with a (64, 64, 1) float32 array, or
+    (None, fallback_stress) when there is nothing to run the model on.
+    Module-level so frame worker processes can run it without the service.
+    """
+    # Decode straight to grayscale, at 1/2, 1/4 or 1/8 size for JPEGs when
+    # faces stay big enough for the detector and the 64x64 model input
+    gray, factor = decode_gray(
+        image_data,
+        min_side=FACE_CROP_SIZE,
+        detector_scale=face_detector.scale,
+        min_face=face_detector.min_face,
+        min_roi=FACE_CROP_SIZE,
+    )
+
+    if gray is None:
+        print("[WARNING] Failed to decode image")
+        return None, 0.5
+
+    # Detect faces; the decode already did part of the detector's downscale
+    faces = face_detector.detect(gray, scale=face_detector.scale * factor)
+
+    if len(faces) == 0:
+        print("[WARNING] No face detected in image")
+        return None, 0.3  # neutral-ish when no face
+
+    # Process the largest detected face
+    x, y, w, h = faces[0]
+    face_roi = gray[y : y + h, x : x + w]
+
+    # Resize to model input size (64x64 for FER2013), into a reused buffer
+    face_roi = resize_into(face_roi, (FACE_CROP_SIZE, FACE_CROP_SIZE), cv2.INTER_LINEAR)
+
+    # Normalize pixel values (a new array, so the buffer can be reused)
+    face_roi = face_roi.astype("float32") / 255.0
+
+    # Add channel dimension (the batcher adds the batch dimension)
+    return np.expand_dims(face_roi, axis=-1), None
 
 
 class StressModelService:
@@ -25,9 +107,9 @@ class StressModelService:
     }
 
     def __init__(self):
-        self.model = None
+        self.predictor = None
         self.model_loaded = False
-        self.face_cascade = None
+        self.face_detector = None
         # order must match training
         self.emotions = [
             "angry",
@@ -38,8 +120,36 @@ class StressModelService:
             "sad",
             "surprise",
         ]
+        # Face crops from concurrent requests are grouped into one forward pass
+        self.batcher = InferenceBatcher(
+            self._predict_batch,
+            max_batch=int(os.getenv("STRESS_BATCH_MAX", "32")),
+            window_ms=float(os.getenv("STRESS_BATCH_WINDOW_MS", "10")),
+            name="STRESS_MODEL_BATCHER",
+        )
+        # A caller never waits longer than this for its batch (0.5 fallback)
+        self.batch_timeout = float(os.getenv("STRESS_BATCH_TIMEOUT_S", "10"))
+        # Near-duplicate face crops reuse the previous emotion vector
+        # (STRESS_CACHE_SIZE=0 disables the cache)
+        self.cache_settings = {
+            "max_entries": int(os.getenv("STRESS_CACHE_SIZE", "256")),
+            "max_distance": int(os.getenv("STRESS_CACHE_MAX_DISTANCE", "6")),
+            "ttl_seconds": float(os.getenv("STRESS_CACHE_TTL_SECONDS", "1.0")),
+        }
+        self.cache = PerceptualHashCache(**self.cache_settings)
+        # Decode + detection for predict_many fan out over these threads
+        # (cv2 releases the GIL); created on first batch
+        self.prepare_threads = int(os.getenv("STRESS_BATCH_PREPARE_THREADS", "4"))
+        self._prepare_pool = None
         print("[OK] Stress model service initialized (lazy loading enabled)")
-        self._load_face_cascade()
+        self._load_face_detector()
+        # Optional worker processes for the whole frame path (0 = in-process),
+        # started by create_app through start_worker_pool()
+        self.worker_processes = int(os.getenv("STRESS_WORKER_PROCESSES", "0"))
+        # Longest a request waits on a worker process (0.5 fallback after)
+        self.worker_timeout = float(os.getenv("STRESS_WORKER_TIMEOUT_S", "10"))
+        self.worker_pool = None
+        self._worker_pool_lock = threading.Lock()
 
     def _load_model(self):
         """Load the trained FER2013 Mini-XCEPTION model (lazy loading)."""
@@ -47,40 +157,63 @@ class StressModelService:
             return
 
         try:
-            model_path = (
-                Path(__file__).parent.parent.parent
-                / "datasets"
-                / "facial"
-                / "_mini_XCEPTION.102-0.66.hdf5"
-            )
-            if model_path.exists():
+            model_path = MINI_XCEPTION_PATH
+            if os.path.exists(model_path):
                 print(f"[OK] Loading emotion detection model from {model_path}...")
-                # IMPORTANT: compile=False to ignore legacy optimizer (lr) config
-                self.model = tf.keras.models.load_model(str(model_path), compile=False)
+                # Shared with the live pipeline through the model registry;
+                # the backend (keras / tflite / onnx) follows EMOTION_BACKEND
+                self.predictor = model_registry.get_predictor(model_path)
                 self.model_loaded = True
                 print("[OK] Emotion detection model loaded successfully")
             else:
                 print(f"[ERROR] Model not found at {model_path}")
-                self.model = None
+                self.predictor = None
                 self.model_loaded = True
         except Exception as e:
             print(f"[ERROR] Failed to load emotion model: {e}")
-            self.model = None
+            self.predictor = None
             self.model_loaded = True
 
-    def _load_face_cascade(self):
-        """Load OpenCV face cascade classifier."""
+    def _load_face_detector(self):
+        """Load the face detector backend chosen for this deployment."""
         try:
-            cascade_path = (
-                cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-            )
-            self.face_cascade = cv2.CascadeClassifier(cascade_path)
-            if not self.face_cascade.empty():
-                print("[OK] Face cascade loaded successfully")
-            else:
-                print("[ERROR] Failed to load face cascade")
+            self.face_detector = load_face_detector()
         except Exception as e:
-            print(f"[ERROR] Error loading face cascade: {e}")
+            print(f"[ERROR] Error loading face detector: {e}")
+
+    def start_worker_pool(self):
+        """
+        Start the STRESS_WORKER_PROCESSES frame workers, if configured; safe
+        to call more than once. create_app calls it once the modules are
+        imported but before the app starts threads or imports TensorFlow, so
+        the workers can be forked safely. A fork-safe backend is loaded first
+        so the workers share its pages copy-on-write; others are loaded by
+        each worker.
+        """
+        if self.worker_processes <= 0:
+            return
+        if ASYNC_MODE in GREEN_MODES:
+            print(f"[WARNING] STRESS_WORKER_PROCESSES ignored under {ASYNC_MODE}; "
+                  "inference runs on the inference executor")
+            return
+
+        with self._worker_pool_lock:
+            if self.worker_pool is not None:
+                return
+            if DEFAULT_BACKEND in FORK_SAFE_BACKENDS:
+                self._load_model()
+            try:
+                worker_pool = FrameWorkerPool(
+                    self.worker_processes,
+                    MINI_XCEPTION_PATH,
+                    start_method=os.getenv("STRESS_WORKER_START_METHOD") or None,
+                    cache_settings=self.cache_settings,
+                    timeout=self.worker_timeout,
+                )
+                worker_pool.start()
+                self.worker_pool = worker_pool
+            except Exception as e:
+                print(f"[ERROR] Frame worker pool unavailable, analysing in-process: {e}")
 
     @classmethod
     def get_instance(cls):
@@ -89,75 +222,216 @@ class StressModelService:
             cls._instance = cls()
         return cls._instance
 
-    def predict(self, image_data: bytes) -> float:
+    def _predict_batch(self, batch):
+        """One forward pass over a stacked (N, 64, 64, 1) batch, on the inference executor."""
+        return offload("inference", self.predictor, batch)
+
+    def _prepare_face(self, image_data):
+        """See prepare_face_input; decode and detection run on the inference executor."""
+        return offload("inference", prepare_face_input, image_data, self.face_detector)
+
+    def _stress_from_predictions(self, predictions) -> float:
+        """Map one row of emotion probabilities to a stress level in [0, 1]."""
+        emotion_idx = int(np.argmax(predictions))
+        emotion = (
+            self.emotions[emotion_idx]
+            if 0 <= emotion_idx < len(self.emotions)
+            else "neutral"
+        )
+        confidence = float(predictions[emotion_idx])
+
+        # Convert emotion to stress level
+        stress_level = self.EMOTION_TO_STRESS.get(emotion, 0.5)
+
+        # Adjust stress by confidence (more confident = stronger signal)
+        stress_level = stress_level * confidence
+
+        print(
+            f"[OK] Detected emotion: {emotion} ({confidence:.2%}), "
+            f"Stress: {stress_level:.2f}"
+        )
+
+        # Clamp between 0 and 1
+        return float(min(1.0, max(0.0, stress_level)))
+
+    def _predict_batched(self, face_input):
+        """
+        One face crop through the shared batcher, or None when the batch did
+        not come back within batch_timeout (e.g. the batcher thread died).
+        """
+        try:
+            return self.batcher.predict(face_input, timeout=self.batch_timeout)
+        except FutureTimeoutError:
+            print(f"[WARNING] Inference batch timed out after {self.batch_timeout:g}s")
+            return None
+
+    def _predict_cached(self, face_input, scope=None):
+        """
+        Emotion vector for one face crop, from the cache when a near-duplicate
+        was seen; None when inference timed out.
+        """
+        if not self.cache.enabled:
+            return self._predict_batched(face_input)
+
+        key = self.cache.key(face_input)
+        predictions = self.cache.get(key, scope)
+        if predictions is None:
+            # Concurrent callers share one batched forward pass
+            predictions = self._predict_batched(face_input)
+            if predictions is not None:
+                self.cache.put(key, predictions, scope)
+        return predictions
+
+    def predict(self, image_data: bytes, cache_scope=None) -> float:
         """
         Predicts stress level from raw image bytes using the trained FER2013 model.
         Returns a stress level between 0 (calm) and 1 (high stress).
+        `cache_scope` (e.g. the client's socket id) keeps cache hits per source.
         """
-        # Lazy load model on first use
-        if not self.model_loaded:
-            self._load_model()
-
         try:
-            if self.model is None:
+            if self.worker_pool is not None:
+                # Decode, detection and inference run in a worker process
+                predictions, fallback = self.worker_pool.analyze(image_data, cache_scope)
+                if predictions is None:
+                    return fallback
+                return self._stress_from_predictions(predictions)
+
+            # Lazy load model on first use
+            if not self.model_loaded:
+                self._load_model()
+
+            if self.predictor is None:
                 print("[WARNING] Model not available, returning neutral stress (0.5)")
                 return 0.5
 
-            # Decode image
-            np_arr = np.frombuffer(image_data, np.uint8)
-            img = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+            face_input, fallback = self._prepare_face(image_data)
+            if face_input is None:
+                return fallback
 
-            if img is None:
-                print("[WARNING] Failed to decode image")
+            predictions = self._predict_cached(face_input, cache_scope)
+            if predictions is None:
                 return 0.5
+            return self._stress_from_predictions(predictions)
+
+        except Exception as e:
+            print(f"[ERROR] Error in stress prediction: {e}")
+            return 0.5
+
+    def _prepare_executor(self):
+        if self._prepare_pool is None:
+            self._prepare_pool = ThreadPoolExecutor(
+                max_workers=max(1, self.prepare_threads),
+                thread_name_prefix="STRESS_PREPARE",
+            )
+        return self._prepare_pool
 
-            # Convert to grayscale for face detection
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    def predict_many(self, images, cache_scope=None) -> list:
+        """
+        Stress levels for a sequence of encoded images, in order.
+        Frames are decoded and searched for faces in parallel, then every face
+        the cache cannot answer goes through a single forward pass. Frames that
+        fail individually get their fallback (0.5 on errors) without failing
+        the rest.
+        """
+        images = list(images)
+        if not images:
+            return []
 
-            # Detect faces
-            faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
+        executor = self._prepare_executor()
 
-            if len(faces) == 0:
-                print("[WARNING] No face detected in image")
-                return 0.3  # neutral-ish when no face
+        if self.worker_pool is not None:
+            # The worker processes do decode, detection and inference;
+            # unscoped submissions spread over all of them
+            def analyze(image_data):
+                try:
+                    predictions, fallback = self.worker_pool.analyze(image_data)
+                    if predictions is None:
+                        return fallback
+                    return self._stress_from_predictions(predictions)
+                except Exception as e:
+                    print(f"[ERROR] Error in stress prediction: {e}")
+                    return 0.5
 
-            # Process first detected face
-            x, y, w, h = faces[0]
-            face_roi = gray[y : y + h, x : x + w]
+            return list(executor.map(analyze, images))
 
-            # Resize to model input size (64x64 for FER2013)
-            face_roi = cv2.resize(face_roi, (64, 64))
+        if not self.model_loaded:
+            self._load_model()
 
-            # Normalize pixel values
-            face_roi = face_roi.astype("float32") / 255.0
+        if self.predictor is None:
+            print("[WARNING] Model not available, returning neutral stress (0.5)")
+            return [0.5] * len(images)
 
-            # Add batch and channel dimensions
-            face_roi = np.expand_dims(face_roi, axis=0)
-            face_roi = np.expand_dims(face_roi, axis=-1)
+        def prepare(image_data):
+            try:
+                return self._prepare_face(image_data)
+            except Exception as e:
+                print(f"[ERROR] Error preparing frame: {e}")
+                return None, 0.5
 
-            # Predict emotion
-            predictions = self.model.predict(face_roi, verbose=0)
-            emotion_idx = int(np.argmax(predictions[0]))
-            emotion = (
-                self.emotions[emotion_idx]
-                if 0 <= emotion_idx < len(self.emotions)
-                else "neutral"
-            )
-            confidence = float(predictions[0][emotion_idx])
+        stresses = [None] * len(images)
+        pending = []  # (index, cache key)
+        inputs = []
+        for i, (face_input, fallback) in enumerate(executor.map(prepare, images)):
+            if face_input is None:
+                stresses[i] = fallback
+                continue
+            key = None
+            if self.cache.enabled:
+                key = self.cache.key(face_input)
+                cached = self.cache.get(key, cache_scope)
+                if cached is not None:
+                    stresses[i] = self._stress_from_predictions(cached)
+                    continue
+            pending.append((i, key))
+            inputs.append(face_input)
 
-            # Convert emotion to stress level
-            stress_level = self.EMOTION_TO_STRESS.get(emotion, 0.5)
+        if inputs:
+            try:
+                predictions = self._predict_batch(np.stack(inputs))
+            except Exception as e:
+                print(f"[ERROR] Error in batched stress prediction: {e}")
+                predictions = None
+            for n, (i, key) in enumerate(pending):
+                if predictions is None:
+                    stresses[i] = 0.5
+                    continue
+                row = np.asarray(predictions[n], dtype=np.float32)
+                if key is not None:
+                    self.cache.put(key, row, cache_scope)
+                stresses[i] = self._stress_from_predictions(row)
 
-            # Adjust stress by confidence (more confident = stronger signal)
-            stress_level = stress_level * confidence
+        return stresses
 
-            print(
-                f"[OK] Detected emotion: {emotion} ({confidence:.2%}), "
-                f"Stress: {stress_level:.2f}"
-            )
+    def predict_crop(self, crop, cache_scope=None) -> float:
+        """
+        Stress level from a face the client already detected and cropped:
+        FACE_CROP_BYTES of 64x64 uint8 grayscale. Skips decode and detection
+        and goes straight to the cache and the batcher (or a worker process).
+        Raises ValueError for a wrongly sized crop; other failures return 0.5.
+        """
+        face_input = face_input_from_crop(crop)
+
+        if self.worker_pool is not None:
+            # Inference stays in the worker processes, out of the web process
+            try:
+                predictions, _ = self.worker_pool.analyze_crop(crop, cache_scope)
+                return self._stress_from_predictions(predictions)
+            except Exception as e:
+                print(f"[ERROR] Error in stress prediction: {e}")
+                return 0.5
 
-            # Clamp between 0 and 1
-            return float(min(1.0, max(0.0, stress_level)))
+        if not self.model_loaded:
+            self._load_model()
+
+        try:
+            if self.predictor is None:
+                print("[WARNING] Model not available, returning neutral stress (0.5)")
+                return 0.5
+
+            predictions = self._predict_cached(face_input, cache_scope)
+            if predictions is None:
+                return 0.5
+            return self._stress_from_predictions(predictions)
 
         except Exception as e:
             print(f"[ERROR] Error in stress prediction: {e}")
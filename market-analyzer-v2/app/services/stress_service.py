@@ -1,91 +1,152 @@
 # app/services/stress_service.py
 
-import base64
 from datetime import datetime
 
 from app.models.schemas import StressResult
+from app.services.log_writer import get_log_writer
 from app.services.stress_model_service import stress_model_service
+from app.utils.image_payload import decode_image_payload
 
 
 class StressService:
     def __init__(self, mongo):
         self.mongo = mongo
+        # Logs and alerts are written behind the request (see StressLogWriter)
+        self.log_writer = get_log_writer(mongo)
         # kept for compatibility if you ever map emotions manually
         self.emotions = ["happy", "sad", "angry", "fear", "surprise", "neutral"]
 
-    def analyze_frame(self, base64_image: str, user_id: str) -> StressResult:
+    def analyze_frame(self, image, user_id: str) -> StressResult:
         """
         Analyze facial expression in image using the trained FER model
         to determine stress level. Uses the shared stress_model_service
         so it stays in sync with the live Mini-XCEPTION pipeline.
+        `image` is encoded image bytes (or a memoryview of them), or the
+        legacy base64 string / data URL.
         """
         try:
-            # Decode base64 image ("data:image/...;base64,AAAA" or plain base64)
-            if "," in base64_image:
-                _, encoded = base64_image.split(",", 1)
-            else:
-                encoded = base64_image
-
-            image_bytes = base64.b64decode(encoded)
+            image_bytes = decode_image_payload(image)
 
             # Predict normalized stress (0–1) using the shared model service
-            # stress_model_service.predict(...) must return a float in [0, 1]
-            stress_score_normalized = float(stress_model_service.predict(image_bytes))
-
-            # Convert from 0–1 to 0–100 scale
-            stress_score = stress_score_normalized * 100.0
-
-            # Simple emotion mapping based on stress level
-            if stress_score > 75:
-                emotion = "angry"
-            elif stress_score > 60:
-                emotion = "fear"
-            elif stress_score > 45:
-                emotion = "sad"
-            elif stress_score > 30:
-                emotion = "surprise"
-            elif stress_score > 15:
-                emotion = "neutral"
-            else:
-                emotion = "happy"
-
-            result = StressResult(
-                userId=str(user_id),
-                timestamp=datetime.utcnow(),
-                stressScore=float(stress_score),
-                emotion=emotion,
+            # stress_model_service.predict(...) must return a float in [0, 1];
+            # cache hits stay within this user's own frames
+            stress_score_normalized = float(
+                stress_model_service.predict(image_bytes, cache_scope=str(user_id))
             )
+            return self._record_result(user_id, stress_score_normalized)
 
-            # Persist log
-            self.mongo.db.stressLogs.insert_one(result.dict())
+        except Exception as e:
+            print(f"[ERROR] Error analyzing frame: {e}")
+            return self._fallback_result(user_id)
 
-            # Fire alerts if above threshold
-            self.check_alerts(str(user_id), stress_score)
+    def analyze_crop(self, crop, user_id: str) -> StressResult:
+        """
+        Same as analyze_frame for a client-side 64x64 uint8 grayscale face crop
+        (no decode or detection). Raises ValueError for a wrongly sized crop.
+        """
+        stress_score_normalized = float(
+            stress_model_service.predict_crop(crop, cache_scope=str(user_id))
+        )
+        try:
+            return self._record_result(user_id, stress_score_normalized)
+        except Exception as e:
+            print(f"[ERROR] Error analyzing face crop: {e}")
+            return self._fallback_result(user_id)
 
-            return result
+    def analyze_batch(self, frames, user_id: str) -> list:
+        """
+        Analyze buffered frames in one go: `frames` is a sequence of
+        (image, client_timestamp) pairs, where image is anything analyze_frame
+        accepts and client_timestamp a datetime or None (server time).
+        Runs one batched inference, queues all logs for the bulk writer and
+        returns StressResults in the order the frames were given.
+        """
+        images = [decode_image_payload(image) for image, _ in frames]
+        stress_levels = stress_model_service.predict_many(images, cache_scope=str(user_id))
 
-        except Exception as e:
-            print(f"[ERROR] Error analyzing frame: {e}")
-            # Fallback: neutral stress when anything fails
-            return StressResult(
-                userId=str(user_id),
-                timestamp=datetime.utcnow(),
-                stressScore=50.0,
-                emotion="neutral",
-            )
+        now = datetime.utcnow()
+        results = [
+            self._build_result(user_id, float(level), timestamp or now)
+            for level, (_, timestamp) in zip(stress_levels, frames)
+        ]
+        if not results:
+            return results
+
+        self.log_writer.submit_many("stressLogs", [result.dict() for result in results])
+        for result in results:
+            alert = self._alert_document(str(user_id), result.stressScore, result.timestamp)
+            if alert is not None:
+                self.log_writer.alert(alert)
+
+        return results
+
+    @staticmethod
+    def _build_result(user_id: str, stress_score_normalized: float, timestamp=None) -> StressResult:
+        """Map a 0–1 stress level to a StressResult."""
+        # Convert from 0–1 to 0–100 scale
+        stress_score = stress_score_normalized * 100.0
+
+        # Simple emotion mapping based on stress level
+        if stress_score > 75:
+            emotion = "angry"
+        elif stress_score > 60:
+            emotion = "fear"
+        elif stress_score > 45:
+            emotion = "sad"
+        elif stress_score > 30:
+            emotion = "surprise"
+        elif stress_score > 15:
+            emotion = "neutral"
+        else:
+            emotion = "happy"
+
+        return StressResult(
+            userId=str(user_id),
+            timestamp=timestamp or datetime.utcnow(),
+            stressScore=float(stress_score),
+            emotion=emotion,
+        )
+
+    def _record_result(self, user_id: str, stress_score_normalized: float) -> StressResult:
+        """Map a 0–1 stress level to a result, queue it for persistence and fire alerts."""
+        result = self._build_result(user_id, stress_score_normalized)
+
+        # Persist log (write-behind, flushed in bulk)
+        self.log_writer.log(result)
+
+        # Fire alerts if above threshold
+        self.check_alerts(str(user_id), result.stressScore)
+
+        return result
+
+    @staticmethod
+    def _fallback_result(user_id: str) -> StressResult:
+        # Fallback: neutral stress when anything fails
+        return StressResult(
+            userId=str(user_id),
+            timestamp=datetime.utcnow(),
+            stressScore=50.0,
+            emotion="neutral",
+        )
 
     def check_alerts(self, user_id: str, stress_score: float):
         """
         Check if stress level exceeds threshold and create alert document.
         """
+        alert = self._alert_document(user_id, stress_score)
+        if alert is not None:
+            self.log_writer.alert(alert)
+
+    @staticmethod
+    def _alert_document(user_id: str, stress_score: float, timestamp=None):
+        """Alert for a score above the threshold, or None."""
         threshold = 70.0
-        if stress_score > threshold:
-            self.mongo.db.alerts.insert_one(
-                {
-                    "userId": user_id,
-                    "stressScore": float(stress_score),
-                    "timestamp": datetime.utcnow(),
-                    "severity": "high" if stress_score > 85 else "medium",
-                    "resolved": False,
-                }
-            )
+        if stress_score <= threshold:
+            return None
+        return {
+            "userId": user_id,
+            "stressScore": float(stress_score),
+            "timestamp": timestamp or datetime.utcnow(),
+            "severity": "high" if stress_score > 85 else "medium",
+            "resolved": False,
+        }
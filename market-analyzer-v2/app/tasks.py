@@ -3,10 +3,10 @@ import pandas as pd
 import numpy as np
 from flask_socketio import emit
 import os
-from tensorflow.keras.models import load_model
-from tensorflow.keras.optimizers import Adam
 import warnings
 
+from .services.model_registry import model_registry
+
 warnings.filterwarnings('ignore')
 
 # --- Configuration for data/model paths ---
@@ -62,15 +62,8 @@ def load_data_and_model():
         print(f"[OK] Timestamps configured")
 
         print(f"Loading Keras model...")
-        try:
-            _emotion_model = load_model(
-                model_abs_path,
-                custom_objects={'Adam': Adam}
-            )
-        except ValueError as ve:
-            print(f"  Attempting to load with compile=False due to: {ve}")
-            _emotion_model = load_model(model_abs_path, compile=False)
-            _emotion_model.compile(optimizer=Adam(learning_rate=0.0001), loss='categorical_crossentropy', metrics=['accuracy'])
+        # Shared, inference-only instance from the process-wide registry
+        _emotion_model = model_registry.get(model_abs_path)
         
         print(f"[OK] Successfully loaded emotion model (Xception-based FER2013)")
 
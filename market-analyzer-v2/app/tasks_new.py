@@ -1,14 +1,12 @@
 import time
-import pandas as pd
-import numpy as np
-from flask_socketio import emit
 import os
-from tensorflow.keras.models import load_model
-from tensorflow.keras.optimizers import Adam
 import warnings
 from datetime import datetime
 import random
 
+from .services.model_registry import model_registry
+from .services.socket_sessions import market_room
+
 warnings.filterwarnings('ignore')
 
 # Global variables
@@ -36,19 +34,8 @@ def load_emotion_model():
             return
         
         print(f"Loading emotion model from {model_path}...")
-        try:
-            _emotion_model = load_model(
-                model_path,
-                custom_objects={'Adam': Adam}
-            )
-        except ValueError as ve:
-            print(f"  Attempting to load with compile=False due to: {ve}")
-            _emotion_model = load_model(model_path, compile=False)
-            _emotion_model.compile(
-                optimizer=Adam(learning_rate=0.0001),
-                loss='categorical_crossentropy',
-                metrics=['accuracy']
-            )
+        # Shared, inference-only instance from the process-wide registry
+        _emotion_model = model_registry.get(model_path)
         
         print(f"[OK] Successfully loaded emotion model (Xception-based FER2013)")
     except Exception as e:
@@ -94,9 +81,13 @@ def calculate_stress_level(symbol: str, price_data: dict) -> float:
         print(f"[ERROR] Calculating stress: {e}")
         return 0.5
 
-def emit_market_updates():
+def emit_market_updates(emitter=None):
     """Emit real market data updates for supported symbols via Socket.IO.
     
+    `emitter` is the SocketIO to publish through: the app's own by default,
+    or a write-only one from message_queue.create_emitter in the standalone
+    emitter process (scripts/emitter.py).
+    
     Performance:
     - Samples symbols (not all per tick)
     - Uses fast cached API responses (5-min TTL)
@@ -112,19 +103,23 @@ def emit_market_updates():
         return
     
     # Import here to avoid circular imports
+    from .extensions import socketio
     from .services.market_ai_service import MarketAIService
     from flask_pymongo import PyMongo
     
-    load_emotion_model()
-    
     # Get configuration
+    emitter = emitter or socketio
     emit_interval = float(os.getenv('EMITTER_SLEEP_MS', '100')) / 1000
     symbols_per_tick = int(os.getenv('SYMBOLS_PER_TICK', '2'))
     
-    # Get all symbols
-    mongo = PyMongo(_app)
-    market_service = MarketAIService(mongo)
-    all_symbols = market_service.get_supported_symbols('all')
+    # Get all symbols (prices are cached in Mongo, so it has to be there)
+    try:
+        mongo = PyMongo(_app)
+        market_service = MarketAIService(mongo)
+        all_symbols = market_service.get_supported_symbols('all')
+    except Exception as e:
+        print(f"[ERROR] Market emitter cannot start (is MONGO_URI set?): {e}")
+        return
     
     print(f"[OK] Loaded {len(all_symbols)} symbols")
     print(f"[OK] Will emit {symbols_per_tick} symbols per tick, every {emit_interval*1000:.0f}ms")
@@ -159,18 +154,20 @@ def emit_market_updates():
                         # Emit market update
                         print(f"[{tick}] Emitting {symbol}: ${price_data.get('price', 'N/A')} (stress: {stress})")
                         
-                        emit('market_update', {
+                        # Only clients subscribed to this symbol receive it
+                        room = market_room(symbol)
+                        emitter.emit('market_update', {
                             'symbol': symbol,
                             'type': symbol_type,
                             'data': price_data
-                        }, namespace='/', broadcast=True)
+                        }, namespace='/', to=room)
                         
-                        # Emit stress update
-                        emit('stress_update', {
+                        # Emit market stress (own event: 'stress_update' is the user's)
+                        emitter.emit('market_stress_update', {
                             'symbol': symbol,
                             'level': stress,
                             'time': datetime.utcnow().isoformat()
-                        }, namespace='/', broadcast=True)
+                        }, namespace='/', to=room)
                         
                     except Exception as e:
                         print(f"[ERROR] Processing {symbol}: {e}")
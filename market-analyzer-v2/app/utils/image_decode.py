@@ -0,0 +1,121 @@
+import os
+import threading
+
+import cv2
+import numpy as np
+
+# libjpeg can decode straight to grayscale at 1/2, 1/4 or 1/8 size (it skips
+# the chroma planes and most of the IDCT work), much cheaper than a full
+# colour decode followed by cvtColor and a resize
+REDUCED_GRAYSCALE = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+# Smallest face worth finding, as a fraction of the frame's short side
+# (a webcam user at a desk fills far more); REDUCED_DECODE=0 disables it
+MIN_FACE_FRACTION = float(os.getenv("DECODE_MIN_FACE_FRACTION", "0.15"))
+REDUCED_DECODE = os.getenv("REDUCED_DECODE", "1") != "0"
+
+# SOFn markers carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) do not
+_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def jpeg_size(data):
+    """
+    (width, height) read from a JPEG's frame header without decoding it,
+    or None when `data` is not a JPEG (PNG, WebP...) or is truncated.
+    """
+    view = memoryview(data).cast("B")
+    n = view.nbytes
+    if n < 4 or view[0] != 0xFF or view[1] != 0xD8:
+        return None
+    i = 2
+    while i + 4 <= n:
+        if view[i] != 0xFF:
+            return None
+        marker = view[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:  # no length field
+            i += 2
+            continue
+        length = (view[i + 2] << 8) | view[i + 3]
+        if marker in _SOF_MARKERS:
+            if i + 9 > n:
+                return None
+            height = (view[i + 5] << 8) | view[i + 6]
+            width = (view[i + 7] << 8) | view[i + 8]
+            return (width, height) if width and height else None
+        if marker == 0xDA:  # start of scan before any frame header
+            return None
+        i += 2 + length
+    return None
+
+
+def choose_reduction(width, height, min_side=0, detector_scale=1.0, min_face=0,
+                     min_roi=0, min_face_fraction=MIN_FACE_FRACTION) -> int:
+    """
+    Largest libjpeg reduction (8, 4, 2 or 1) for a width x height frame.
+
+    The decoded short side must stay >= `min_side`, and a face of
+    `min_face_fraction` of the frame must keep >= `min_roi` pixels, since
+    the model input is cut from the reduced image. With a face detector
+    that shrinks its input by `detector_scale`, reductions up to
+    1/detector_scale cost detection nothing (it then runs at a larger scale
+    and sees the same pixels); past that, the same face must also stay
+    >= the detector's `min_face` pixels.
+    """
+    short = min(width, height)
+    for factor in (8, 4, 2):
+        decoded = short / factor
+        face = decoded * min_face_fraction
+        if decoded < min_side or face < min_roi:
+            continue
+        if min_face and factor * detector_scale > 1.0 and face < min_face:
+            continue
+        return factor
+    return 1
+
+
+def decode_gray(data, min_side=0, detector_scale=1.0, min_face=0, min_roi=0):
+    """
+    Decode encoded image bytes straight to a grayscale uint8 array, at the
+    reduction choose_reduction() allows for a JPEG (full size otherwise).
+    Returns (gray, factor), or (None, 1) when the bytes do not decode.
+    """
+    factor = 1
+    if REDUCED_DECODE:
+        size = jpeg_size(data)
+        if size is not None:
+            factor = choose_reduction(*size, min_side=min_side, detector_scale=detector_scale,
+                                      min_face=min_face, min_roi=min_roi)
+    gray = cv2.imdecode(np.frombuffer(data, np.uint8), REDUCED_GRAYSCALE[factor])
+    if gray is None:
+        return None, 1
+    return gray, factor
+
+
+_buffers = threading.local()
+
+
+def resize_into(src, size, interpolation=cv2.INTER_AREA):
+    """
+    cv2.resize into a per-thread buffer preallocated for (size, dtype), so
+    the per-frame resizes stop allocating. The result is overwritten by the
+    next call on the same thread with the same size: copy it (astype does)
+    before keeping it.
+    """
+    width, height = size
+    shape = (height, width) + src.shape[2:]
+    pool = getattr(_buffers, "pool", None)
+    if pool is None or len(pool) > 8:  # frame sizes changed; start over
+        pool = _buffers.pool = {}
+    key = (shape, src.dtype.str)
+    dst = pool.get(key)
+    if dst is None:
+        dst = pool[key] = np.empty(shape, src.dtype)
+    return cv2.resize(src, (width, height), dst=dst, interpolation=interpolation)
@@ -0,0 +1,60 @@
+import base64
+import binascii
+
+# Multipart field names accepted for an uploaded frame
+UPLOAD_FIELDS = ("image", "frame", "file")
+
+
+class ImagePayloadError(ValueError):
+    """The request did not carry a usable encoded image."""
+
+
+def decode_image_payload(payload):
+    """
+    Encoded image bytes (JPEG / PNG / WebP) from whatever a client sent.
+
+    Binary payloads (Socket.IO attachments, request bodies) come back as a
+    zero-copy memoryview that cv2.imdecode can read through np.frombuffer.
+    Strings are the legacy base64 form, either a data URL
+    ("data:image/jpeg;base64,...") or bare base64.
+    """
+    if isinstance(payload, (bytes, bytearray, memoryview)):
+        view = memoryview(payload)
+        if not view.nbytes:
+            raise ImagePayloadError("Empty image payload")
+        return view
+
+    if isinstance(payload, str):
+        encoded = payload.split(",", 1)[1] if payload.startswith("data:") else payload
+        try:
+            return memoryview(base64.b64decode(encoded, validate=False))
+        except (binascii.Error, ValueError) as e:
+            raise ImagePayloadError(f"Invalid base64 image: {e}") from e
+
+    raise ImagePayloadError(f"Unsupported image payload type: {type(payload).__name__}")
+
+
+def image_from_request(req):
+    """
+    The image in a Flask request, as a memoryview:
+    - application/octet-stream or image/* body: the raw bytes
+    - multipart/form-data: the first of the UPLOAD_FIELDS files
+    - JSON {"image": "<base64 or data URL>"}: the legacy form
+    """
+    mimetype = req.mimetype or ""
+
+    if mimetype == "application/octet-stream" or mimetype.startswith("image/"):
+        return decode_image_payload(req.get_data(cache=False))
+
+    if mimetype == "multipart/form-data":
+        for field in UPLOAD_FIELDS:
+            upload = req.files.get(field)
+            if upload is not None:
+                return decode_image_payload(upload.read())
+        raise ImagePayloadError(f"Missing file field, expected one of {', '.join(UPLOAD_FIELDS)}")
+
+    data = req.get_json(silent=True) or {}
+    image = data.get("image")
+    if not image:
+        raise ImagePayloadError("Missing 'image' in request body")
+    return decode_image_payload(image)
@@ -0,0 +1,57 @@
+import time
+from collections import deque
+
+
+class RollingMinMax:
+    """
+    Minimum and maximum of a stream over the last `window_seconds`.
+
+    Two monotonic deques hold only the samples that can still become the
+    window's min or max, so each update is O(1) amortised and memory is
+    bounded by the samples inside the window, however long the stream runs.
+    """
+
+    __slots__ = ("window_seconds", "_mins", "_maxs", "count")
+
+    def __init__(self, window_seconds=300.0):
+        self.window_seconds = float(window_seconds)
+        self._mins = deque()  # (t, value), values increasing
+        self._maxs = deque()  # (t, value), values decreasing
+        self.count = 0
+
+    def update(self, value, now=None):
+        """Add a sample and return the window's (min, max)."""
+        now = time.monotonic() if now is None else now
+        value = float(value)
+        self.count += 1
+
+        while self._mins and self._mins[-1][1] >= value:
+            self._mins.pop()
+        self._mins.append((now, value))
+        while self._maxs and self._maxs[-1][1] <= value:
+            self._maxs.pop()
+        self._maxs.append((now, value))
+
+        cutoff = now - self.window_seconds
+        while self._mins[0][0] < cutoff:
+            self._mins.popleft()
+        while self._maxs[0][0] < cutoff:
+            self._maxs.popleft()
+        return self._mins[0][1], self._maxs[0][1]
+
+    @property
+    def min(self):
+        return self._mins[0][1] if self._mins else None
+
+    @property
+    def max(self):
+        return self._maxs[0][1] if self._maxs else None
+
+    def __len__(self):
+        """Samples currently retained (not the total seen)."""
+        return len(self._mins) + len(self._maxs)
+
+    def reset(self):
+        self._mins.clear()
+        self._maxs.clear()
+        self.count = 0
@@ -0,0 +1,63 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """
+    Records how long each startup phase takes, including phases that finish
+    in background threads (model warm-up, database connect) after the HTTP
+    server is already accepting requests.
+    """
+
+    def __init__(self):
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            self.record(name, started, time.perf_counter(), error)
+
+    def record(self, name, started, finished, error=None):
+        entry = {
+            "phase": name,
+            "thread": threading.current_thread().name,
+            "started_at_s": round(started - self._t0, 3),
+            "seconds": round(finished - started, 3),
+        }
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self.phases.append(entry)
+
+    def set_origin(self, t0):
+        """Measure from an earlier perf_counter() reading, e.g. the top of run.py."""
+        self._t0 = t0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def report(self) -> list:
+        with self._lock:
+            return [dict(p) for p in self.phases]
+
+    def print_report(self):
+        print("⏱️ Startup timing:")
+        for p in self.report():
+            print(
+                f"   {p['phase']:<28} {p['seconds']:7.3f}s  "
+                f"(at +{p['started_at_s']:.3f}s, {p['thread']})"
+            )
+
+
+# Shared timer; created on first import, which is the start of process startup
+startup_timer = StartupTimer()
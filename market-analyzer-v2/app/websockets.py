@@ -1,56 +1,200 @@
-import base64
 import time
 import os
 import requests
 from dotenv import load_dotenv
+from flask import request
+from flask_socketio import ConnectionRefusedError, emit, join_room, leave_room
 
-from .extensions import socketio
-from .services.stress_model_service import stress_model_service
+from .extensions import mongo, socketio
+from .services.frame_gate import LatestFrameGate
+from .services.socket_sessions import (
+    HR_ROOM,
+    LIVE_ROOM,
+    SocketSessions,
+    identity_from_token,
+    market_room,
+)
+from .services.stress_model_service import FACE_CROP_BYTES, stress_model_service
 from .services.alert_service_ai import get_alert_service
+from .services.executors import offload
+from .utils.image_payload import decode_image_payload
 
 # Load environment variables from a .env file
 load_dotenv()
 ALPHA_VANTAGE_API_KEY = os.getenv('ALPHA_VANTAGE_KEY', 'demo')
+# Reject sockets without a token (otherwise they only get market data and
+# their own results)
+SOCKET_REQUIRE_AUTH = os.getenv('SOCKET_REQUIRE_AUTH', '0') == '1'
+MAX_SUBSCRIBED_SYMBOLS = int(os.getenv('MAX_SUBSCRIBED_SYMBOLS', '100'))
 
 # Global alert service
 _alert_service = None
 
+# Per-client backpressure: one frame in analysis, the newest one waiting
+frame_gate = LatestFrameGate(
+    min_interval=float(os.getenv("FRAME_MIN_INTERVAL_MS", "1000")) / 1000.0,
+    max_interval=float(os.getenv("FRAME_MAX_INTERVAL_MS", "5000")) / 1000.0,
+)
+
+# sid -> user, bound once on connect
+socket_sessions = SocketSessions()
+
 def get_alert_service_instance(mongo=None):
     global _alert_service
     if _alert_service is None and mongo:
         _alert_service = get_alert_service(mongo)
     return _alert_service
 
+def _token_from_handshake(auth):
+    """Access token from the Socket.IO auth payload, ?token=, or a Bearer header."""
+    if isinstance(auth, dict) and auth.get('token'):
+        return auth['token']
+    if request.args.get('token'):
+        return request.args['token']
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return header[len('Bearer '):]
+    return None
+
+
+def _lookup_role(user_id):
+    """Role of a user whose token only carries the id."""
+    try:
+        from bson import ObjectId
+
+        user = mongo.db.users.find_one({'_id': ObjectId(user_id)}, {'role': 1})
+        return (user or {}).get('role')
+    except Exception as e:
+        print(f"[ERROR] Role lookup for {user_id}: {e}")
+        return None
+
+
 @socketio.on('connect')
-def handle_connect():
-    """Handles a new client connection."""
-    print('✓ Client connected')
+def handle_connect(auth=None):
+    """
+    Handles a new client connection. The JWT (auth={'token': ...}) is
+    verified once here and the socket joins its user's room, plus the HR
+    room for hr/admin users.
+    """
+    token = _token_from_handshake(auth)
+    if not token:
+        if SOCKET_REQUIRE_AUTH:
+            raise ConnectionRefusedError('Authentication required')
+        print('✓ Client connected (anonymous)')
+        return
+
+    try:
+        identity = identity_from_token(token, lookup_role=_lookup_role)
+    except Exception as e:
+        print(f"✗ Socket auth rejected: {e}")
+        raise ConnectionRefusedError('Invalid or expired token')
+
+    socket_sessions.bind(request.sid, identity)
+    join_room(identity.room)
+    if identity.is_hr:
+        join_room(HR_ROOM)
+    print(f'✓ Client connected (user {identity.user_id}, {identity.role})')
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handles a client disconnection."""
+    stress_model_service.cache.clear(request.sid)
+    frame_gate.drop_session(request.sid)
+    socket_sessions.drop(request.sid)
     print('✗ Client disconnected')
 
+
+def _subscription_rooms(data):
+    """Rooms named by a subscribe/unsubscribe payload that this socket may use."""
+    data = data or {}
+    symbols = data.get('symbols') or []
+    if isinstance(symbols, str):
+        symbols = [symbols]
+    rooms = [market_room(symbol) for symbol in symbols[:MAX_SUBSCRIBED_SYMBOLS] if symbol]
+    if data.get('live'):
+        rooms.append(LIVE_ROOM)
+    if data.get('hr'):
+        identity = socket_sessions.get(request.sid)
+        if identity is not None and identity.is_hr:
+            rooms.append(HR_ROOM)
+    return rooms
+
+
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    """
+    Join rooms: {"symbols": ["AAPL", "BTC"], "live": true, "hr": true}.
+    "live" is the server camera's stress stream; "hr" is only granted to
+    hr/admin users. Returns the joined rooms as the ack.
+    """
+    rooms = _subscription_rooms(data)
+    for room in rooms:
+        join_room(room)
+    return {'rooms': rooms}
+
+
+@socketio.on('unsubscribe')
+def handle_unsubscribe(data):
+    """Leave rooms named like in 'subscribe'."""
+    rooms = _subscription_rooms(data)
+    for room in rooms:
+        leave_room(room)
+    return {'rooms': rooms}
+
+
+def _stress_result_emitter(sid):
+    """
+    on_done for the frame gate: the stress update goes to the sender's user
+    room (all of that user's tabs) or, for anonymous sockets, to the sender
+    only; the frame_ack always goes to the sender.
+    """
+    identity = socket_sessions.get(sid)
+    room = identity.room if identity is not None else sid
+
+    def emit_result(stress_level, ack):
+        socketio.emit('stress_update', {
+            'level': stress_level,
+            'timestamp': time.time()
+        }, to=room)
+        # Clients that honour it pace their sends by suggested_interval_ms
+        emit('frame_ack', ack)
+
+    return emit_result
+
+
+def _frame_error_emitter(label):
+    """
+    on_error for the frame gate: a frame that could not be analysed (e.g. a
+    corrupt payload) still gets its frame_ack, with an "error" field, so the
+    client keeps pacing; the gate moves on to the newest waiting frame.
+    """
+    def emit_error(error, ack):
+        print(f"[ERROR] Processing {label}: {error}")
+        emit('frame_ack', ack)
+
+    return emit_error
+
+
 @socketio.on('video_frame')
-def handle_video_frame(data_url, user_id='user_default'):
+def handle_video_frame(frame, user_id='user_default'):
     """
     Receives a video frame from the client, processes it using the AI model,
     and sends back the predicted stress level. Also triggers alert system.
+    `frame` is a binary attachment (JPEG/WebP bytes) or, from older
+    clients, a base64 data URL.
+    While the previous frame of this client is still being analysed, only
+    the newest incoming frame is kept (see LatestFrameGate).
     """
-    try:
-        # Decode the base64 image data URL
-        header, encoded = data_url.split(",", 1)
-        image_data = base64.b64decode(encoded)
+    sid = request.sid
 
+    def analyze(payload):
         # Get prediction from the AI model service
-        stress_level = stress_model_service.predict(image_data)
+        return stress_model_service.predict(decode_image_payload(payload), cache_scope=sid)
+
+    try:
+        frame_gate.submit(sid, frame, analyze, _stress_result_emitter(sid),
+                          _frame_error_emitter("frame"))
 
-        # Emit the result back to the client
-        socketio.emit('stress_update', {
-            'level': stress_level,
-            'timestamp': time.time()
-        })
-        
         # Check stress level and send alerts if needed
         # from flask import current_app
         # alert_service = get_alert_service_instance(current_app.mongo)
@@ -58,16 +202,40 @@ def handle_video_frame(data_url, user_id='user_default'):
         #     alert = alert_service.check_stress_and_alert(user_id, stress_level)
         #     if alert:
         #         socketio.emit('alert_notification', alert)
-        
+
     except Exception as e:
         print(f"[ERROR] Processing frame: {e}")
 
 
+@socketio.on('face_crop')
+def handle_face_crop(crop):
+    """
+    Receives a face the client already detected and cropped: a binary
+    attachment of exactly 4096 bytes (64x64 uint8 grayscale, row-major).
+    Skips decode and detection; wrongly sized crops get a 'frame_error'.
+    Shares the per-client frame gate with video_frame.
+    """
+    if not isinstance(crop, (bytes, bytearray, memoryview)) or len(crop) != FACE_CROP_BYTES:
+        emit('frame_error', {'error': f'face_crop must be a {FACE_CROP_BYTES}-byte binary attachment'})
+        return
+
+    sid = request.sid
+    try:
+        frame_gate.submit(
+            sid,
+            crop,
+            lambda c: stress_model_service.predict_crop(c, cache_scope=sid),
+            _stress_result_emitter(sid),
+            _frame_error_emitter("face crop"),
+        )
+    except Exception as e:
+        print(f"[ERROR] Processing face crop: {e}")
+
 
 def market_data_fetcher():
     """
     A background task that fetches real-time market data from Alpha Vantage
-    and broadcasts it to all connected clients.
+    and sends each symbol to its market room.
     """
     # Symbols for assets to track
     crypto_symbols = ['BTC', 'ETH']
@@ -85,7 +253,7 @@ def market_data_fetcher():
             # Fetch Crypto Data
             for symbol in crypto_symbols:
                 url = f'https://www.alphavantage.co/query?function=CURRENCY_EXCHANGE_RATE&from_currency={symbol}&to_currency=USD&apikey={ALPHA_VANTAGE_API_KEY}'
-                r = requests.get(url)
+                r = offload("http", requests.get, url, timeout=10)
                 r.raise_for_status() # Raise an exception for bad status codes
                 data = r.json()
                 if 'Realtime Currency Exchange Rate' in data:
@@ -94,12 +262,17 @@ def market_data_fetcher():
                 else:
                     print(f"Warning: Could not parse {symbol} crypto price. Response: {data}")
                     market_data['crypto'][symbol] = 'N/A'
+                socketio.emit('market_update', {
+                    'symbol': symbol,
+                    'type': 'crypto',
+                    'data': {'price': market_data['crypto'][symbol]},
+                }, to=market_room(symbol))
                 socketio.sleep(15) # Stagger API calls to avoid rate limiting
 
             # Fetch Stock Data
             for symbol in stock_symbols:
                 url = f'https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={ALPHA_VANTAGE_API_KEY}'
-                r = requests.get(url)
+                r = offload("http", requests.get, url, timeout=10)
                 r.raise_for_status()
                 data = r.json()
                 if 'Global Quote' in data and data['Global Quote'] and '05. price' in data['Global Quote']:
@@ -108,9 +281,12 @@ def market_data_fetcher():
                 else:
                     print(f"Warning: Could not parse {symbol} stock price. Response: {data}")
                     market_data['stocks'][symbol] = 'N/A'
+                socketio.emit('market_update', {
+                    'symbol': symbol,
+                    'type': 'stock',
+                    'data': {'price': market_data['stocks'][symbol]},
+                }, to=market_room(symbol))
                 socketio.sleep(15) # Stagger API calls
-
-            socketio.emit('market_update', {'data': market_data})
             
         except requests.exceptions.RequestException as e:
             print(f"Error fetching from API: {e}")
@@ -2,8 +2,12 @@ import React, { useRef, useEffect, useCallback } from 'react';
 import Webcam from 'react-webcam';
 import { useData } from '../contexts/DataContext';
 
+const DEFAULT_INTERVAL_MS = 1000;
+
 const BackgroundStressWorker = () => {
     const webcamRef = useRef(null);
+    // Send interval, adapted to the server's frame_ack suggestions
+    const intervalRef = useRef(DEFAULT_INTERVAL_MS);
     const { socket, setCameraStream } = useData();
 
     // 1. Share the stream with the rest of the app when camera starts
@@ -16,22 +20,42 @@ const BackgroundStressWorker = () => {
     const captureAndSend = useCallback(() => {
         if (webcamRef.current && socket?.connected) {
             try {
-                // Get screenshot (base64)
-                const imageSrc = webcamRef.current.getScreenshot();
-                if (imageSrc) {
-                    // Emit to backend for processing
-                    socket.emit('video_frame', imageSrc);
-                }
+                // Grab the frame as a JPEG Blob (no base64 data URL)
+                const canvas = webcamRef.current.getCanvas();
+                if (!canvas) return;
+                canvas.toBlob(async (blob) => {
+                    if (!blob || !socket.connected) return;
+                    // ArrayBuffers go out as Socket.IO binary attachments
+                    socket.emit('video_frame', await blob.arrayBuffer());
+                }, 'image/jpeg', 0.8);
             } catch (err) {
                 console.error("Frame capture error:", err);
             }
         }
     }, [socket]);
 
-    // 3. Set Interval (1 FPS)
+    // 3. Follow the server's pacing: it acks each analysed frame with a
+    //    suggested interval, longer when our frames are being dropped
+    useEffect(() => {
+        if (!socket) return undefined;
+        const handleAck = (ack) => {
+            if (ack && ack.suggested_interval_ms > 0) {
+                intervalRef.current = ack.suggested_interval_ms;
+            }
+        };
+        socket.on('frame_ack', handleAck);
+        return () => socket.off('frame_ack', handleAck);
+    }, [socket]);
+
+    // 4. Capture timer (starts at 1 FPS, then paced by frame_ack)
     useEffect(() => {
-        const interval = setInterval(captureAndSend, 1000);
-        return () => clearInterval(interval);
+        let timer;
+        const tick = () => {
+            captureAndSend();
+            timer = setTimeout(tick, intervalRef.current);
+        };
+        timer = setTimeout(tick, intervalRef.current);
+        return () => clearTimeout(timer);
     }, [captureAndSend]);
 
     return (
@@ -18,11 +18,13 @@ const WebcamMonitor = () => {
     const ctx = canvas.getContext('2d')
     ctx.drawImage(video, 0, 0)
 
-    const imageData = canvas.toDataURL('image/jpeg', 0.8)
+    // Raw JPEG bytes: a third smaller than a base64 data URL
+    const blob = await new Promise((resolve) => canvas.toBlob(resolve, 'image/jpeg', 0.8))
+    if (!blob) return
 
     try {
-      const response = await axios.post('/api/stress/analyze', {
-        image: imageData,
+      const response = await axios.post('/api/stress/analyze', blob, {
+        headers: { 'Content-Type': 'application/octet-stream' },
       })
       console.log('Stress analysis:', response.data)
     } catch (error) {
@@ -6,11 +6,20 @@ import React, {
   useEffect,
   useMemo,
   useRef,
+  useCallback,
 } from "react";
 import { io } from "socket.io-client";
 
 const DataContext = createContext(null);
 
+const storedUserRole = () => {
+  try {
+    return JSON.parse(localStorage.getItem("user") || "{}").role;
+  } catch {
+    return undefined;
+  }
+};
+
 export const DataProvider = ({ children }) => {
   const [isConnected, setIsConnected] = useState(false);
   const [symbolData, setSymbolData] = useState({});
@@ -21,6 +30,8 @@ export const DataProvider = ({ children }) => {
 
   const socketRef = useRef(null);
   const initializeAttemptedRef = useRef(false);
+  // room key ("symbol:AAPL" / "live") -> number of mounted components using it
+  const roomCountsRef = useRef(new Map());
 
   useEffect(() => {
     if (initializeAttemptedRef.current) return;
@@ -38,11 +49,20 @@ export const DataProvider = ({ children }) => {
       timeout: 30000,
       autoConnect: true,
       reconnection: true,
+      // verified once by the server on connect; read on every (re)connect
+      auth: (cb) => cb({ token: localStorage.getItem("accessToken") }),
     });
 
     newSocket.on("connect", () => {
       console.log("✓ Socket.IO connected with ID:", newSocket.id);
       setIsConnected(true);
+      // rooms are per connection, so (re)join them after every connect:
+      // only what the mounted pages asked for (see useSubscription)
+      const role = storedUserRole();
+      newSocket.emit("subscribe", {
+        ...roomsPayload([...roomCountsRef.current.keys()]),
+        hr: role === "hr" || role === "admin",
+      });
     });
 
     newSocket.on("disconnect", (reason) => {
@@ -67,6 +87,14 @@ export const DataProvider = ({ children }) => {
       }));
     });
 
+    // market volatility "stress" per symbol (not the user's stress)
+    newSocket.on("market_stress_update", (data) => {
+      setSymbolData((prev) => ({
+        ...prev,
+        [data.symbol]: { ...prev[data.symbol], symbol: data.symbol, stress: data.level },
+      }));
+    });
+
     // stress updates from backend model
     newSocket.on("stress_update", (data) => {
       setStressHistory((prevHistory) => {
@@ -123,6 +151,34 @@ export const DataProvider = ({ children }) => {
     };
   }, []);
 
+  // Reference-counted room membership: the first user of a room joins it,
+  // the last one to unmount leaves it. Returns the release function.
+  const subscribe = useCallback((keys) => {
+    const counts = roomCountsRef.current;
+    const added = keys.filter((key) => {
+      counts.set(key, (counts.get(key) || 0) + 1);
+      return counts.get(key) === 1;
+    });
+    if (added.length && socketRef.current?.connected) {
+      socketRef.current.emit("subscribe", roomsPayload(added));
+    }
+
+    return () => {
+      const removed = keys.filter((key) => {
+        const left = (counts.get(key) || 1) - 1;
+        if (left > 0) {
+          counts.set(key, left);
+          return false;
+        }
+        counts.delete(key);
+        return true;
+      });
+      if (removed.length && socketRef.current?.connected) {
+        socketRef.current.emit("unsubscribe", roomsPayload(removed));
+      }
+    };
+  }, []);
+
   const dataContextValue = useMemo(
     () => ({
       socket: socketRef.current,
@@ -131,8 +187,9 @@ export const DataProvider = ({ children }) => {
       stressHistory,
       cameraStream,
       setCameraStream,
+      subscribe,
     }),
-    [isConnected, symbolData, stressHistory, cameraStream]
+    [isConnected, symbolData, stressHistory, cameraStream, subscribe]
   );
 
   return (
@@ -142,6 +199,27 @@ export const DataProvider = ({ children }) => {
   );
 };
 
+const roomsPayload = (keys) => ({
+  symbols: keys
+    .filter((key) => key.startsWith("symbol:"))
+    .map((key) => key.slice("symbol:".length)),
+  live: keys.includes("live"),
+});
+
+// Receive market updates for `symbols` (and the server camera's stress
+// stream with live: true) while the calling component is mounted
+export const useSubscription = ({ symbols = [], live = false } = {}) => {
+  const { subscribe } = useData();
+  const symbolKey = [...new Set(symbols)].sort().join(",");
+
+  useEffect(() => {
+    const keys = symbolKey ? symbolKey.split(",").map((s) => `symbol:${s}`) : [];
+    if (live) keys.push("live");
+    if (!keys.length) return undefined;
+    return subscribe(keys);
+  }, [subscribe, symbolKey, live]);
+};
+
 export const useData = () => {
   const context = useContext(DataContext);
   if (!context) {
@@ -6,7 +6,7 @@ import React, {
   useState,
   useEffect,
 } from "react";
-import { useData } from "../contexts/DataContext";
+import { useData, useSubscription } from "../contexts/DataContext";
 import { useAuth } from "../contexts/AuthContext";
 import {
   XAxis,
@@ -694,6 +694,17 @@ const TopStocksList = memo(({ stocks }) => {
 
 // --- 4. MAIN DASHBOARD ---
 
+const TOP_STOCK_SYMBOLS = [
+  "AAPL",
+  "GOOGL",
+  "MSFT",
+  "TSLA",
+  "AMZN",
+  "META",
+  "NVDA",
+  "AMD",
+];
+
 const Dashboard = () => {
   const dataContext = useData();
   const authContext = useAuth();
@@ -709,6 +720,9 @@ const Dashboard = () => {
 
   const [liveStress, setLiveStress] = useState(0);
 
+  // market rooms for the stocks shown here, plus the server camera stream
+  useSubscription({ symbols: TOP_STOCK_SYMBOLS, live: true });
+
   // backend stress from Socket.IO
   useEffect(() => {
     if (!socket) return;
@@ -738,17 +752,7 @@ const Dashboard = () => {
   const lastUpdateRef = useRef(0);
 
   const topStocks = useMemo(() => {
-    const stocks = [
-      "AAPL",
-      "GOOGL",
-      "MSFT",
-      "TSLA",
-      "AMZN",
-      "META",
-      "NVDA",
-      "AMD",
-    ];
-    return stocks
+    return TOP_STOCK_SYMBOLS
       .map((s) => ({ symbol: s, ...symbolData?.[s] }))
       .filter((s) => s.price)
       .sort((a, b) => b.price - a.price)
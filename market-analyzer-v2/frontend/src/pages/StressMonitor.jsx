@@ -5,7 +5,7 @@ import React, {
   useCallback,
   useMemo,
 } from "react";
-import { useData } from "../contexts/DataContext";
+import { useData, useSubscription } from "../contexts/DataContext";
 import { useAuth } from "../contexts/AuthContext";
 import {
   AreaChart,
@@ -102,6 +102,8 @@ const StressMonitor = () => {
     stressHistory: contextStressHistory,
     cameraStream,
   } = useData();
+  // the server camera's stress stream
+  useSubscription({ live: true });
 
   const videoRef = useRef(null);
   const mountedRef = useRef(true);
@@ -1,5 +1,5 @@
 import React, { useState, useMemo, useCallback, useRef } from 'react';
-import { useData } from '../contexts/DataContext';
+import { useData, useSubscription } from '../contexts/DataContext';
 import { 
     LineChart, Line, XAxis, YAxis, Tooltip, ResponsiveContainer, 
     BarChart, Bar, PieChart, Pie, Cell, AreaChart, Area 
@@ -94,6 +94,8 @@ const DetailedPriceChart = React.memo(({ data }) => (
 const Watchlist = () => {
     const { symbolData, isConnected } = useData();
     const [watchlistSymbols, setWatchlistSymbols] = useState(['AAPL', 'BTC', 'ETH', 'NVDA']);
+    // live prices only for the symbols on the watchlist
+    useSubscription({ symbols: watchlistSymbols });
     const [availableSymbols] = useState([
         'AAPL', 'GOOGL', 'MSFT', 'TSLA', 'AMZN', 'META', 'NVDA', 'AMD', 
         'BTC', 'ETH', 'XRP', 'ADA', 'SOL', 'DOGE'
@@ -1,204 +1,291 @@
-﻿import os
+﻿import time
+
+_import_started = time.perf_counter()
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- ASYNC MODE (before anything else imports socket / threading) ---
+# SOCKETIO_ASYNC_MODE=eventlet|gevent serves sockets and /video_feed streams
+# on green threads instead of one OS thread each; blocking work is moved to
+# bounded pools (app/services/executors.py). Default stays "threading".
+ASYNC_MODE = os.getenv("SOCKETIO_ASYNC_MODE", "threading")
+if ASYNC_MODE == "eventlet":
+    import eventlet
+
+    eventlet.monkey_patch()
+elif ASYNC_MODE == "gevent":
+    from gevent import monkey
+
+    monkey.patch_all()
+
 import threading
 import cv2
 import numpy as np
-import dlib  # kept for compatibility / feature extraction
-import time
-from dotenv import load_dotenv
-from twilio.rest import Client
-from flask_socketio import emit
-from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array
+from app.utils.startup_timer import startup_timer
+
+startup_timer.set_origin(_import_started)
 from app import create_app, socketio
 from app.tasks_new import emit_market_updates, set_app
+from app.services.face_analysis import FaceAnalysis, FaceFrame, FaceTracker
+from app.services.face_detectors import create_face_detector
+from app.services.frame_broadcaster import FrameBroadcaster
+from app.services.model_registry import model_registry, MINI_XCEPTION_PATH
+from app.services.live_pipeline import LiveStressPipeline
+from app.services.inference_scheduler import AdaptiveInferenceScheduler
+from app.services.inference_cache import PerceptualHashCache
+from app.services.blink_detection import BlinkAnalyzer
+from app.services.eyebrow_detection import EyebrowAnalyzer
+from app.services.emotion_recognition import stress_label
+from app.services.executors import call_native, executor_stats, get_executor
+from app.services.stress_model_service import stress_model_service
+from app.services.socket_sessions import HR_ROOM, LIVE_ROOM
+from app.websockets import frame_gate, socket_sessions
 
 from werkzeug.utils import secure_filename
 from flask import send_from_directory, request, jsonify, current_app, Response
 from flask_cors import CORS
-import pandas as pd
-from pymongo import MongoClient
-from bson.objectid import ObjectId
-import json
-from bson import json_util
-
-# Optional service modules
-try:
-    from app.services import blink_detection, eyebrow_detection, emotion_recognition
-    print("✅ Service modules imported: blink_detection, eyebrow_detection, emotion_recognition")
-except ImportError as e:
-    print(f"⚠️ Could not import service modules: {e}")
-    blink_detection = None
-    eyebrow_detection = None
-    emotion_recognition = None
+
+# Heavy dependencies (TensorFlow, dlib, Twilio, pandas, pymongo) are imported
+# only by the code paths that use them, so the HTTP API can bind quickly.
+
+startup_timer.record("imports", _import_started, time.perf_counter())
 
 # 1. Load Environment Variables
 load_dotenv()
 
 # --- GLOBALS FOR VIDEO STREAMING ---
-outputFrame = None
-lock = threading.Lock()
+# Frames are JPEG-encoded once per sequence number and shared by every viewer
+frame_broadcaster = FrameBroadcaster()
 
-# --- MONGODB CONNECTION SETUP ---
+# --- MONGODB CONNECTION SETUP (background, see connect_mongo) ---
 MONGO_URI = os.getenv("MONGO_URI")
 mongo_client = None
 users_collection = None
 
-if MONGO_URI:
-    try:
-        mongo_client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-        db = mongo_client.get_database()
-        users_collection = db["users"]
-        mongo_client.admin.command("ping")
-        print("✅ MongoDB Connected Successfully")
-    except Exception as e:
-        print(f"❌ MongoDB Connection Failed: {e}")
-        mongo_client = None
-        users_collection = None
-else:
-    print("⚠️ MONGO_URI not found in .env file. Profile saving will not work.")
 
-# 2. Setup Twilio Client
+def connect_mongo():
+    global mongo_client, users_collection
+
+    if not MONGO_URI:
+        print("⚠️ MONGO_URI not found in .env file. Profile saving will not work.")
+        return
+
+    with startup_timer.phase("mongo connect"):
+        try:
+            from pymongo import MongoClient
+
+            mongo_client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
+            db = mongo_client.get_database()
+            users_collection = db["users"]
+            mongo_client.admin.command("ping")
+            print("✅ MongoDB Connected Successfully")
+            if not hasattr(app, "mongo_client"):
+                app.mongo_client = mongo_client
+        except Exception as e:
+            print(f"❌ MongoDB Connection Failed: {e}")
+            mongo_client = None
+            users_collection = None
+
+# 2. Setup Twilio Client (created on first SMS)
 TWILIO_SID = os.getenv("TWILIO_SID")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE = os.getenv("TWILIO_PHONE_NUMBER")
 
 client = None
-if TWILIO_SID and TWILIO_AUTH_TOKEN:
-    try:
-        client = Client(TWILIO_SID, TWILIO_AUTH_TOKEN)
-        print("✅ Twilio Client Initialized")
-    except Exception as e:
-        print(f"⚠️ Twilio Error: {e}")
-        client = None
-else:
+if not (TWILIO_SID and TWILIO_AUTH_TOKEN):
     print("⚠️ Twilio credentials missing in .env")
 
-# 2.5 LOAD AI MODEL (camera stress) - NEW mini_XCEPTION checkpoint
-model_path = os.path.join("datasets", "facial", "_mini_XCEPTION.102-0.66.hdf5")
-emotion_model = None
 
-if os.path.exists(model_path):
-    try:
-        # compile=False avoids legacy optimizer lr argument issues
-        emotion_model = load_model(model_path, compile=False)
-        print(f"✅ AI Model loaded successfully: {os.path.basename(model_path)}")
-    except Exception as e:
-        print(f"❌ Failed to load AI Model: {e}")
-        emotion_model = None
-else:
-    print(f"⚠️ AI Model not found at: {model_path}")
+def get_twilio_client():
+    global client
+
+    if client is None and TWILIO_SID and TWILIO_AUTH_TOKEN:
+        try:
+            from twilio.rest import Client
 
-# detector + label list (same 7-class FER mapping as training script)
-detector = dlib.get_frontal_face_detector()
+            client = Client(TWILIO_SID, TWILIO_AUTH_TOKEN)
+            print("✅ Twilio Client Initialized")
+        except Exception as e:
+            print(f"⚠️ Twilio Error: {e}")
+            client = None
+    return client
+
+# 2.5 AI MODEL (camera stress) - NEW mini_XCEPTION checkpoint
+# Loaded and warmed up in the background (see warm_up_models); the live
+# thread waits for it. Backend (keras / tflite / onnx) comes from
+# EMOTION_BACKEND; Keras uses the traced single-frame call path.
+model_path = MINI_XCEPTION_PATH
+emotion_predict = None
+
+# label list (same 7-class FER mapping as training script)
 EMOTIONS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
 
-# Load dlib shape predictor for facial landmarks
+# face detector + dlib shape predictor, loaded by the live thread (load_face_models)
 shape_predictor_path = os.path.join("datasets", "facial", "shape_predictor_68_face_landmarks.dat")
+detector = None
 predictor = None
-if os.path.exists(shape_predictor_path):
-    try:
-        predictor = dlib.shape_predictor(shape_predictor_path)
-        print(f"✅ Shape predictor loaded: {os.path.basename(shape_predictor_path)}")
-    except Exception as e:
-        print(f"⚠️ Failed to load shape predictor: {e}")
-        predictor = None
-else:
-    print(f"⚠️ Shape predictor not found at: {shape_predictor_path}")
+face_tracker = None
+face_analysis = None
 
-# --- HELPER: Compute blink metric from frame ---
-def compute_blink_metric(gray_frame, frame_color):
-    if predictor is None:
-        return 0.5
 
-    try:
-        dets = detector(frame_color, 0)
-        if len(dets) == 0:
-            return 0.5
+def load_face_models():
+    """
+    Shared per-frame face analysis: detector + predictor run once per processed frame.
+    In tracking mode, full detection only runs every FACE_DETECT_INTERVAL frames
+    or when the correlation tracker loses confidence.
+    """
+    global detector, predictor, face_tracker, face_analysis
 
-        detection = dets[0]
-        shape = predictor(gray_frame, detection)
+    with startup_timer.phase("dlib face models"):
+        try:
+            import dlib
+        except ImportError as e:
+            print(f"❌ dlib not available - live face analysis disabled: {e}")
+            return False
+
+        # FACE_DETECTOR_BACKEND picks haar / hog / dnn; dlib HOG by default here
+        try:
+            detector = create_face_detector(default="hog")
+        except Exception as e:
+            print(f"⚠️ Face detector unavailable ({e}), using dlib HOG")
+            detector = create_face_detector("hog")
+        print(f"✅ Face detector: {detector.name} (scale {detector.scale:g})")
 
-        left_eye = np.array([[shape.part(i).x, shape.part(i).y] for i in range(36, 42)])
-        right_eye = np.array([[shape.part(i).x, shape.part(i).y] for i in range(42, 48)])
+        if os.path.exists(shape_predictor_path):
+            try:
+                predictor = dlib.shape_predictor(shape_predictor_path)
+                print(f"✅ Shape predictor loaded: {os.path.basename(shape_predictor_path)}")
+            except Exception as e:
+                print(f"⚠️ Failed to load shape predictor: {e}")
+                predictor = None
+        else:
+            print(f"⚠️ Shape predictor not found at: {shape_predictor_path}")
 
-        def eye_aspect_ratio(eye):
-            from scipy.spatial import distance as dist
+        if os.getenv("FACE_TRACKING", "1") == "1":
+            face_tracker = FaceTracker(
+                detect_interval=int(os.getenv("FACE_DETECT_INTERVAL", "10")),
+                min_confidence=float(os.getenv("FACE_TRACK_MIN_CONFIDENCE", "7.0")),
+            )
+        face_analysis = FaceAnalysis(detector, predictor, tracker=face_tracker)
+    return True
 
-            A = dist.euclidean(eye[1], eye[5])
-            B = dist.euclidean(eye[2], eye[4])
-            C = dist.euclidean(eye[0], eye[3])
-            return (A + B) / (2.0 * C)
 
-        left_ear = eye_aspect_ratio(left_eye)
-        right_ear = eye_aspect_ratio(right_eye)
-        avg_ear = (left_ear + right_ear) / 2.0
+TRACKING_REPORT_EVERY = 300
 
-        blink_metric = np.clip((avg_ear - 0.15) / 0.25, 0.0, 1.0)
-        return float(blink_metric)
-    except Exception as e:
-        print(f"⚠️ Blink metric error: {e}")
-        return 0.5
+# Which frames reach inference is decided at runtime from the measured capture
+# rate and inference latency, not a fixed stride
+inference_scheduler = AdaptiveInferenceScheduler(
+    target_hz=float(os.getenv("LIVE_TARGET_HZ", "5")),
+    cpu_budget=float(os.getenv("LIVE_CPU_BUDGET", "0.5")),
+    change_threshold=float(os.getenv("LIVE_SCENE_CHANGE_THRESHOLD", "2.0")),
+    max_idle_seconds=float(os.getenv("LIVE_MAX_IDLE_SECONDS", "1.0")),
+)
 
-# --- HELPER: Compute eyebrow metric from frame ---
-def compute_eyebrow_metric(gray_frame, frame_color):
-    if predictor is None:
-        return 0.5
+# A seated user produces long runs of near-identical frames; reuse the last
+# emotion vector when the frame's perceptual hash has barely moved
+live_emotion_cache = PerceptualHashCache(
+    max_entries=int(os.getenv("LIVE_CACHE_SIZE", "32")),
+    max_distance=int(os.getenv("LIVE_CACHE_MAX_DISTANCE", "6")),
+    ttl_seconds=float(os.getenv("LIVE_CACHE_TTL_SECONDS", "1.0")),
+)
+LIVE_CACHE_SCOPE = "live-camera"
 
-    try:
-        dets = detector(gray_frame, 0)
-        if len(dets) == 0:
-            return 0.5
 
-        detection = dets[0]
-        shape = predictor(gray_frame, detection)
+# Per-session landmark state of the live camera user
+# Landmarks are tracked at camera rate (track_live_frame), so the eye has to
+# stay closed for more than one frame to count as a blink
+blink_analyzer = BlinkAnalyzer(consec_frames=int(os.getenv("BLINK_CONSEC_FRAMES", "1")))
+# Eyebrow distance is normalised against this session's own recent range
+eyebrow_analyzer = EyebrowAnalyzer(
+    window_seconds=float(os.getenv("EYEBROW_WINDOW_SECONDS", "600")),
+)
 
-        left_brow = np.array([[shape.part(i).x, shape.part(i).y] for i in range(17, 22)])
-        right_brow = np.array([[shape.part(i).x, shape.part(i).y] for i in range(22, 27)])
 
-        from scipy.spatial import distance as dist
+def face_analysis_needed():
+    """Detection feeds the landmark metrics and the face-ROI emotion check."""
+    return face_analysis is not None
 
-        brow_distance = dist.euclidean(left_brow[-1], right_brow[0])
+# --- HELPER: Compute blink metric from the shared face context ---
+def compute_blink_metric(face):
+    if face.landmarks is None:
+        return 0.5
 
-        eyebrow_metric = 1.0 - np.clip(brow_distance / 100.0, 0.0, 1.0)
-        return float(eyebrow_metric)
+    try:
+        return blink_analyzer.update(face.landmarks)
     except Exception as e:
-        print(f"⚠️ Eyebrow metric error: {e}")
+        print(f"⚠️ Blink metric error: {e}")
         return 0.5
 
-# --- HELPER: Compute emotion recognition metric ---
-def compute_emotion_from_service(gray_frame, frame_color):
-    if emotion_recognition is None:
-        return "neutral", 0.5
+# Newest result of the tracking stage, read by the inference stage
+latest_face = None
+latest_blink_metric = 0.5
+
+
+def track_live_frame(frame_color):
+    """
+    Tracking stage, at camera rate and ahead of the scheduler's skip gate:
+    face position, landmarks and blink state for every frame it keeps up
+    with. A blink lasts 100-400 ms and barely changes the scheduler's
+    thumbnail, so the few-Hz inference stage alone would miss most of them.
+    """
+    global latest_face, latest_blink_metric
+
+    gray = cv2.cvtColor(frame_color, cv2.COLOR_BGR2GRAY)
+    face = call_native(face_analysis.analyze, frame_color, gray)
+    latest_blink_metric = compute_blink_metric(face)
+    latest_face = face
+
+    if face_tracker is not None and face_tracker.frames % TRACKING_REPORT_EVERY == 0:
+        stats = face_tracker.stats()
+        print(
+            f"📍 Face tracking: {stats['detections']}/{stats['frames']} frames ran full "
+            f"detection ({stats['detection_rate']:.0%}), "
+            f"{stats['confidence_fallbacks']} confidence fallbacks"
+        )
+
+# --- HELPER: Compute eyebrow metric from the shared face context ---
+def compute_eyebrow_metric(face):
+    if face.landmarks is None:
+        return 0.5
 
     try:
-        dets = detector(gray_frame, 0)
-        if len(dets) == 0:
-            return "neutral", 0.5
+        return eyebrow_analyzer.update(face.landmarks)
+    except Exception as e:
+        print(f"⚠️ Eyebrow metric error: {e}")
+        return 0.5
 
-        detection = dets[0]
+# --- HELPER: Compute emotion recognition metric from the shared face context ---
+def compute_emotion_from_service(face, predictions):
+    """
+    Stressed / not stressed from the frame's emotion vector, which
+    analyze_live_frame already computed (and cached): no second forward pass.
+    """
+    try:
+        if not face.has_face:
+            return "neutral", 0.5
 
-        if hasattr(emotion_recognition, "emotion_finder"):
-            emotion_label = emotion_recognition.emotion_finder(detection, gray_frame)
-            if emotion_label == "stressed":
-                stress_metric = 0.75
-            else:
-                stress_metric = 0.25
-            return emotion_label, stress_metric
+        emotion_label = stress_label(predictions)
+        if emotion_label == "stressed":
+            stress_metric = 0.75
         else:
-            return "neutral", 0.5
+            stress_metric = 0.25
+        return emotion_label, stress_metric
 
     except Exception as e:
         print(f"⚠️ Emotion recognition service error: {e}")
         return "neutral", 0.5
 
-# --- LIVE STRESS ANALYZER (BACKGROUND THREAD) ---
-def process_live_emotion():
-    global emotion_model, outputFrame, lock
+# --- LIVE STRESS ANALYZER (BACKGROUND PIPELINE) ---
+NO_FACE_THRESHOLD = 10
+no_face_frames = 0
+live_pipeline = None
 
-    if not emotion_model:
-        print("❌ No model - emotion processing disabled")
-        return
 
+def open_live_camera():
     cap = None
     for camera_idx in range(5):
         try:
@@ -222,150 +309,156 @@ def process_live_emotion():
                 print("✅ Camera works (default)...")
             else:
                 print("❌ Camera not accessible!")
-                return
+                return None
         else:
             print("❌ Camera not accessible!")
-            return
+            return None
 
     cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+    return cap
+
+
+def analyze_live_frame(frame_color):
+    """Inference stage: returns a stress_update payload, or None to emit nothing."""
+    global no_face_frames
+
+    gray = cv2.cvtColor(frame_color, cv2.COLOR_BGR2GRAY)
+    mean_brightness = float(np.mean(gray))
+    std_brightness = float(np.std(gray))
+
+    if mean_brightness < 10 or std_brightness < 3:
+        no_face_frames += 1
+        if no_face_frames == NO_FACE_THRESHOLD:
+            return {
+                "level": 0.0,
+                "emotion": "NO FACE",
+                "confidence": 0.0,
+                "face_detected": False,
+                "timestamp": "NO_FACE",
+            }
+        return None
 
-    frame_count = 0
     no_face_frames = 0
-    NO_FACE_THRESHOLD = 10
-
-    print("🎥🤖 LIVE STRESS ANALYSIS STARTED (Background)")
-
-    while cap.isOpened():
-        ret, frame_color = cap.read()
-        if not ret or frame_color is None:
-            time.sleep(0.1)
-            continue
 
-        # --- VIDEO STREAMING LOGIC ---
-        # We capture the frame here and store it globally so /video_feed can read it.
-        # We do this every frame for smooth video.
-        with lock:
-            outputFrame = frame_color.copy()
-
-        # --- AI PROCESSING LOGIC ---
-        # We only process stress every 3rd frame to save CPU
-        frame_count += 1
-        if frame_count % 3 != 0:
-            continue
+    resized = cv2.resize(gray, (64, 64))
+    cache_key = live_emotion_cache.key(resized)
+    predictions = live_emotion_cache.get(cache_key, LIVE_CACHE_SCOPE)
+    if predictions is None:
+        norm = resized.astype("float32") / 255.0
+        arr = norm[np.newaxis, :, :, np.newaxis]
+        predictions = call_native(emotion_predict, arr)[0]
+        live_emotion_cache.put(cache_key, predictions, LIVE_CACHE_SCOPE)
+    stress_emotions = predictions[0:3]
+    stress_level_model = float(np.mean(stress_emotions))
+
+    emotion_idx = int(np.argmax(predictions))
+    emotion_name = (
+        EMOTIONS[emotion_idx] if 0 <= emotion_idx < len(EMOTIONS) else "unknown"
+    )
+    confidence = float(predictions[emotion_idx])
+
+    # Detection + landmarks come from the tracking stage's newest frame,
+    # shared by every metric
+    face = latest_face if latest_face is not None else FaceFrame(frame_color, gray)
+
+    blink_metric = latest_blink_metric
+    # blink rate over the last minute against a resting rate (0.5 until known)
+    blink_rate_stress = blink_analyzer.rate_stress(0)
+    eyebrow_metric = compute_eyebrow_metric(face)
+    service_emotion, service_stress = compute_emotion_from_service(face, predictions)
+
+    fused_stress_level = float(
+        np.clip(
+            0.40 * stress_level_model
+            + 0.10 * (1.0 - blink_metric)
+            + 0.10 * blink_rate_stress
+            + 0.20 * eyebrow_metric
+            + 0.20 * service_stress,
+            0.0,
+            1.0,
+        )
+    )
 
-        try:
-            gray = cv2.cvtColor(frame_color, cv2.COLOR_BGR2GRAY)
-            mean_brightness = float(np.mean(gray))
-            std_brightness = float(np.std(gray))
-
-            if mean_brightness < 10 or std_brightness < 3:
-                no_face_frames += 1
-                if no_face_frames == NO_FACE_THRESHOLD:
-                    socketio.emit(
-                        "stress_update",
-                        {
-                            "level": 0.0,
-                            "emotion": "NO FACE",
-                            "confidence": 0.0,
-                            "face_detected": False,
-                            "timestamp": "NO_FACE",
-                        },
-                    )
-                continue
-
-            if no_face_frames >= NO_FACE_THRESHOLD:
-                pass
-            no_face_frames = 0
-
-            resized = cv2.resize(gray, (64, 64))
-            norm = resized.astype("float32") / 255.0
-            norm = np.expand_dims(norm, axis=-1)
-            arr = img_to_array(norm)
-            arr = np.expand_dims(arr, axis=0)
-
-            predictions = emotion_model.predict(arr, verbose=0)[0]
-            stress_emotions = predictions[0:3]
-            stress_level_model = float(np.mean(stress_emotions))
-
-            emotion_idx = int(np.argmax(predictions))
-            emotion_name = (
-                EMOTIONS[emotion_idx] if 0 <= emotion_idx < len(EMOTIONS) else "unknown"
-            )
-            confidence = float(predictions[emotion_idx])
+    has_face_frame = emotion_name != "NO FACE"
+    if has_face_frame:
+        no_face_frames = 0
+    else:
+        no_face_frames += 1
+
+    face_detected_flag = no_face_frames < NO_FACE_THRESHOLD
+
+    return {
+        "level": fused_stress_level if face_detected_flag else 0.0,
+        "emotion": emotion_name if face_detected_flag else "NO FACE",
+        "confidence": confidence if face_detected_flag else 0.0,
+        "face_detected": face_detected_flag,
+        "timestamp": "FULL_FRAME_MINI_XCEPTION_FUSED_WITH_SERVICES",
+        "debug": {
+            "model_stress": stress_level_model,
+            "blink_metric": blink_metric,
+            "blink_count": blink_analyzer.total,
+            "blink_rate_stress": blink_rate_stress,
+            "eyebrow_metric": eyebrow_metric,
+            "service_emotion": service_emotion,
+            "service_stress": service_stress,
+            "face_tracked": face.tracked,
+        },
+    }
+
+
+def emit_live_update(payload):
+    # only clients showing the server camera (subscribe {"live": true})
+    socketio.emit("stress_update", payload, to=LIVE_ROOM)
 
-            blink_metric = compute_blink_metric(gray, frame_color)
-            eyebrow_metric = compute_eyebrow_metric(gray, frame_color)
-            service_emotion, service_stress = compute_emotion_from_service(
-                gray, frame_color
-            )
 
-            fused_stress_level = float(
-                np.clip(
-                    0.40 * stress_level_model
-                    + 0.20 * (1.0 - blink_metric)
-                    + 0.20 * eyebrow_metric
-                    + 0.20 * service_stress,
-                    0.0,
-                    1.0,
-                )
-            )
+def process_live_emotion():
+    global live_pipeline, emotion_predict
 
-            has_face_frame = emotion_name != "NO FACE"
-            if has_face_frame:
-                no_face_frames = 0
-            else:
-                no_face_frames += 1
+    if not model_registry.wait_until_warm(model_path):
+        print("❌ No model - emotion processing disabled")
+        return
+    emotion_predict = model_registry.get_predictor(model_path)
+    print(f"✅ AI Model loaded successfully: {os.path.basename(model_path)}")
 
-            face_detected_flag = no_face_frames < NO_FACE_THRESHOLD
+    if not load_face_models():
+        return
 
-            socketio.emit(
-                "stress_update",
-                {
-                    "level": fused_stress_level if face_detected_flag else 0.0,
-                    "emotion": emotion_name if face_detected_flag else "NO FACE",
-                    "confidence": confidence if face_detected_flag else 0.0,
-                    "face_detected": face_detected_flag,
-                    "timestamp": "FULL_FRAME_MINI_XCEPTION_FUSED_WITH_SERVICES",
-                    "debug": {
-                        "model_stress": stress_level_model,
-                        "blink_metric": blink_metric,
-                        "eyebrow_metric": eyebrow_metric,
-                        "service_emotion": service_emotion,
-                        "service_stress": service_stress,
-                    },
-                },
-            )
+    cap = open_live_camera()
+    if cap is None:
+        return
 
-        except Exception as e:
-            print(f"⚠️ Model error: {e}")
+    def read_frame():
+        if not cap.isOpened():
+            return None, None
+        # blocks in native code; keep it off the event loop in green modes
+        return call_native(cap.read)
+
+    # capture -> inference (newest frame only) -> emit, each on its own thread,
+    # so a slow model never stalls the camera loop or /video_feed
+    live_pipeline = LiveStressPipeline(
+        read_frame=read_frame,
+        analyze=analyze_live_frame,
+        emit=emit_live_update,
+        on_frame=frame_broadcaster.publish,
+        scheduler=inference_scheduler,
+        track=track_live_frame if face_analysis_needed() else None,
+    )
 
-        # Small sleep to prevent CPU hogging
-        time.sleep(0.01)
+    print("🎥🤖 LIVE STRESS ANALYSIS STARTED (Background)")
+    live_pipeline.start()
+    live_pipeline.join()
 
     cap.release()
     print("🛑 Camera stream ended")
 
 # --- GENERATOR FOR MJPEG ROUTE ---
 def generate_frames():
-    global outputFrame, lock
-    
-    while True:
-        with lock:
-            if outputFrame is None:
-                continue
-            
-            # Encode the frame in JPEG format
-            (flag, encodedImage) = cv2.imencode(".jpg", outputFrame)
-            
-            if not flag:
-                continue
-        
-        # Yield the output frame in the byte format
-        yield(b'--frame\r\n' b'Content-Type: image/jpeg\r\n\r\n' + 
-              bytearray(encodedImage) + b'\r\n')
+    # Blocks until a new frame is published instead of busy-looping on a lock
+    return frame_broadcaster.frames()
 
 # 3. Create App Instance
-app = create_app()
+with startup_timer.phase("create_app"):
+    app = create_app()
 
 # enable CORS
 CORS(
@@ -375,9 +468,6 @@ CORS(
     },
 )
 
-if mongo_client is not None and not hasattr(app, "mongo_client"):
-    app.mongo_client = mongo_client
-
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 STATIC_FOLDER = os.path.join(BASE_DIR, "static")
 UPLOAD_FOLDER = os.path.join(STATIC_FOLDER, "uploads")
@@ -389,6 +479,55 @@ def video_feed():
     # Returns the response generated along with the specific media type (mime type)
     return Response(generate_frames(), mimetype="multipart/x-mixed-replace; boundary=frame")
 
+@app.route("/api/live/pipeline")
+def live_pipeline_stats():
+    # Per-stage counters so we can see where the live loop spends its time
+    stats = {
+        "pipeline": live_pipeline.stats() if live_pipeline is not None else None,
+        "video_feed": frame_broadcaster.stats(),
+        "face_tracking": face_tracker.stats() if face_tracker is not None else None,
+        "emotion_cache": live_emotion_cache.stats(),
+        "eyebrow": eyebrow_analyzer.stats(),
+        "blink": {
+            "count": blink_analyzer.total,
+            "rate_per_min": blink_analyzer.rate_counter.rates(),
+        },
+        "stress_service_cache": stress_model_service.cache.stats(),
+        "socket_frame_gate": frame_gate.stats(),
+        "socket_sessions": socket_sessions.stats(),
+        "async_mode": ASYNC_MODE,
+        "executors": executor_stats(),
+        "stress_worker_pool": (
+            stress_model_service.worker_pool.stats()
+            if stress_model_service.worker_pool is not None
+            else None
+        ),
+    }
+    return jsonify(stats)
+
+@app.route("/api/health/ready")
+def readiness():
+    # 200 once every warm-up has finished; includes the startup timing report
+    models = model_registry.readiness()
+    ready = all(m["state"] != "loading" for m in models.values())
+    body = {
+        "ready": ready,
+        "uptime_s": round(startup_timer.elapsed(), 3),
+        "models": models,
+        "startup": startup_timer.report(),
+    }
+    return jsonify(body), (200 if ready else 503)
+
+@app.route("/api/models/stats")
+def model_stats():
+    # Load time and RSS growth per model, one entry per (path, backend),
+    # plus the frame worker processes (restarts, broken workers, timeouts)
+    worker_pool = stress_model_service.worker_pool
+    return jsonify({
+        "models": model_registry.stats(),
+        "stress_worker_pool": worker_pool.stats() if worker_pool is not None else None,
+    })
+
 @app.route("/static/uploads/<path:filename>")
 def uploaded_file(filename):
     return send_from_directory(UPLOAD_FOLDER, filename)
@@ -439,6 +578,8 @@ def analyze_crypto_csv():
         return jsonify({"error": "Empty filename"}), 400
 
     try:
+        import pandas as pd
+
         df = pd.read_csv(f)
 
         if "price" not in df.columns:
@@ -486,11 +627,29 @@ def analyze_crypto_csv():
         return jsonify({"error": "Failed to analyze CSV"}), 500
 
 # Start background tasks
-emitter_thread = threading.Thread(target=emit_market_updates, daemon=True)
-emitter_thread.start()
+# The simulated market feed is opt-in: RUN_MARKET_EMITTER=1 runs it in this
+# process; with several web workers behind SOCKETIO_MESSAGE_QUEUE run it once
+# in scripts/emitter.py instead
+if os.getenv("RUN_MARKET_EMITTER", "0") == "1":
+    set_app(app)
+    emitter_thread = threading.Thread(target=emit_market_updates, daemon=True, name="MARKET_EMITTER")
+    emitter_thread.start()
+
+threading.Thread(target=connect_mongo, daemon=True, name="MONGO_CONNECT").start()
+
+# Load the emotion model and run a dummy forward pass off the startup path;
+# /api/health/ready reports when it is done
+if os.path.exists(model_path):
+    model_registry.warm_up_async(model_path, on_done=startup_timer.record)
+else:
+    print(f"⚠️ AI Model not found at: {model_path}")
 
 # --- START THE MODEL THREAD (Keeps Camera & AI alive in background) ---
-if emotion_model:
+# Only one process can own the camera: LIVE_CAMERA_ENABLED=0 on the others
+LIVE_CAMERA_ENABLED = os.getenv("LIVE_CAMERA_ENABLED", "1") == "1"
+if not LIVE_CAMERA_ENABLED:
+    print("ℹ️ Live camera disabled in this worker (LIVE_CAMERA_ENABLED=0)")
+elif os.path.exists(model_path):
     model_thread = threading.Thread(
         target=process_live_emotion,
         daemon=True,
@@ -505,31 +664,43 @@ else:
 def handle_high_stress(data):
     print(f"🚨 ALERT: {data.get('userName', 'User')} reported High Stress")
 
-    socketio.emit("admin_receive_stress_alert", data)
+    socketio.emit("admin_receive_stress_alert", data, to=HR_ROOM)
 
     target_phone = data.get("hrPhone")
+    client = get_twilio_client()
 
     if client and target_phone:
+        sid = request.sid
+
+        def send_sms():
+            try:
+                message = client.messages.create(
+                    body=(
+                        f"🚨 NEUROMETRIC ALERT: Employee {data.get('userName')} is "
+                        f"experiencing High Stress (Level: {int(data.get('level', 0) * 100)}%). "
+                        f"Please check the dashboard."
+                    ),
+                    from_=TWILIO_PHONE,
+                    to=target_phone,
+                )
+                print(f"✅ SMS sent: {message.sid}")
+                socketio.emit("sms_sent_success", {"success": True}, to=sid)
+            except Exception as e:
+                print(f"❌ SMS Failed: {e}")
+
+        # the Twilio round trip runs on the notify pool, not the socket handler
         try:
-            message = client.messages.create(
-                body=(
-                    f"🚨 NEUROMETRIC ALERT: Employee {data.get('userName')} is "
-                    f"experiencing High Stress (Level: {int(data.get('level', 0) * 100)}%). "
-                    f"Please check the dashboard."
-                ),
-                from_=TWILIO_PHONE,
-                to=target_phone,
-            )
-            print(f"✅ SMS sent: {message.sid}")
-            emit("sms_sent_success", {"success": True})
+            get_executor("notify").submit(send_sms)
         except Exception as e:
-            print(f"❌ SMS Failed: {e}")
+            print(f"❌ SMS not queued: {e}")
     else:
         if not client:
             print("ℹ️ SMS Skipped: Twilio not configured.")
         if not target_phone:
             print("ℹ️ SMS Skipped: No HR phone number provided in settings.")
 
+startup_timer.print_report()
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 5000))
     print(f"🚀 Starting SocketIO server on 0.0.0.0:{port}")
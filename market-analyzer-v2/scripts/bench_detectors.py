@@ -0,0 +1,123 @@
+"""
+Benchmark the face detector backends at several detection scales.
+
+    python scripts/bench_detectors.py --images faces/            # folder of photos
+    python scripts/bench_detectors.py --video 0 --frames 200      # webcam / video file
+    python scripts/bench_detectors.py --backends haar,hog --scales 1,0.5,0.25
+
+For every backend/scale pair it prints p50/mean detection latency, the share
+of frames with a face, and how well the boxes agree (IoU of the largest face)
+with the same backend at full resolution. Backends whose dependency or model
+files are missing are skipped.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.face_detectors import FACE_DETECTORS  # noqa: E402
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def load_frames(images=None, video=None, frames=100, width=640):
+    """Grayscale frames resized to `width`, like the live camera path."""
+    gray_frames = []
+    if images:
+        paths = sorted(
+            p for p in glob.glob(os.path.join(images, "**", "*"), recursive=True)
+            if p.lower().endswith(IMAGE_EXTENSIONS)
+        )[:frames]
+        for path in paths:
+            img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if img is not None:
+                gray_frames.append(img)
+    elif video is not None:
+        cap = cv2.VideoCapture(int(video) if str(video).isdigit() else video)
+        while len(gray_frames) < frames:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            gray_frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
+        cap.release()
+
+    if not gray_frames:
+        print("[WARNING] No input frames; timing on noise (no faces will be found)")
+        rng = np.random.default_rng(0)
+        gray_frames = [rng.integers(0, 256, (480, 640), dtype=np.uint8) for _ in range(frames)]
+
+    resized = []
+    for img in gray_frames:
+        h, w = img.shape[:2]
+        if w != width:
+            img = cv2.resize(img, (width, int(round(h * width / w))))
+        resized.append(img)
+    return resized
+
+
+def iou(a, b):
+    ax2, ay2 = a[0] + a[2], a[1] + a[3]
+    bx2, by2 = b[0] + b[2], b[1] + b[3]
+    iw = max(0, min(ax2, bx2) - max(a[0], b[0]))
+    ih = max(0, min(ay2, by2) - max(a[1], b[1]))
+    inter = iw * ih
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union else 0.0
+
+
+def run(detector, frames):
+    latencies, boxes = [], []
+    for gray in frames:
+        started = time.perf_counter()
+        found = detector.detect(gray)
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        boxes.append(found[0] if found else None)
+    return np.array(latencies), boxes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", help="folder of images containing faces")
+    parser.add_argument("--video", help="camera index or video file")
+    parser.add_argument("--frames", type=int, default=100)
+    parser.add_argument("--width", type=int, default=640, help="frame width before detection")
+    parser.add_argument("--backends", default=",".join(FACE_DETECTORS))
+    parser.add_argument("--scales", default="1,0.5")
+    args = parser.parse_args()
+
+    frames = load_frames(args.images, args.video, args.frames, args.width)
+    scales = sorted({float(s) for s in args.scales.split(",")} | {1.0}, reverse=True)
+    print(f"{len(frames)} frames at {frames[0].shape[1]}x{frames[0].shape[0]}")
+    print(f"{'backend':<8}{'scale':>6}{'p50 ms':>9}{'mean ms':>9}{'faces':>8}{'IoU@1.0':>9}")
+
+    for backend in args.backends.split(","):
+        reference = None
+        for scale in scales:
+            try:
+                detector = FACE_DETECTORS[backend](scale=scale)
+            except Exception as e:
+                print(f"{backend:<8} skipped: {e}")
+                break
+            detector.detect(frames[0])  # warm-up
+            latencies, boxes = run(detector, frames)
+            if reference is None:
+                reference = boxes
+
+            pairs = [(a, b) for a, b in zip(reference, boxes) if a is not None and b is not None]
+            agreement = np.mean([iou(a, b) for a, b in pairs]) if pairs else float("nan")
+            found = sum(b is not None for b in boxes) / len(boxes)
+            print(
+                f"{backend:<8}{scale:>6g}{np.percentile(latencies, 50):>9.2f}"
+                f"{latencies.mean():>9.2f}{found:>8.0%}{agreement:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
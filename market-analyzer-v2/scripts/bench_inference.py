@@ -0,0 +1,64 @@
+"""
+Micro-benchmark: Keras predict() vs the traced small-batch call path.
+
+    python scripts/bench_inference.py [--model PATH] [--runs 200] [--batch 1]
+
+Prints p50/p95/mean latency in milliseconds for both paths on random
+64x64 grayscale input, plus the max absolute difference between outputs.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.model_registry import model_registry, MINI_XCEPTION_PATH  # noqa: E402
+
+
+def _time_calls(fn, batch, runs, warmup=10):
+    for _ in range(warmup):
+        fn(batch)
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn(batch)
+        samples.append((time.perf_counter() - started) * 1000.0)
+    samples = np.array(samples)
+    return {
+        "p50": float(np.percentile(samples, 50)),
+        "p95": float(np.percentile(samples, 95)),
+        "mean": float(samples.mean()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default=MINI_XCEPTION_PATH)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=1)
+    args = parser.parse_args()
+
+    model = model_registry.get(args.model)
+    predictor = model_registry.get_predictor(args.model)
+    shape = (args.batch,) + tuple(model.input_shape[1:])
+    batch = np.random.rand(*shape).astype("float32")
+
+    results = {
+        "keras predict()": _time_calls(lambda x: model.predict(x, verbose=0), batch, args.runs),
+        "traced tf.function": _time_calls(predictor, batch, args.runs),
+    }
+
+    print(f"Model: {os.path.basename(args.model)}  input: {shape}  runs: {args.runs}")
+    for name, r in results.items():
+        print(f"  {name:<20} p50 {r['p50']:7.2f} ms   p95 {r['p95']:7.2f} ms   mean {r['mean']:7.2f} ms")
+
+    diff = np.abs(model.predict(batch, verbose=0) - predictor(batch)).max()
+    print(f"  max |difference| between paths: {diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
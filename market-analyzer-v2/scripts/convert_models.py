@@ -0,0 +1,181 @@
+"""
+Export the Keras emotion checkpoints to TFLite / ONNX and check parity.
+
+    python scripts/convert_models.py                      # all datasets/facial/*.hdf5, tflite + onnx
+    python scripts/convert_models.py --format tflite --int8 --calibration-dir faces/
+    python scripts/convert_models.py --parity-only --format onnx
+
+Artifacts are written next to each checkpoint (see artifact_path), where
+ModelRegistry picks them up when EMOTION_BACKEND=tflite|onnx
+(and EMOTION_QUANTIZED=1 for the int8 variants).
+
+int8 post-training quantisation needs representative inputs: pass a folder
+of face crops with --calibration-dir. Without one, uniform noise is used,
+which is only good enough for smoke tests.
+
+ONNX export needs `tf2onnx`; ONNX int8 and the ONNX parity check need
+`onnxruntime`. The lightweight runtimes are optional at serve time too.
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.inference_backends import BACKENDS, artifact_path  # noqa: E402
+from app.services.model_registry import FACIAL_MODELS_DIR  # noqa: E402
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+def load_samples(input_shape, calibration_dir=None, count=200, seed=0):
+    """(count, H, W, C) float32 samples in [0, 1] for calibration and parity."""
+    height, width, _ = input_shape
+    if calibration_dir:
+        paths = sorted(
+            p for p in glob.glob(os.path.join(calibration_dir, "**", "*"), recursive=True)
+            if p.lower().endswith(IMAGE_EXTENSIONS)
+        )[:count]
+        samples = []
+        for path in paths:
+            img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+            if img is None:
+                continue
+            img = cv2.resize(img, (width, height)).astype("float32") / 255.0
+            samples.append(img[..., np.newaxis])
+        if samples:
+            return np.stack(samples)
+        print(f"[WARNING] No readable images in {calibration_dir}; using noise")
+
+    rng = np.random.default_rng(seed)
+    return rng.random((count,) + tuple(input_shape), dtype=np.float32)
+
+
+def convert_tflite(model, out_path, int8=False, samples=None):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if int8:
+        def representative_dataset():
+            for sample in samples:
+                yield [sample[np.newaxis, ...]]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+
+    with open(out_path, "wb") as f:
+        f.write(converter.convert())
+
+
+def convert_onnx(model, out_path, int8=False, samples=None):
+    import tensorflow as tf
+    import tf2onnx
+
+    spec = (tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32, name="input"),)
+    # int8 is quantised from the float export, which is kept alongside
+    float_path = out_path.replace(".int8.onnx", ".onnx") if int8 else out_path
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=13, output_path=float_path)
+
+    if int8:
+        from onnxruntime.quantization import (
+            CalibrationDataReader,
+            QuantFormat,
+            QuantType,
+            quantize_static,
+        )
+
+        class _Reader(CalibrationDataReader):
+            def __init__(self):
+                self._it = iter(samples)
+
+            def get_next(self):
+                sample = next(self._it, None)
+                return None if sample is None else {"input": sample[np.newaxis, ...]}
+
+        quantize_static(
+            float_path,
+            out_path,
+            _Reader(),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+        )
+
+
+CONVERTERS = {
+    "tflite": convert_tflite,
+    "onnx": convert_onnx,
+}
+
+
+def check_parity(model, out_path, backend, samples):
+    """Compare backend outputs with Keras: max abs error and top-1 agreement."""
+    reference = model.predict(samples, verbose=0)
+    candidate = BACKENDS[backend](out_path).predict(samples)
+    max_abs = float(np.abs(reference - candidate).max())
+    agreement = float(np.mean(reference.argmax(axis=1) == candidate.argmax(axis=1)))
+    return max_abs, agreement
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert emotion checkpoints to TFLite / ONNX")
+    parser.add_argument("models", nargs="*", help="checkpoints (default: datasets/facial/*.hdf5)")
+    parser.add_argument("--format", choices=["tflite", "onnx", "all"], default="all")
+    parser.add_argument("--int8", action="store_true", help="int8 post-training quantisation")
+    parser.add_argument("--calibration-dir", help="face crops used for calibration and parity")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--min-agreement", type=float, default=None,
+                        help="fail below this top-1 agreement (default 0.99, int8 0.90)")
+    parser.add_argument("--parity-only", action="store_true", help="skip conversion")
+    args = parser.parse_args()
+
+    from tensorflow.keras.models import load_model
+
+    models = args.models or sorted(glob.glob(os.path.join(FACIAL_MODELS_DIR, "*.hdf5")))
+    formats = list(CONVERTERS) if args.format == "all" else [args.format]
+    min_agreement = args.min_agreement
+    if min_agreement is None:
+        min_agreement = 0.90 if args.int8 else 0.99
+
+    failed = False
+    for model_path in models:
+        model = load_model(model_path, compile=False)
+        samples = load_samples(model.input_shape[1:], args.calibration_dir, args.samples)
+
+        for backend in formats:
+            out_path = artifact_path(model_path, backend, quantized=args.int8)
+            name = os.path.basename(out_path)
+            try:
+                if not args.parity_only:
+                    CONVERTERS[backend](model, out_path, int8=args.int8, samples=samples)
+                    print(
+                        f"[OK] Wrote {name} ({os.path.getsize(out_path) / 1024:.0f} KiB, "
+                        f"keras {os.path.getsize(model_path) / 1024:.0f} KiB)"
+                    )
+                max_abs, agreement = check_parity(model, out_path, backend, samples)
+            except ImportError as e:
+                print(f"[ERROR] {name}: missing dependency ({e})")
+                failed = True
+                continue
+
+            status = "OK" if agreement >= min_agreement else "FAIL"
+            failed = failed or status == "FAIL"
+            print(
+                f"[{status}] Parity {name}: top-1 agreement {agreement:.1%}, "
+                f"max |diff| {max_abs:.4f}"
+            )
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
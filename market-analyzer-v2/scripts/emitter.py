@@ -0,0 +1,55 @@
+"""
+Standalone market-data emitter: publishes market_update / market_stress_update
+through the Socket.IO message queue without serving HTTP, so every web
+worker (with RUN_MARKET_EMITTER unset) delivers the same feed to its own
+clients.
+
+    SOCKETIO_MESSAGE_QUEUE=redis://localhost:6379/0 python scripts/emitter.py
+    python scripts/emitter.py --queue local://127.0.0.1:6390 --broker
+
+--broker also hosts the LocalBroker stand-in in this process, for running
+several workers on one machine (or in tests) without Redis.
+"""
+
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask  # noqa: E402
+
+from app.services.message_queue import LocalBroker, create_emitter  # noqa: E402
+from app.tasks_new import emit_market_updates, set_app  # noqa: E402
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queue", default=os.getenv("SOCKETIO_MESSAGE_QUEUE"),
+                        help="message queue URL (default: SOCKETIO_MESSAGE_QUEUE)")
+    parser.add_argument("--channel", default=os.getenv("SOCKETIO_CHANNEL"),
+                        help="queue channel, must match the web workers")
+    parser.add_argument("--broker", action="store_true",
+                        help="host a LocalBroker on the local:// --queue address")
+    args = parser.parse_args()
+
+    if not args.queue:
+        parser.error("no message queue: pass --queue or set SOCKETIO_MESSAGE_QUEUE")
+
+    if args.broker:
+        broker = LocalBroker(args.queue).start()
+        print(f"[OK] Local broker listening on {broker.url}")
+
+    # MarketAIService only needs Mongo (its price cache), not the web app
+    app = Flask("market_emitter")
+    app.config["MONGO_URI"] = os.getenv("MONGO_URI")
+    set_app(app)
+
+    emit_market_updates(create_emitter(args.queue, args.channel))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+from app.services.blink_detection import BlinkRateCounter
+
+
+def test_rates_per_window():
+    counter = BlinkRateCounter(windows=(60.0, 300.0), now=0)
+    for t in range(0, 300, 10):  # one blink every 10s for 5 minutes
+        counter.record(now=t)
+    assert counter.total == 30
+    assert counter.rate(0, now=300) == 6.0
+    assert counter.rate(1, now=300) == 6.0
+    assert counter.rates(now=300) == {"1m": 6.0, "5m": 6.0}
+
+
+def test_short_sessions_are_scaled_to_their_age():
+    counter = BlinkRateCounter(windows=(60.0,), now=0)
+    counter.record(now=5)
+    counter.record(now=10)
+    assert counter.rate(now=20) == 6.0
+    assert BlinkRateCounter(now=0).rate(now=0) == 0.0
+
+
+def test_old_blinks_leave_the_window():
+    counter = BlinkRateCounter(windows=(60.0,), now=0)
+    for t in (1, 2, 3):
+        counter.record(now=t)
+    assert counter.rate(now=60) == 3.0
+    assert counter.rate(now=200) == 0.0
+
+
+def test_ring_overwrites_never_count_twice():
+    counter = BlinkRateCounter(windows=(60.0,), capacity=4, now=0)
+    for t in range(10):
+        counter.record(now=50 + t * 0.1)
+    # only the last `capacity` blinks are still held
+    assert counter.rate(now=60) == 4.0
+    assert counter.total == 10
@@ -0,0 +1,71 @@
+from app.services.frame_gate import LatestFrameGate
+
+
+def test_frames_arriving_while_busy_keep_only_the_newest():
+    gate = LatestFrameGate()
+    analysed, acks = [], []
+
+    def analyze(frame):
+        analysed.append(frame)
+        if frame == 1:
+            # arrive while frame 1 is still being analysed
+            assert gate.submit("sid", 2, analyze) is False
+            assert gate.submit("sid", 3, analyze) is False
+        return frame
+
+    assert gate.submit("sid", 1, analyze, lambda result, ack: acks.append(ack)) is True
+    assert analysed == [1, 3]
+    assert gate.stats()["dropped"] == 1
+    assert gate.stats()["busy_sessions"] == 0
+
+
+def test_parked_frame_keeps_its_own_analyzer_and_callback():
+    gate = LatestFrameGate()
+    results = []
+
+    def analyze_video(frame):
+        gate.submit("sid", b"crop", lambda crop: ("crop", crop),
+                    lambda result, ack: results.append(result))
+        return ("video", frame)
+
+    gate.submit("sid", b"jpeg", analyze_video, lambda result, ack: results.append(result))
+    assert results == [("video", b"jpeg"), ("crop", b"crop")]
+
+
+def test_interval_backs_off_on_drops_and_never_drops_below_the_minimum():
+    gate = LatestFrameGate(min_interval=1.0, initial_interval=1.0, backoff=2.0)
+    acks = []
+
+    def dropping(frame):
+        if frame == 1:
+            gate.submit("sid", 2, dropping)
+            gate.submit("sid", 3, dropping)
+        return frame
+
+    gate.submit("sid", 1, dropping, lambda result, ack: acks.append(ack))
+    assert acks[-1]["dropped"] == 1
+    assert acks[-1]["suggested_interval_ms"] == 2000
+
+    # fast analysis afterwards drifts back down, but not under min_interval
+    for _ in range(50):
+        gate.submit("sid", 0, lambda frame: frame, lambda result, ack: acks.append(ack))
+    assert acks[-1]["suggested_interval_ms"] == 1000
+
+
+def test_a_failing_frame_gets_an_error_ack_and_the_parked_frame_still_runs():
+    gate = LatestFrameGate()
+    results, errors = [], []
+
+    def corrupt(frame):
+        gate.submit("sid", b"good", lambda good: ("ok", good),
+                    lambda result, ack: results.append(result),
+                    lambda error, ack: errors.append(ack))
+        raise ValueError("corrupt payload")
+
+    assert gate.submit("sid", b"bad", corrupt, lambda result, ack: results.append(result),
+                       lambda error, ack: errors.append(ack)) is True
+    assert errors[0]["error"] == "corrupt payload"
+    assert "suggested_interval_ms" in errors[0]
+    assert results == [("ok", b"good")]
+    assert gate.stats()["errors"] == 1
+    assert gate.stats()["busy_sessions"] == 0
@@ -0,0 +1,55 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+from app.services.frame_worker_pool import FrameWorkerPool
+
+
+class BareWorkerPool(FrameWorkerPool):
+    """Worker processes without the model, for exercising the pool itself."""
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context(self.start_method))
+
+
+def _echo(payload, scope):
+    return np.full(7, payload, dtype=np.float32).tobytes(), None, False
+
+
+def _crash(payload, scope):
+    os._exit(1)
+
+
+def _hang(payload, scope):
+    time.sleep(payload)
+    return None, 0.3, False
+
+
+def test_a_dead_worker_is_replaced():
+    pool = BareWorkerPool(1, model_path=None, timeout=10)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            pool._call(_crash, 0, "sid", None)
+        predictions, _ = pool._call(_echo, 2, "sid", None)
+        assert predictions[0] == 2
+        stats = pool.stats()
+        assert stats["restarts_per_worker"] == [1]
+        assert stats["broken_workers"] == []
+        assert stats["errors"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_calls_time_out():
+    pool = BareWorkerPool(1, model_path=None, timeout=0.1)
+    try:
+        with pytest.raises(FutureTimeoutError):
+            pool._call(_hang, 1.0, "sid", None)
+        assert pool.stats()["timeouts"] == 1
+    finally:
+        pool.shutdown()
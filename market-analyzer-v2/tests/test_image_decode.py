@@ -0,0 +1,45 @@
+import cv2
+import numpy as np
+
+from app.utils.image_decode import choose_reduction, decode_gray, jpeg_size
+
+
+def _encode(width, height, ext=".jpg", params=()):
+    frame = np.random.default_rng(0).integers(0, 255, (height, width, 3), dtype=np.uint8)
+    ok, buf = cv2.imencode(ext, frame, list(params))
+    assert ok
+    return buf.tobytes()
+
+
+def test_jpeg_size_reads_baseline_and_progressive_headers():
+    assert jpeg_size(_encode(320, 240)) == (320, 240)
+    assert jpeg_size(_encode(320, 240, params=(cv2.IMWRITE_JPEG_PROGRESSIVE, 1))) == (320, 240)
+
+
+def test_jpeg_size_rejects_other_formats_and_truncated_data():
+    assert jpeg_size(_encode(32, 32, ext=".png")) is None
+    assert jpeg_size(_encode(320, 240)[:20]) is None
+    assert jpeg_size(b"") is None
+
+
+def test_reduction_keeps_a_64px_face_for_the_model():
+    # haar at scale 0.5 with 24px minimum faces, 64x64 model input
+    args = dict(min_side=64, detector_scale=0.5, min_face=24, min_roi=64)
+    assert choose_reduction(640, 480, **args) == 1
+    assert choose_reduction(1280, 720, **args) == 1
+    assert choose_reduction(1920, 1080, **args) == 2
+    assert choose_reduction(3840, 2160, **args) == 4
+
+
+def test_reduction_without_a_roi_floor_follows_the_detector():
+    assert choose_reduction(1280, 720, min_side=64, detector_scale=0.5, min_face=24) == 4
+    assert choose_reduction(1280, 720, min_side=64, detector_scale=1.0, min_face=24) == 4
+    assert choose_reduction(1280, 720, min_side=64, detector_scale=1.0, min_face=40) == 2
+
+
+def test_decode_gray_returns_the_reduced_frame():
+    gray, factor = decode_gray(_encode(1920, 1080), min_side=64, detector_scale=0.5,
+                               min_face=24, min_roi=64)
+    assert factor == 2
+    assert gray.shape == (540, 960)
+    assert decode_gray(b"not an image") == (None, 1)
@@ -0,0 +1,35 @@
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import numpy as np
+import pytest
+
+from app.services.inference_batcher import InferenceBatcher
+
+
+def test_concurrent_inputs_share_a_batch():
+    batcher = InferenceBatcher(lambda batch: batch * 2, max_batch=8, window_ms=50)
+    futures = [batcher.submit(np.full(2, i, dtype=np.float32)) for i in range(4)]
+    assert [f.result(5)[0] for f in futures] == [0, 2, 4, 6]
+    assert batcher.stats()["largest_batch"] > 1
+
+
+def test_predict_times_out_and_withdraws_its_input():
+    release = threading.Event()
+    seen = []
+
+    def slow(batch):
+        release.wait(5)
+        seen.append(len(batch))
+        return batch
+
+    batcher = InferenceBatcher(slow, max_batch=1, window_ms=0)
+    first = batcher.submit(np.zeros(1))  # occupies the worker
+    with pytest.raises(FutureTimeoutError):
+        batcher.predict(np.ones(1), timeout=0.05)
+    release.set()
+    first.result(5)
+
+    # the timed-out input is skipped, the worker keeps serving
+    assert batcher.predict(np.full(1, 3.0), timeout=5)[0] == 3.0
+    assert seen == [1, 1]
@@ -0,0 +1,27 @@
+from app.services.inference_cache import PerceptualHashCache
+
+
+def test_near_match_hits_within_scope():
+    cache = PerceptualHashCache(max_entries=8, max_distance=6, ttl_seconds=10)
+    cache.put(0b1011, "user-a", scope="a", now=0)
+    assert cache.get(0b1010, scope="a", now=1) == "user-a"
+
+
+def test_near_match_does_not_cross_scopes():
+    cache = PerceptualHashCache(max_entries=8, max_distance=6, ttl_seconds=10)
+    cache.put(0b1011, "user-a", scope="a", now=0)
+    assert cache.get(0b1010, scope="b", now=1) is None
+    assert cache.get(0b1011, scope="b", now=1) is None
+
+
+def test_unscoped_lookups_need_an_identical_hash():
+    cache = PerceptualHashCache(max_entries=8, max_distance=6, ttl_seconds=10)
+    cache.put(0b1011, "someone", now=0)
+    assert cache.get(0b1010, now=1) is None
+    assert cache.get(0b1011, now=1) == "someone"
+
+
+def test_entries_expire():
+    cache = PerceptualHashCache(max_entries=8, max_distance=6, ttl_seconds=1)
+    cache.put(0b1011, "old", scope="a", now=0)
+    assert cache.get(0b1011, scope="a", now=2) is None
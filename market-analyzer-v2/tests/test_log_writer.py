@@ -0,0 +1,79 @@
+from collections import defaultdict
+
+import pytest
+
+from app.services.log_writer import StressLogWriter
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents = []
+        self.calls = 0
+
+    def insert_one(self, document):
+        self.documents.append(document)
+
+    def insert_many(self, documents, ordered=True):
+        self.calls += 1
+        self.documents.extend(documents)
+
+
+class FakeMongo:
+    def __init__(self):
+        self.db = defaultdict(FakeCollection)
+
+
+def _writer(overflow, **kwargs):
+    # a large batch and interval keep the writer thread idle until flush()
+    return StressLogWriter(FakeMongo(), max_queue=2, batch_size=100, flush_interval=60,
+                           overflow=overflow, **kwargs)
+
+
+def test_drop_oldest_keeps_the_newest_documents():
+    writer = _writer("drop_oldest")
+    assert all(writer.submit("stressLogs", {"n": n}) for n in range(4))
+    assert writer.flush()
+    assert writer.mongo.db["stressLogs"].documents == [{"n": 2}, {"n": 3}]
+    assert writer.stats()["dropped"] == 2
+    writer.close()
+
+
+def test_drop_newest_rejects_new_documents():
+    writer = _writer("drop_newest")
+    assert [writer.submit("stressLogs", {"n": n}) for n in range(4)] == [True, True, False, False]
+    assert writer.flush()
+    assert writer.mongo.db["stressLogs"].documents == [{"n": 0}, {"n": 1}]
+    assert writer.stats()["dropped"] == 2
+    writer.close()
+
+
+def test_block_gives_up_after_its_timeout():
+    writer = _writer("block", block_timeout=0.05)
+    writer.submit("stressLogs", {"n": 0})
+    writer.submit("stressLogs", {"n": 1})
+    assert writer.submit("stressLogs", {"n": 2}) is False
+    writer.close()
+    stats = writer.stats()
+    assert (stats["written"], stats["dropped"], stats["queued"]) == (2, 1, 0)
+
+
+def test_batches_are_written_per_collection():
+    writer = StressLogWriter(FakeMongo(), max_queue=100, batch_size=100, flush_interval=60)
+    writer.submit_many("stressLogs", [{"n": n} for n in range(3)])
+    writer.alert({"level": "high"})
+    writer.close()
+    assert len(writer.mongo.db["stressLogs"].documents) == 3
+    assert writer.mongo.db["alerts"].calls == 1
+    assert writer.stats()["written"] == 4
+
+
+def test_zero_queue_writes_synchronously():
+    writer = StressLogWriter(FakeMongo(), max_queue=0)
+    assert writer.submit("stressLogs", {"n": 0})
+    assert writer.mongo.db["stressLogs"].documents == [{"n": 0}]
+    assert writer.stats()["queued"] == 0
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        StressLogWriter(FakeMongo(), overflow="spill")
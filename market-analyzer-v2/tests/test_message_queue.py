@@ -0,0 +1,58 @@
+import threading
+import time
+
+from app.services.message_queue import LocalBroker, LocalBrokerManager
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _listen(manager, received):
+    for message in manager._listen():
+        received.append(message)
+
+
+def test_publish_reaches_listeners_on_the_same_channel():
+    broker = LocalBroker("local://127.0.0.1:0").start()
+    try:
+        listener = LocalBrokerManager(broker.url, channel="test")
+        other_channel = LocalBrokerManager(broker.url, channel="other")
+        received, ignored = [], []
+        threading.Thread(target=_listen, args=(listener, received), daemon=True).start()
+        threading.Thread(target=_listen, args=(other_channel, ignored), daemon=True).start()
+        _wait_for(lambda: len(broker._listeners) == 2)
+
+        publisher = LocalBrokerManager(broker.url, channel="test", write_only=True)
+        publisher._publish({"method": "emit", "event": "market_update", "data": {"symbol": "AAPL"}})
+
+        _wait_for(lambda: received)
+        assert received[0]["event"] == "market_update"
+        assert received[0]["data"] == {"symbol": "AAPL"}
+        time.sleep(0.1)
+        assert ignored == []
+    finally:
+        broker.close()
+
+
+def test_publishers_never_back_up_the_relay():
+    # far more than a socket buffer: the broker must not echo to publishers
+    broker = LocalBroker("local://127.0.0.1:0").start()
+    try:
+        listener = LocalBrokerManager(broker.url, channel="test")
+        received = []
+        threading.Thread(target=_listen, args=(listener, received), daemon=True).start()
+        _wait_for(lambda: len(broker._listeners) == 1)
+
+        publisher = LocalBrokerManager(broker.url, channel="test", write_only=True)
+        padding = "x" * 400
+        for n in range(20000):
+            publisher._publish({"method": "emit", "event": "market_update", "data": {"n": n, "pad": padding}})
+
+        _wait_for(lambda: len(received) == 20000, timeout=30)
+        assert [message["data"]["n"] for message in received] == list(range(20000))
+    finally:
+        broker.close()
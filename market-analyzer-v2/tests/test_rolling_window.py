@@ -0,0 +1,30 @@
+from app.utils.rolling_window import RollingMinMax
+
+
+def test_min_max_follow_the_window():
+    window = RollingMinMax(window_seconds=10)
+    assert window.update(5, now=0) == (5, 5)
+    assert window.update(1, now=1) == (1, 5)
+    assert window.update(9, now=2) == (1, 9)
+    # the 5 and the 1 fall out of the window, the 9 stays
+    assert window.update(3, now=11.5) == (3, 9)
+    assert window.update(4, now=13) == (3, 4)
+    assert window.count == 5
+
+
+def test_memory_stays_bounded_on_monotonic_streams():
+    window = RollingMinMax(window_seconds=1000)
+    for t in range(500):
+        window.update(t, now=t)
+    # increasing values: one candidate max, every sample a candidate min
+    assert window.max == 499
+    assert window.min == 0
+    assert len(window) == 501
+
+
+def test_reset_clears_samples():
+    window = RollingMinMax(window_seconds=10)
+    window.update(2, now=0)
+    window.reset()
+    assert window.min is None and window.max is None
+    assert window.count == 0